@@ -1,38 +1,61 @@
-""" Envisage package Copyright 2003-2007 Enthought, Inc. """
-
-
-from i_application import IApplication
-from i_extension_point import IExtensionPoint
-from i_extension_point_user import IExtensionPointUser
-from i_extension_provider import IExtensionProvider
-from i_extension_registry import IExtensionRegistry
-from i_import_manager import IImportManager
-from i_plugin import IPlugin
-from i_plugin_activator import IPluginActivator
-from i_plugin_manager import IPluginManager
-from i_service_registry import IServiceRegistry
-
-from application import Application
-from category import Category
-from class_load_hook import ClassLoadHook
-from egg_plugin_manager import EggPluginManager
-from extension_registry import ExtensionRegistry
-from extension_point import ExtensionPoint, contributes_to
-from extension_point_binding import ExtensionPointBinding, bind_extension_point
-from extension_provider import ExtensionProvider
-from extension_point_changed_event import ExtensionPointChangedEvent
-from import_manager import ImportManager
-from plugin import Plugin
-from plugin_activator import PluginActivator
-from plugin_extension_registry import PluginExtensionRegistry
-from plugin_manager import PluginManager
-from provider_extension_registry import ProviderExtensionRegistry
-from service import Service
-from service_offer import ServiceOffer
-from service_registry import ServiceRegistry
-from twisted_application import TwistedApplication
-from unknown_extension import UnknownExtension
-from unknown_extension_point import UnknownExtensionPoint
+""" Envisage package Copyright 2003-2007 Enthought, Inc.
 
+The names in this module are imported when they are first used, so importing
+it only imports the modules that an application actually needs.
+
+"""
+
+
+# Standard library imports.
+import sys
+
+# Local imports.
+from envisage.lazy_module import LazyModule
+
+
+# The module that each name is imported from.
+NAMES = {
+    'IApplication'             : 'envisage.i_application',
+    'IExtensionPoint'          : 'envisage.i_extension_point',
+    'IExtensionPointUser'      : 'envisage.i_extension_point_user',
+    'IExtensionProvider'       : 'envisage.i_extension_provider',
+    'IExtensionRegistry'       : 'envisage.i_extension_registry',
+    'IImportManager'           : 'envisage.i_import_manager',
+    'IPlugin'                  : 'envisage.i_plugin',
+    'IPluginActivator'         : 'envisage.i_plugin_activator',
+    'IPluginManager'           : 'envisage.i_plugin_manager',
+    'IServiceRegistry'         : 'envisage.i_service_registry',
+
+    'Application'              : 'envisage.application',
+    'AsyncioApplication'       : 'envisage.asyncio_application',
+    'Category'                 : 'envisage.category',
+    'ClassLoadHook'            : 'envisage.class_load_hook',
+    'EggPluginManager'         : 'envisage.egg_plugin_manager',
+    'EntryPointPluginManager'  : 'envisage.entry_point_plugin_manager',
+    'ExtensionRegistry'        : 'envisage.extension_registry',
+    'ExtensionPoint'           : 'envisage.extension_point',
+    'contributes_to'           : 'envisage.extension_point',
+    'ExtensionPointBinding'    : 'envisage.extension_point_binding',
+    'bind_extension_point'     : 'envisage.extension_point_binding',
+    'ExtensionProvider'        : 'envisage.extension_provider',
+    'ExtensionPointChangedEvent' : 'envisage.extension_point_changed_event',
+    'ImportManager'            : 'envisage.import_manager',
+    'Plugin'                   : 'envisage.plugin',
+    'PluginActivator'          : 'envisage.plugin_activator',
+    'PluginExtensionRegistry'  : 'envisage.plugin_extension_registry',
+    'PluginManager'            : 'envisage.plugin_manager',
+    'ProviderExtensionRegistry': 'envisage.provider_extension_registry',
+    'Service'                  : 'envisage.service',
+    'ServicePool'              : 'envisage.service_lifetime',
+    'pooled'                   : 'envisage.service_lifetime',
+    'ServiceOffer'             : 'envisage.service_offer',
+    'ServiceRegistry'          : 'envisage.service_registry',
+    'TwistedApplication'       : 'envisage.twisted_application',
+    'UnknownExtension'         : 'envisage.unknown_extension',
+    'UnknownExtensionPoint'    : 'envisage.unknown_extension_point'
+}
+
+
+sys.modules[__name__] = LazyModule(__name__, __doc__, NAMES, __file__)
 
 #### EOF ######################################################################
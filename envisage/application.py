@@ -2,13 +2,12 @@
 
 
 # Standard library imports.
-import logging, os
+import logging, os, sys
 
 # Enthought library imports.
 from traits.etsconfig.api import ETSConfig
-from apptools.preferences.api import IPreferences, ScopedPreferences
-from apptools.preferences.api import set_default_preferences
-from traits.api import Delegate, Event, HasTraits, Instance, Str
+from traits.api import Delegate, Dict, Either, Event, HasTraits, Instance
+from traits.api import Str
 from traits.api import VetoableEvent, implements
 
 # Local imports.
@@ -18,7 +17,7 @@ from i_import_manager import IImportManager
 from i_plugin_manager import IPluginManager
 from i_service_registry import IServiceRegistry
 
-from application_event import ApplicationEvent
+from application_event import ApplicationEvent, LightweightApplicationEvent
 from import_manager import ImportManager
 
 
@@ -52,7 +51,10 @@ class Application(HasTraits):
     user_data = Str
 
     # The root preferences node.
-    preferences = Instance(IPreferences)
+    #
+    # The preferences interface is given by name so that 'apptools' is only
+    # imported when an application is created.
+    preferences = Instance('apptools.preferences.api.IPreferences')
 
     #### Events ####
 
@@ -60,13 +62,13 @@ class Application(HasTraits):
     starting = VetoableEvent(ApplicationEvent)
 
     # Fired when all plugins have been started.
-    started = Event(ApplicationEvent)
+    started = Event(Either(ApplicationEvent, LightweightApplicationEvent))
 
     # Fired when the application is stopping.
     stopping = VetoableEvent(ApplicationEvent)
 
     # Fired when all plugins have been stopped.
-    stopped = Event(ApplicationEvent)
+    stopped = Event(Either(ApplicationEvent, LightweightApplicationEvent))
 
     #### 'IPluginManager' interface ###########################################
 
@@ -98,6 +100,13 @@ class Application(HasTraits):
     # The import manager.
     _import_manager = Instance(IImportManager, factory=ImportManager)
 
+    # The contents of each persistent preferences scope when the application
+    # was created (i.e. just after the scopes were loaded) or when it was last
+    # saved (used to save only the scopes that have changed).
+    #
+    # { scope_name : { node_path : { key : value } } }
+    _preferences_snapshots = Dict
+
     ###########################################################################
     # 'object' interface.
     ###########################################################################
@@ -126,8 +135,14 @@ class Application(HasTraits):
         # be used as more convenient ways to access preferences.
         #
         # fixme: This is another sneaky global!
+        from apptools.preferences.api import set_default_preferences
         set_default_preferences(self.preferences)
 
+        # Remember what the preferences were when they were loaded so that we
+        # only save the ones that have changed when we stop (including any
+        # that are changed before we start).
+        self._take_preferences_snapshots()
+
         # We allow the caller to specify an initial list of plugins, but the
         # list itself is not part of the public API. To add and remove plugins
         # after construction, use the 'add_plugin' and 'remove_plugin' methods
@@ -165,6 +180,9 @@ class Application(HasTraits):
     def _preferences_default(self):
         """ Trait initializer. """
 
+        # Enthought library imports.
+        from apptools.preferences.api import ScopedPreferences
+
         return ScopedPreferences()
 
     #### Methods ##############################################################
@@ -248,6 +266,11 @@ class Application(HasTraits):
 
         return self._import_manager.import_symbol(symbol_path)
 
+    def lazy_import_symbol(self, symbol_path):
+        """ Return a proxy for the symbol defined by the symbol path. """
+
+        return self._import_manager.lazy_import_symbol(symbol_path)
+
     ###########################################################################
     # 'IPluginManager' interface.
     ###########################################################################
@@ -293,10 +316,10 @@ class Application(HasTraits):
         if not event.veto:
             # Start the plugin manager (this starts all of the manager's
             # plugins).
-            self.plugin_manager.start()
+            self._start_plugins()
 
             # Lifecycle event.
-            self.started = self._create_application_event()
+            self.started = self._create_application_event(vetoable=False)
 
             logger.debug('---------- application started ----------')
 
@@ -327,13 +350,13 @@ class Application(HasTraits):
         if not event.veto:
             # Stop the plugin manager (this stops all of the manager's
             # plugins).
-            self.plugin_manager.stop()
+            self._stop_plugins()
 
-            # Save all preferences.
-            self.preferences.save()
+            # Save any preferences that have changed.
+            self._save_preferences()
 
             # Lifecycle event.
-            self.stopped = self._create_application_event()
+            self.stopped = self._create_application_event(vetoable=False)
 
             logger.debug('---------- application stopped ----------')
 
@@ -370,11 +393,12 @@ class Application(HasTraits):
 
         return self.service_registry.get_service_properties(service_id)
 
-    def get_services(self, protocol, query='', minimize='', maximize=''):
+    def get_services(self, protocol, query='', minimize='', maximize='',
+                     limit=None):
         """ Return all services that match the specified query. """
 
         services = self.service_registry.get_services(
-            protocol, query, minimize, maximize
+            protocol, query, minimize, maximize, limit
         )
 
         return services
@@ -438,6 +462,122 @@ class Application(HasTraits):
 
         return ServiceRegistry()
 
+    #### Methods ##############################################################
+
+    def load_startup_snapshot(self, path):
+        """ Load a startup snapshot to speed up a 'warm' start.
+
+        This must be called *before* the application is started. If the
+        snapshot is valid (i.e. it was saved with the same plugins in the same
+        order), then the extension registry takes the contributions of every
+        plugin that has not changed since the snapshot was saved from the
+        snapshot instead of evaluating them live.
+
+        Returns True if the snapshot was used, otherwise False (e.g. if the
+        file does not exist or the plugins have changed).
+
+        """
+
+        from plugin_extension_registry import PluginExtensionRegistry
+        from startup_snapshot import StartupSnapshot
+
+        # Only the default extension registry knows about snapshots.
+        if not isinstance(self.extension_registry, PluginExtensionRegistry):
+            return False
+
+        snapshot = StartupSnapshot.load(path)
+        if snapshot is None or not snapshot.validate(self):
+            logger.debug('startup snapshot <%s> not used', path)
+            return False
+
+        self.extension_registry.snapshot = snapshot
+
+        return True
+
+    def reload_plugin(self, plugin_id, modules=None):
+        """ Reload a plugin without restarting the application.
+
+        The module that defines the plugin's class is reloaded, along with
+        any other modules named in 'modules' (e.g. modules in the plugin's
+        package that have changed). The modules are reloaded in dependency
+        order. A new instance of the plugin is then created by the plugin
+        manager that found the old one.
+
+        Only when the new plugin has been created is the old one stopped
+        (which unregisters its services and disconnects its extension point
+        listeners). The new plugin then takes the old one's place and is
+        started. If that fails then the old plugin is put back and
+        restarted.
+
+        Listeners to extension points are only told about the contributions
+        that actually changed.
+
+        Returns the new plugin. Raise a 'ValueError' if no such plugin exists.
+
+        """
+
+        from reload_utils import reload_modules
+
+        old = self.get_plugin(plugin_id)
+        if old is None:
+            raise ValueError('no such plugin %s' % plugin_id)
+
+        logger.debug('plugin %s reloading', plugin_id)
+
+        module_names = [type(old).__module__] + list(modules or [])
+        reload_modules([sys.modules[name] for name in module_names])
+
+        # The old plugin is left running until we know that we have a
+        # replacement for it.
+        create_plugin = getattr(self.plugin_manager, 'create_plugin', None)
+        if create_plugin is not None:
+            new = create_plugin(old)
+
+        else:
+            from reload_utils import get_reloaded_class
+
+            new = get_reloaded_class(old)(application=self, id=old.id)
+
+        if new.id != old.id:
+            raise ValueError(
+                'reloaded plugin has id %s not %s' % (new.id, old.id)
+            )
+
+        new.application = self
+
+        self.stop_plugin(old)
+        try:
+            self._swap_plugins(old, new)
+            try:
+                self.start_plugin(new)
+
+            except:
+                self._swap_plugins(new, old)
+                raise
+
+        except:
+            logger.exception('plugin %s reload failed', plugin_id)
+            self.start_plugin(old)
+            raise
+
+        logger.debug('plugin %s reloaded', plugin_id)
+
+        return new
+
+    def save_startup_snapshot(self, path):
+        """ Save a startup snapshot for use in subsequent 'warm' starts.
+
+        The snapshot contains the order of the application's plugins and every
+        plugin's (picklable) contributions to every extension point.
+
+        """
+
+        from startup_snapshot import StartupSnapshot
+
+        StartupSnapshot.from_application(self).save(path)
+
+        return
+
     ###########################################################################
     # Private interface.
     ###########################################################################
@@ -473,10 +613,79 @@ class Application(HasTraits):
 
     #### Methods ##############################################################
 
-    def _create_application_event(self):
-        """ Create an application event. """
+    def _create_application_event(self, vetoable=True):
+        """ Create an application event.
+
+        Events that can't be vetoed don't need to be 'HasTraits' objects, so
+        a lightweight event is used for those.
 
-        return ApplicationEvent(application=self)
+        """
+
+        if vetoable:
+            event = ApplicationEvent(application=self)
+
+        else:
+            event = LightweightApplicationEvent(application=self)
+
+        return event
+
+    def _get_persistent_preferences_scopes(self):
+        """ Return the preferences scopes that are saved to files.
+
+        Returns a list of tuples in the form (scope, filename), or None if
+        the preferences are not scoped or if it is not known where a scope is
+        saved.
+
+        """
+
+        preferences = self.preferences
+
+        scopes = getattr(preferences, 'scopes', None)
+        if scopes is None or len(scopes) == 0:
+            return None
+
+        if len(preferences.primary_scope_name) > 0:
+            primary = preferences.get_scope(preferences.primary_scope_name)
+
+        else:
+            primary = scopes[0]
+
+        persistent_scopes = []
+        for scope in scopes:
+            filename = getattr(scope, 'filename', None)
+            if filename is None:
+                return None
+
+            # The primary scope is saved to the preferences' own file if it
+            # has one (see 'ScopedPreferences.save').
+            if scope is primary and len(preferences.filename) > 0:
+                filename = preferences.filename
+
+            if len(filename) > 0:
+                persistent_scopes.append((scope, filename))
+
+        return persistent_scopes
+
+    def _get_preferences_snapshot(self, node):
+        """ Return a copy of the contents of a preferences node.
+
+        Returns a dictionary in the form::
+
+            { node_path : { key : value } }
+
+        """
+
+        snapshot = {}
+
+        nodes = [('', node)]
+        while len(nodes) > 0:
+            path, node = nodes.pop()
+            snapshot[path] = dict((key, node.get(key)) for key in node.keys())
+
+            for name in node.node_names():
+                nodes.append((path + '.' + name, node.node(name)))
+
+        return snapshot
 
     def _initialize_application_home(self):
         """ Initialize the application home directory. """
@@ -491,4 +700,68 @@ class Application(HasTraits):
 
         return
 
+    def _save_preferences(self):
+        """ Save the preferences scopes that have changed. """
+
+        scopes = self._get_persistent_preferences_scopes()
+        if scopes is None:
+            self.preferences.save()
+            return
+
+        for scope, filename in scopes:
+            snapshot = self._get_preferences_snapshot(scope)
+            if snapshot != self._preferences_snapshots.get(scope.name):
+                logger.debug('saving preferences scope %s', scope.name)
+                scope.save(filename)
+
+                self._preferences_snapshots[scope.name] = snapshot
+
+        return
+
+    def _start_plugins(self):
+        """ Start the plugin manager (and hence all of its plugins). """
+
+        self.plugin_manager.start()
+
+        return
+
+    def _stop_plugins(self):
+        """ Stop the plugin manager (and hence all of its plugins). """
+
+        self.plugin_manager.stop()
+
+        return
+
+    def _swap_plugins(self, old, new):
+        """ Put one plugin in the place of another. """
+
+        # If the plugin manager and extension registry support it then replace
+        # the plugin in place, otherwise remove the old plugin and add the new
+        # one.
+        replace_plugin   = getattr(self.plugin_manager, 'replace_plugin', None)
+        replace_provider = getattr(
+            self.extension_registry, 'replace_provider', None
+        )
+        if replace_plugin is not None and replace_provider is not None:
+            replace_plugin(old, new)
+            replace_provider(old, new)
+
+        else:
+            self.remove_plugin(old)
+            self.add_plugin(new)
+
+        return
+
+    def _take_preferences_snapshots(self):
+        """ Take a snapshot of each persistent preferences scope. """
+
+        scopes = self._get_persistent_preferences_scopes()
+        if scopes is not None:
+            self._preferences_snapshots = dict(
+                (scope.name, self._get_preferences_snapshot(scope))
+                for scope, filename in scopes
+            )
+
+        return
+
 #### EOF ######################################################################
@@ -11,4 +11,30 @@ class ApplicationEvent(Vetoable):
     # The application that the event is for.
     application = Instance('envisage.api.IApplication')
 
+
+class LightweightApplicationEvent(object):
+    """ An application event that is a plain object with slots.
+
+    This has the same attributes as an 'ApplicationEvent' but is much cheaper
+    to create. It is used when nothing needs to observe the traits of the
+    event itself (e.g. the 'started' and 'stopped' events, which can't be
+    vetoed).
+
+    """
+
+    __slots__ = ('application', 'veto')
+
+    def __init__(self, application=None, veto=False):
+        """ Constructor. """
+
+        self.application = application
+        self.veto        = veto
+
+        return
+
+    def __repr__(self):
+        """ Return a string representation of the event. """
+
+        return 'LightweightApplicationEvent(application=%r)' % self.application
+
 #### EOF ######################################################################
@@ -0,0 +1,244 @@
+""" A non-GUI application with an asyncio event loop.
+
+Nothing is imported from asyncio until the application is started so this
+module can safely live in the Envisage core without asyncio being available
+(on Python 2 the 'trollius' backport is used if it is installed).
+
+"""
+
+
+# Standard library imports.
+import logging, threading
+
+# Enthought library imports.
+from envisage.api import Application, IApplication
+from traits.api import Any, Instance
+
+# Local imports.
+from asyncio_plugin_activator import AsyncioPluginActivator
+from asyncio_utils import create_future, get_event_loop, import_asyncio
+from plugin_activator import PluginActivator
+from plugin_extension_registry import PluginExtensionRegistry
+from service_registry import ServiceRegistry
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+class AsyncioApplication(Application):
+    """ A non-GUI application with an asyncio event loop.
+
+    'start' starts the plugins and then runs the event loop until the
+    application is stopped.
+
+    A plugin's 'start' and 'stop' methods can be asynchronous (i.e. return
+    an awaitable), in which case the starts (and stops) of all of the
+    plugins run concurrently in the loop, and the 'started' (and 'stopped')
+    event is only fired when they have all completed. This is done for any
+    plugin that uses the default plugin activator.
+
+    Extension point and service registry listeners are always called in the
+    event loop's thread, whichever thread the change is made in.
+
+    """
+
+    #### 'AsyncioApplication' interface #######################################
+
+    # The event loop (by default, the current event loop).
+    loop = Any
+
+    # The activator used for plugins that use the default plugin activator.
+    plugin_activator = Instance(AsyncioPluginActivator)
+
+    #### Private interface ####################################################
+
+    # The thread that the application was started in (and hence that the
+    # event loop runs in). This is None when the application is not running.
+    _loop_thread = Any
+
+    # A future that is completed when the application is asked to stop. This
+    # is None when the application is not running.
+    _stop_future = Any
+
+    ###########################################################################
+    # 'IApplication' interface.
+    ###########################################################################
+
+    def start(self):
+        """ Start the application.
+
+        This only returns once the application has been stopped (or if the
+        start was vetoed).
+
+        """
+
+        import_asyncio().set_event_loop(self.loop)
+
+        # The application can be asked to stop whilst it is still starting
+        # (e.g. by a plugin), so we are ready for that before we start.
+        self._loop_thread = threading.current_thread()
+        self._stop_future = create_future(self.loop)
+        try:
+            started = super(AsyncioApplication, self).start()
+
+            # Don't start the event loop if the start was vetoed.
+            stopped = not started
+            while not stopped:
+                logger.debug('---------- event loop starting ----------')
+                self.loop.run_until_complete(self._stop_future)
+                logger.debug('---------- event loop stopped ----------')
+
+                # If the stop is vetoed then the loop carries on.
+                self._stop_future = create_future(self.loop)
+                stopped = super(AsyncioApplication, self).stop()
+
+        finally:
+            self._loop_thread = None
+            self._stop_future = None
+
+        return started
+
+    def stop(self):
+        """ Stop the application.
+
+        If the application is running then this just stops the event loop,
+        and the application is stopped when 'start' regains control. In that
+        case this always returns True, and if the stop is then vetoed the
+        loop is run again.
+
+        """
+
+        if self._stop_future is not None:
+            self.call_in_loop_thread(self._stop_loop)
+            stopped = True
+
+        else:
+            stopped = super(AsyncioApplication, self).stop()
+
+        return stopped
+
+    ###########################################################################
+    # 'AsyncioApplication' interface.
+    ###########################################################################
+
+    def call_in_loop_thread(self, callable, *args):
+        """ Call a callable in the event loop's thread.
+
+        If this is called in the loop's thread (or the application is not
+        running) then the callable is called immediately, otherwise it is
+        called when the loop next gets the chance.
+
+        """
+
+        loop_thread = self._loop_thread
+        if loop_thread is None or loop_thread is threading.current_thread():
+            callable(*args)
+
+        else:
+            self.loop.call_soon_threadsafe(callable, *args)
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    #### Trait initializers ###################################################
+
+    def _extension_registry_default(self):
+        """ Trait initializer. """
+
+        return AsyncioExtensionRegistry(plugin_manager=self)
+
+    def _loop_default(self):
+        """ Trait initializer. """
+
+        return get_event_loop()
+
+    def _plugin_activator_default(self):
+        """ Trait initializer. """
+
+        return AsyncioPluginActivator(loop=self.loop)
+
+    def _service_registry_default(self):
+        """ Trait initializer. """
+
+        return AsyncioServiceRegistry(application=self)
+
+    #### Methods ##############################################################
+
+    def _start_plugins(self):
+        """ Start the plugin manager (and hence all of its plugins). """
+
+        # We can only wait for plugins that we start ourselves (plugins with
+        # their own activator are started synchronously as usual).
+        for plugin in self.plugin_manager:
+            if type(plugin.activator) is PluginActivator:
+                plugin.activator = self.plugin_activator
+
+        super(AsyncioApplication, self)._start_plugins()
+        self.plugin_activator.wait()
+
+        return
+
+    def _stop_plugins(self):
+        """ Stop the plugin manager (and hence all of its plugins). """
+
+        super(AsyncioApplication, self)._stop_plugins()
+        self.plugin_activator.wait()
+
+        return
+
+    def _stop_loop(self):
+        """ Stop the event loop so that 'start' can stop the application. """
+
+        stop_future = self._stop_future
+        if stop_future is not None and not stop_future.done():
+            stop_future.set_result(None)
+
+        return
+
+
+class AsyncioExtensionRegistry(PluginExtensionRegistry):
+    """ An extension registry that calls listeners in the loop's thread. """
+
+    ###########################################################################
+    # Protected 'ExtensionRegistry' interface.
+    ###########################################################################
+
+    def _call_listeners(self, refs, extension_point_id, added, removed, index):
+        """ Call listeners that are listening to an extension point. """
+
+        # The plugin manager is the application.
+        self.plugin_manager.call_in_loop_thread(
+            super(AsyncioExtensionRegistry, self)._call_listeners,
+            refs, extension_point_id, added, removed, index
+        )
+
+        return
+
+
+class AsyncioServiceRegistry(ServiceRegistry):
+    """ A service registry that calls listeners in the loop's thread. """
+
+    #### 'AsyncioServiceRegistry' interface ###################################
+
+    # The application that the registry belongs to.
+    application = Instance(IApplication)
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _notify_listeners(self, trait_name, service_id):
+        """ Fire the 'registered' or 'unregistered' event. """
+
+        self.application.call_in_loop_thread(
+            super(AsyncioServiceRegistry, self)._notify_listeners,
+            trait_name, service_id
+        )
+
+        return
+
+#### EOF ######################################################################
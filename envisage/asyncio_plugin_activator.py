@@ -0,0 +1,124 @@
+""" A plugin activator for plugins that start and stop asynchronously. """
+
+
+# Enthought library imports.
+from traits.api import Any, List
+
+# Local imports.
+from asyncio_utils import as_future, import_asyncio
+from plugin_activator import PluginActivator
+
+
+class AsyncioPluginActivator(PluginActivator):
+    """ A plugin activator for plugins that start and stop asynchronously.
+
+    If a plugin's 'start' or 'stop' method returns an awaitable (e.g. it is
+    an 'async def' method) then it is scheduled in the activator's event loop
+    instead of being waited for, so the starts (or stops) of all of the
+    plugins run concurrently. Use 'wait' to wait for them to complete.
+
+    A plugin's services are unregistered (and its extension point traits
+    disconnected) only when its 'stop' has completed.
+
+    """
+
+    #### 'AsyncioPluginActivator' interface ###################################
+
+    # The event loop that asynchronous starts and stops are scheduled in.
+    loop = Any
+
+    #### Private interface ####################################################
+
+    # The futures of the starts and stops that have not completed yet.
+    _pending = List
+
+    ###########################################################################
+    # 'IPluginActivator' interface.
+    ###########################################################################
+
+    def start_plugin(self, plugin):
+        """ Start the specified plugin. """
+
+        # Connect all of the plugin's extension point traits so that the plugin
+        # will be notified if and when contributions are added or removed.
+        plugin.connect_extension_point_traits()
+
+        # Register all services.
+        plugin.register_services()
+
+        # Plugin specific start.
+        self._schedule(plugin.start())
+
+        return
+
+    def stop_plugin(self, plugin):
+        """ Stop the specified plugin. """
+
+        # Plugin specific stop.
+        future = self._schedule(plugin.stop())
+        if future is not None:
+            future.add_done_callback(
+                lambda future: self._plugin_stopped(plugin)
+            )
+
+        else:
+            self._plugin_stopped(plugin)
+
+        return
+
+    ###########################################################################
+    # 'AsyncioPluginActivator' interface.
+    ###########################################################################
+
+    def wait(self):
+        """ Wait for all pending starts and stops to complete.
+
+        This runs the event loop until they have, so it must not be called
+        whilst the loop is running. If any of them failed then the first
+        exception is raised (once they have all completed).
+
+        """
+
+        pending = self._pending[:]
+        if len(pending) > 0:
+            asyncio = import_asyncio()
+            results = self.loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _plugin_stopped(self, plugin):
+        """ Called when a plugin's 'stop' has completed. """
+
+        # Unregister all service.
+        plugin.unregister_services()
+
+        # Disconnect all of the plugin's extension point traits.
+        plugin.disconnect_extension_point_traits()
+
+        return
+
+    def _schedule(self, result):
+        """ Schedule the result of a plugin's 'start' or 'stop'.
+
+        Returns a future if the result is awaitable, otherwise None.
+
+        """
+
+        future = as_future(result, self.loop)
+        if future is not None:
+            self._pending.append(future)
+            future.add_done_callback(self._pending.remove)
+
+        return future
+
+#### EOF ######################################################################
@@ -0,0 +1,71 @@
+""" Utility functions for working with 'asyncio' event loops.
+
+On Python 2 'asyncio' does not exist, so these fall back to 'trollius' (its
+Python 2 backport) if it is installed. The import is only done when the
+functions are called, so nothing here is needed unless asyncio is used.
+
+"""
+
+
+def import_asyncio():
+    """ Import and return the 'asyncio' module (or 'trollius').
+
+    Raise an 'ImportError' if neither is available.
+
+    """
+
+    try:
+        import asyncio
+
+    except ImportError:
+        import trollius as asyncio
+
+    return asyncio
+
+
+def as_future(obj, loop):
+    """ Return a future for an awaitable object (or None if it isn't one).
+
+    Coroutines are scheduled to run in the event loop.
+
+    """
+
+    if obj is None:
+        return None
+
+    asyncio = import_asyncio()
+    is_awaitable = (
+        asyncio.iscoroutine(obj) or isinstance(obj, asyncio.Future)
+        or hasattr(obj, '__await__')
+    )
+
+    if is_awaitable:
+        future = asyncio.ensure_future(obj, loop=loop)
+
+    else:
+        future = None
+
+    return future
+
+def create_future(loop):
+    """ Create a future attached to an event loop. """
+
+    create_future = getattr(loop, 'create_future', None)
+    if create_future is not None:
+        future = create_future()
+
+    else:
+        future = import_asyncio().Future(loop=loop)
+
+    return future
+
+
+def get_event_loop(loop=None):
+    """ Return the event loop to use (the current one if 'loop' is None). """
+
+    if loop is None:
+        loop = import_asyncio().get_event_loop()
+
+    return loop
+
+#### EOF ######################################################################
@@ -2,18 +2,178 @@
 
 
 # Standard library imports.
-import sys
+import sys, threading
 
 # Enthought library imports.
 from traits.api import Callable, HasTraits, MetaHasTraits, Str
 
 
+class ClassLoadHookDispatcher(object):
+    """ Calls class load hooks when their classes are loaded.
+
+    Rather than each hook registering its own listener with 'MetaHasTraits',
+    the dispatcher keeps a dictionary of the hooks waiting for each class and
+    registers one listener for each class name (so creating any other class
+    costs nothing). The hooks are removed as soon as their class has been
+    loaded.
+
+    'MetaHasTraits' calls the listeners for a class by iterating over the
+    list that 'remove_listener' removes from, so a listener can't be removed
+    whilst its class is being created (that would skip the next listener).
+    Instead, listeners that are no longer needed are removed the next time
+    that hooks are added or removed.
+
+    """
+
+    def __init__(self):
+        """ Constructor. """
+
+        # The hooks waiting for each class to be loaded.
+        #
+        # { class_name : [hook, ...] }
+        self._hooks = {}
+
+        # The names of the classes that the dispatcher has a 'MetaHasTraits'
+        # listener registered for.
+        self._listening = set()
+
+        # The names of the classes whose listeners are no longer needed (and
+        # are removed by '_remove_finished_listeners').
+        self._finished = set()
+
+        # The names of the classes that are being created right now (their
+        # listeners must not be removed yet).
+        self._creating = set()
+
+        # The lock that protects the hooks and the listeners.
+        self._lock = threading.RLock()
+
+        return
+
+    def add_hooks(self, hooks):
+        """ Add class load hooks.
+
+        Any hooks whose class has already been loaded are called immediately
+        (and are not added).
+
+        """
+
+        loaded = []
+        with self._lock:
+            self._remove_finished_listeners()
+
+            class_names = []
+            for hook in hooks:
+                if hook.class_name not in self._hooks:
+                    class_names.append(hook.class_name)
+
+                self._hooks.setdefault(hook.class_name, []).append(hook)
+
+            # We only need to look for each class once.
+            for class_name in class_names:
+                pending = self._hooks[class_name]
+
+                cls = pending[0]._get_class(class_name)
+                if cls is not None:
+                    loaded.append((cls, self._hooks.pop(class_name)))
+
+                else:
+                    self._add_listener(class_name)
+
+        for cls, pending in loaded:
+            for hook in pending:
+                hook.on_class_loaded(cls)
+
+        return
+
+    def remove_hook(self, hook):
+        """ Remove a class load hook (if it hasn't been called yet). """
+
+        with self._lock:
+            pending = self._hooks.get(hook.class_name, [])
+            if hook in pending:
+                pending.remove(hook)
+                if len(pending) == 0:
+                    del self._hooks[hook.class_name]
+                    self._finished.add(hook.class_name)
+
+            self._remove_finished_listeners()
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _add_listener(self, class_name):
+        """ Make sure that we are listening for a class being created.
+
+        This must be called with the lock held.
+
+        """
+
+        # A listener that is no longer needed may not have been removed yet,
+        # in which case it is needed again!
+        self._finished.discard(class_name)
+        if class_name not in self._listening:
+            MetaHasTraits.add_listener(self._on_class_created, class_name)
+            self._listening.add(class_name)
+
+        return
+
+    def _on_class_created(self, cls):
+        """ Called when a class that hooks are waiting for is created. """
+
+        class_name = '%s.%s' % (cls.__module__, cls.__name__)
+        with self._lock:
+            pending = self._hooks.pop(class_name, None)
+            if pending is None:
+                return
+
+            self._finished.add(class_name)
+            self._creating.add(class_name)
+
+        try:
+            for hook in pending:
+                hook.on_class_loaded(cls)
+
+        finally:
+            with self._lock:
+                self._creating.discard(class_name)
+
+        return
+
+    def _remove_finished_listeners(self):
+        """ Remove the listeners that are no longer needed.
+
+        This must be called with the lock held.
+
+        """
+
+        for class_name in self._finished - self._creating:
+            if class_name in self._listening:
+                MetaHasTraits.remove_listener(
+                    self._on_class_created, class_name
+                )
+                self._listening.discard(class_name)
+
+            self._finished.discard(class_name)
+
+        return
+
+
+# The dispatcher used by all class load hooks.
+class_load_hook_dispatcher = ClassLoadHookDispatcher()
+
+
 class ClassLoadHook(HasTraits):
     """ A hook to allow code to be executed when a class is loaded.
 
     If the class is *already* loaded when the 'connect' method is called then
     the code is executed immediately.
 
+    A hook is only called once, and is disconnected as soon as it has been.
+
     """
 
     #### 'ClassLoadHook' interface ############################################
@@ -36,19 +196,16 @@ class ClassLoadHook(HasTraits):
     def connect(self):
         """ Connect the load hook to listen for the class being loaded. """
 
-        MetaHasTraits.add_listener(self.on_class_loaded, self.class_name)
-
-        # If the class has already been loaded then run the code now!
-        cls = self._get_class(self.class_name)
-        if cls is not None:
-            self.on_class_loaded(cls)
+        # If the class has already been loaded then the dispatcher runs the
+        # code now!
+        class_load_hook_dispatcher.add_hooks([self])
 
         return
 
     def disconnect(self):
         """ Disconnect the load hook. """
 
-        MetaHasTraits.remove_listener(self.on_class_loaded, self.class_name)
+        class_load_hook_dispatcher.remove_hook(self)
 
         return
 
@@ -5,14 +5,15 @@
 import logging
 
 # Enthought library imports.
-from traits.api import Event, HasTraits, Instance, List, implements
-from traits.api import on_trait_change
+from traits.api import Bool, Dict, Either, Event, HasTraits, Instance, Int
+from traits.api import List
+from traits.api import implements, on_trait_change
 
 # Local imports.
 from i_application import IApplication
 from i_plugin import IPlugin
 from i_plugin_manager import IPluginManager
-from plugin_event import PluginEvent
+from plugin_event import LightweightPluginEvent, PluginEvent
 from plugin_manager import PluginManager
 
 
@@ -41,10 +42,10 @@ class CompositePluginManager(HasTraits):
     #### Events ####
 
     # Fired when a plugin has been added to the manager.
-    plugin_added = Event(PluginEvent)
+    plugin_added = Event(Either(PluginEvent, LightweightPluginEvent))
 
     # Fired when a plugin has been removed from the manager.
-    plugin_removed = Event(PluginEvent)
+    plugin_removed = Event(Either(PluginEvent, LightweightPluginEvent))
 
     #### 'CompositePluginManager' protocol #####################################
 
@@ -71,61 +72,171 @@ class CompositePluginManager(HasTraits):
         for plugin_manager in added:
             plugin_manager.application = self.application
 
+        self._invalidate_plugins()
+
+    # The plugin manager that plugins added via 'add_plugin' are delegated to.
+    #
+    # If this is not set then the first plugin manager in 'plugin_managers' is
+    # used.
+    default_plugin_manager = Instance(PluginManager)
+
     @on_trait_change('plugin_managers:plugin_added')
     def _plugin_added(self, obj, trait_name, old, new):
+        if self._plugins_valid and obj._include_plugin(new.plugin.id):
+            self._insert_plugin(obj, new.plugin)
+
         self.plugin_added = new
 
     @on_trait_change('plugin_managers:plugin_removed')
     def _plugin_removed(self, obj, trait_name, old, new):
+        if self._plugins_valid:
+            self._remove_plugin(obj, new.plugin)
+
         self.plugin_removed = new
-        
+
+    @on_trait_change('plugin_managers:_plugins')
+    def _plugin_manager_plugins_changed(self, obj, trait_name, old, new):
+        # Adding or removing a single plugin also fires '_plugins_items', but
+        # those changes are handled incrementally by the 'plugin_added' and
+        # 'plugin_removed' handlers, so we only rebuild the merged view if
+        # the whole list is replaced.
+        if trait_name == '_plugins':
+            self._invalidate_plugins()
+
+    @on_trait_change('plugin_managers:[exclude,include]')
+    def _plugin_manager_filters_changed(self):
+        self._invalidate_plugins()
+
     #### Private protocol ######################################################
 
-    # The plugins that the manager manages!
+    # The merged view of the plugins that the manager manages!
+    #
+    # The plugins are ordered by plugin manager, and then by the order of the
+    # plugins within each manager. The view is built lazily and then kept up to
+    # date incrementally by the 'plugin_added' and 'plugin_removed' events
+    # fired by the individual plugin managers.
     _plugins = List(IPlugin)
     def __plugins_default(self):
         plugins = []
+        plugin_counts = []
         for plugin_manager in self.plugin_managers:
+            count = 0
             for plugin in plugin_manager:
                 plugins.append(plugin)
+                count += 1
+
+            plugin_counts.append(count)
+
+        self._plugin_counts = plugin_counts
+        self._plugins_valid = True
 
         return plugins
 
+    # The plugins in the merged view, keyed by their Id.
+    #
+    # If more than one plugin has the same Id then the first one in the merged
+    # view wins (just like a linear search).
+    _plugins_by_id = Dict
+    def __plugins_by_id_default(self):
+        plugins_by_id = {}
+        for plugin in self._plugins:
+            plugins_by_id.setdefault(plugin.id, plugin)
+
+        return plugins_by_id
+
+    # How many of the plugins in the merged view came from each plugin manager
+    # (in the same order as 'plugin_managers').
+    _plugin_counts = List(Int)
+
+    # Is the merged view up to date?
+    _plugins_valid = Bool(False)
+
     #### 'object' protocol ####################################################
 
     def __iter__(self):
         """ Return an iterator over the manager's plugins. """
 
-        plugins = []
-        for plugin_manager in self.plugin_managers:
-            for plugin in plugin_manager:
-                plugins.append(plugin)
-
-        return iter(plugins)
+        return iter(self._plugins)
 
     #### 'IPluginManager' protocol #############################################
 
     def add_plugin(self, plugin):
-        """ Add a plugin to the manager. """
+        """ Add a plugin to the manager.
+
+        The plugin is actually added to the 'default_plugin_manager' (or the
+        first plugin manager if no default has been set).
+
+        """
 
-        raise NotImplementedError
+        plugin_manager = self.default_plugin_manager
+        if plugin_manager is None:
+            if len(self.plugin_managers) == 0:
+                raise ValueError('no plugin manager to add plugin to')
+
+            plugin_manager = self.plugin_managers[0]
+
+        plugin_manager.add_plugin(plugin)
+
+        return
+
+    def create_plugin(self, plugin):
+        """ Create a new instance of a plugin in the manager.
+
+        The plugin is created by whichever plugin manager contains it.
+
+        """
+
+        for plugin_manager in self.plugin_managers:
+            if plugin_manager.get_plugin(plugin.id) is plugin:
+                return plugin_manager.create_plugin(plugin)
+
+        raise ValueError('plugin %s is not in the manager' % plugin.id)
 
     def get_plugin(self, plugin_id):
         """ Return the plugin with the specified Id. """
 
-        for plugin in self:
-            if plugin_id == plugin.id:
+        return self._plugins_by_id.get(plugin_id)
+
+    def remove_plugin(self, plugin):
+        """ Remove a plugin from the manager.
+
+        The plugin is removed from whichever plugin manager contains it.
+
+        """
+
+        for plugin_manager in self.plugin_managers:
+            if plugin_manager.get_plugin(plugin.id) is plugin:
+                plugin_manager.remove_plugin(plugin)
                 break
 
         else:
-            plugin = None
+            raise ValueError('plugin %s is not in the manager' % plugin.id)
 
-        return plugin
+        return
 
-    def remove_plugin(self, plugin):
-        """ Remove a plugin from the manager. """
+    def replace_plugin(self, old, new):
+        """ Replace a plugin with another (e.g. a reloaded version of it).
+
+        The plugin is replaced in whichever plugin manager contains it. Note
+        that no 'plugin_added' or 'plugin_removed' events are fired.
 
-        raise NotImplementedError
+        """
+
+        for plugin_manager in self.plugin_managers:
+            if plugin_manager.get_plugin(old.id) is old:
+                plugin_manager.replace_plugin(old, new)
+                break
+
+        else:
+            raise ValueError('plugin %s is not in the manager' % old.id)
+
+        if self._plugins_valid:
+            self._plugins[self._plugins.index(old)] = new
+            if self._plugins_by_id.get(old.id) is old:
+                del self._plugins_by_id[old.id]
+                self._plugins_by_id[new.id] = new
+
+        return
 
     def start(self):
         """ Start the plugin manager. """
@@ -173,4 +284,57 @@ class CompositePluginManager(HasTraits):
 
         return
 
+    #### Private protocol ######################################################
+
+    def _insert_plugin(self, plugin_manager, plugin):
+        """ Insert a plugin added to a plugin manager into the merged view. """
+
+        manager_index = self.plugin_managers.index(plugin_manager)
+
+        # Plugin managers add new plugins to the end of their own list, so the
+        # plugin goes at the end of its manager's block in the merged view.
+        index = sum(self._plugin_counts[:manager_index + 1])
+        self._plugins.insert(index, plugin)
+        self._plugin_counts[manager_index] += 1
+
+        # Only index the plugin if it wasn't shadowed by a plugin with the same
+        # Id that appears earlier in the merged view.
+        existing = self._plugins_by_id.get(plugin.id)
+        if existing is None or self._plugins.index(existing) > index:
+            self._plugins_by_id[plugin.id] = plugin
+
+        return
+
+    def _invalidate_plugins(self):
+        """ Throw away the merged view (it is rebuilt on the next access). """
+
+        self._plugins_valid = False
+        self.reset_traits(['_plugin_counts', '_plugins_by_id', '_plugins'])
+
+        return
+
+    def _remove_plugin(self, plugin_manager, plugin):
+        """ Remove a plugin removed from a plugin manager from the view. """
+
+        # The plugin may not be in the view (e.g. if it was excluded by the
+        # plugin manager's 'include'/'exclude' lists).
+        if plugin not in self._plugins:
+            return
+
+        manager_index = self.plugin_managers.index(plugin_manager)
+
+        self._plugins.remove(plugin)
+        self._plugin_counts[manager_index] -= 1
+
+        # If the plugin was indexed then another plugin with the same Id may
+        # now be visible.
+        if self._plugins_by_id.get(plugin.id) is plugin:
+            del self._plugins_by_id[plugin.id]
+            for other in self._plugins:
+                if other.id == plugin.id:
+                    self._plugins_by_id[plugin.id] = other
+                    break
+
+        return
+
 #### EOF ######################################################################
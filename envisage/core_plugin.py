@@ -1,9 +1,22 @@
 """ The Envisage core plugin. """
 
 
+# Standard library imports.
+import logging, marshal, os
+
 # Enthought library imports.
 from envisage.api import ExtensionPoint, Plugin, ServiceOffer
-from traits.api import List, Instance, on_trait_change, Str
+from envisage.file_utils import replace_file
+from traits.api import Any, Bool, Int, List, Instance, on_trait_change, Str
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+# The version of the format of the default preferences cache (change this if
+# the format changes so that old caches are ignored).
+PREFERENCES_CACHE_VERSION = 1
 
 
 class CorePlugin(Plugin):
@@ -180,6 +193,35 @@ class CorePlugin(Plugin):
 
     # None.
 
+    #### 'CorePlugin' interface ###############################################
+
+    # The name of the file that the contributed preferences are cached in
+    # (the default is a file in the application's home directory). The
+    # cache is only used when all of the contributed preferences files are
+    # unchanged. Set this to the empty string to disable the cache.
+    preferences_cache_filename = Str
+
+    # The maximum number of contributed preferences files that are read at
+    # the same time.
+    preferences_workers = Int(8)
+
+    # The number of worker threads used to warm up 'background' service
+    # offers.
+    warmup_workers = Int(4)
+
+    #### Private interface ####################################################
+
+    # Has the application been started?
+    _application_started = Bool(False)
+
+    # The 'background' service offers waiting for the application to start.
+    #
+    # [(service_offer, service_id), ...]
+    _pending_warmups = List
+
+    # The pool of worker threads that warm up 'background' service offers.
+    _warmup_pool = Any
+
     ###########################################################################
     # 'IPlugin' interface.
     ###########################################################################
@@ -189,7 +231,7 @@ class CorePlugin(Plugin):
 
         # Load all contributed preferences files into the application's root
         # preferences node.
-        self._load_preferences(self.preferences)
+        self._load_preferences(self.preferences, use_cache=True)
 
         # Connect all class load hooks.
         self._connect_class_load_hooks(self.class_load_hooks)
@@ -206,18 +248,76 @@ class CorePlugin(Plugin):
         # specific trait!).
         self._service_ids = self._register_service_offers(self.service_offers)
 
+        # 'Background' service offers are warmed up once the application has
+        # started.
+        self.application.on_trait_change(
+            self._on_application_started, 'started'
+        )
+
+        return
+
+    def stop(self):
+        """ Stop the plugin. """
+
+        self.application.on_trait_change(
+            self._on_application_started, 'started', remove=True
+        )
+        self._application_started = False
+        self._pending_warmups     = []
+
+        # Any warm-ups that are already running are allowed to finish, but
+        # those that have not started yet are abandoned.
+        if self._warmup_pool is not None:
+            self._warmup_pool.terminate()
+            self._warmup_pool.join()
+            self._warmup_pool = None
+
         return
 
     ###########################################################################
     # Private interface.
     ###########################################################################
 
+    #### Trait initializers ###################################################
+
+    def _preferences_cache_filename_default(self):
+        """ Trait initializer. """
+
+        if self.application is None:
+            return ''
+
+        return os.path.join(self.application.home, 'default_preferences.cache')
+
+    #### Methods ##############################################################
+
     def _add_category_class_load_hooks(self, categories):
         """ Add class load hooks for a list of categories. """
 
+        # Local imports.
+        from class_load_hook import class_load_hook_dispatcher
+
+        # All of the categories for a class are added by a single hook (in
+        # the order that they were contributed).
+        categories_by_target = {}
+        target_class_names   = []
         for category in categories:
-            class_load_hook = self._create_category_class_load_hook(category)
-            class_load_hook.connect()
+            target_class_name = category.target_class_name
+            if target_class_name not in categories_by_target:
+                target_class_names.append(target_class_name)
+
+            categories_by_target.setdefault(target_class_name, []).append(
+                category
+            )
+
+        class_load_hook_dispatcher.add_hooks(
+            [
+                self._create_category_class_load_hook(
+                    target_class_name, categories_by_target[target_class_name]
+                )
+
+                for target_class_name in target_class_names
+            ]
+        )
 
         return
 
@@ -229,32 +329,79 @@ class CorePlugin(Plugin):
 
         return
 
-    def _create_category_class_load_hook(self, category):
-        """ Create a category class load hook. """
+    def _create_category_class_load_hook(self, target_class_name, categories):
+        """ Create a class load hook for a list of categories.
+
+        All of the categories must have the same target class.
+
+        """
 
         # Local imports.
         from class_load_hook import ClassLoadHook
 
-        def import_and_add_category(cls):
-            """ Import a category and add it to a class.
+        def import_and_add_categories(cls):
+            """ Import the categories and add them to a class.
 
-            This is a closure that binds 'self' and 'category'.
+            This is a closure that binds 'self' and 'categories'.
 
             """
 
-            category_cls = self.application.import_symbol(category.class_name)
-            cls.add_trait_category(category_cls)
+            for category in categories:
+                category_cls = self.application.import_symbol(
+                    category.class_name
+                )
+                cls.add_trait_category(category_cls)
 
             return
 
         category_class_load_hook = ClassLoadHook(
-            class_name = category.target_class_name,
-            on_load    = import_and_add_category
+            class_name = target_class_name,
+            on_load    = import_and_add_categories
         )
 
         return category_class_load_hook
 
-    def _load_preferences(self, preferences):
+    def _add_preferences_to_node(self, node, sections):
+        """ Add preferences sections to a node.
+
+        'sections' is a dictionary in the form::
+
+            { section_name : { key : value } }
+
+        """
+
+        for name, values in sections.iteritems():
+            child = node.node(name)
+            for key, value in values.iteritems():
+                child.set(key, value)
+
+        return
+
+    def _get_preferences_cache_key(self, resource_manager, preferences):
+        """ Return the key for the cache of a list of preferences files.
+
+        The key is a list of tuples in the form (url, mtime). Return None if
+        the modification time of any of the files can't be determined (in
+        which case the files can't be cached).
+
+        """
+
+        key = []
+        for url in preferences:
+            try:
+                mtime = resource_manager.get_mtime(url)
+
+            except Exception:
+                mtime = None
+
+            if mtime is None:
+                return None
+
+            key.append((url, mtime))
+
+        return key
+
+    def _load_preferences(self, preferences, use_cache=False):
         """ Load all contributed preferences into a preferences node. """
 
         # Enthought library imports.
@@ -269,14 +416,113 @@ class CorePlugin(Plugin):
 
         # The resource manager is used to find the preferences files.
         resource_manager = ResourceManager()
-        for resource_name in preferences:
-            f = resource_manager.file(resource_name)
+
+        key = None
+        if use_cache and len(self.preferences_cache_filename) > 0:
+            key = self._get_preferences_cache_key(
+                resource_manager, preferences
+            )
+
+        sections = None
+        if key is not None:
+            sections = self._read_preferences_cache(key)
+
+        if sections is None:
+            sections = self._read_preferences(resource_manager, preferences)
+            if key is not None:
+                self._write_preferences_cache(key, sections)
+
+        self._add_preferences_to_node(default, sections)
+
+        return
+
+    def _read_preferences(self, resource_manager, preferences):
+        """ Read and merge the sections of a list of preferences files.
+
+        Returns a dictionary in the form::
+
+            { section_name : { key : value } }
+
+        """
+
+        # Do the import here so that we only need 'ConfigObj' if there are
+        # preferences files to read.
+        from configobj import ConfigObj
+
+        # The files are read concurrently (so that one slow file doesn't hold
+        # up the rest), but they are merged in the order that they were
+        # contributed since later files can override the values in earlier
+        # ones.
+        results = resource_manager.files(
+            preferences, max_workers=self.preferences_workers
+        )
+
+        sections = {}
+        for f, error in results:
+            if error is not None:
+                raise error
+
+            config_obj = ConfigObj(f, encoding='utf-8')
+            for name, values in config_obj.dict().iteritems():
+                sections.setdefault(name, {}).update(values)
+
+        return sections
+
+    def _read_preferences_cache(self, key):
+        """ Read the cached preferences sections for a cache key.
+
+        Return None if there are no cached sections for the key.
+
+        """
+
+        try:
+            f = file(self.preferences_cache_filename, 'rb')
+
+        except IOError:
+            return None
+
+        try:
+            try:
+                version, cached_key, sections = marshal.load(f)
+
+            except (EOFError, TypeError, ValueError):
+                logger.warn(
+                    'ignoring invalid preferences cache %s',
+                    self.preferences_cache_filename
+                )
+
+                return None
+
+        finally:
+            f.close()
+
+        if version != PREFERENCES_CACHE_VERSION or cached_key != key:
+            return None
+
+        return sections
+
+    def _write_preferences_cache(self, key, sections):
+        """ Write the cached preferences sections for a cache key. """
+
+        # Write to a temporary file and then rename it so that another
+        # instance of the application never reads a partly written cache.
+        filename  = self.preferences_cache_filename
+        temporary = '%s.%d' % (filename, os.getpid())
+        try:
+            data = marshal.dumps((PREFERENCES_CACHE_VERSION, key, sections))
+
+            f = file(temporary, 'wb')
             try:
-                default.load(f)
+                f.write(data)
 
             finally:
                 f.close()
 
+            replace_file(temporary, filename)
+
+        except (IOError, OSError, ValueError):
+            logger.exception('writing preferences cache %s', filename)
+
         return
 
     def _register_service_offers(self, service_offers):
@@ -287,12 +533,82 @@ class CorePlugin(Plugin):
     def _register_service_offer(self, service_offer):
         """ Register a service offer. """
 
+        # Local imports.
+        from service_lifetime import create_service_lifetime_manager
+
+        # Singletons are handled by the service registry itself, but for any
+        # other lifetime we register a manager that creates (or checks out)
+        # an instance of the service each time it is looked up.
+        obj = create_service_lifetime_manager(
+            service_offer.lifetime,
+            service_offer.factory,
+            service_offer.properties
+        )
+        if obj is None:
+            obj = service_offer.factory
+
         service_id = self.application.register_service(
             protocol   = service_offer.protocol,
-            obj        = service_offer.factory,
+            obj        = obj,
             properties = service_offer.properties
         )
 
+        if service_offer.warmup == 'eager':
+            self._warm_up_service_offer(service_offer, service_id)
+
+        elif service_offer.warmup == 'background':
+            if self._application_started:
+                self._submit_warmup(service_offer, service_id)
+
+            else:
+                self._pending_warmups.append((service_offer, service_id))
+
+        else:
+            service_offer._set_warmed_up(True)
+
         return service_id
 
+    def _submit_warmup(self, service_offer, service_id):
+        """ Warm up a service offer in a worker thread. """
+
+        if self._warmup_pool is None:
+            # Do the import here so that we only create threads if there are
+            # any 'background' service offers.
+            from multiprocessing.pool import ThreadPool
+
+            self._warmup_pool = ThreadPool(self.warmup_workers)
+
+        self._warmup_pool.apply_async(
+            self._warm_up_service_offer, (service_offer, service_id)
+        )
+
+        return
+
+    def _warm_up_service_offer(self, service_offer, service_id):
+        """ Create the service for a service offer. """
+
+        try:
+            self.application.get_service_from_id(service_id)
+            service_offer._set_warmed_up(True)
+
+        except Exception:
+            logger.exception('warming up service <%d>', service_id)
+            service_offer._set_warmed_up(False)
+
+        return
+
+    #### Trait change handlers ################################################
+
+    def _on_application_started(self):
+        """ Dynamic trait change handler. """
+
+        self._application_started = True
+
+        pending_warmups = self._pending_warmups
+        self._pending_warmups = []
+        for service_offer, service_id in pending_warmups:
+            self._submit_warmup(service_offer, service_id)
+
+        return
+
 ### EOF ######################################################################
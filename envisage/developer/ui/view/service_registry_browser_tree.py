@@ -35,6 +35,43 @@ class ProtocolModel(HasTraits):
     # All of the services offered for the protocol.
     services = List(ServiceModel)
 
+    # The statistics gathered by the service registry for the protocol (see
+    # 'ServiceRegistry.get_statistics').
+    statistics = Dict
+
+    # The label used in the tree.
+    label = Property(Str, depends_on='name, statistics')
+
+    ###########################################################################
+    # 'ProtocolModel' interface.
+    ###########################################################################
+
+    def _get_label(self):
+        """ Trait property getter. """
+
+        statistics = self.statistics
+        if len(statistics) == 0:
+            return self.name
+
+        label = '%s (%d lookups' % (self.name, statistics['lookups'])
+
+        if statistics['sampled_lookups'] > 0:
+            label += ', %.3f ms/lookup, %.1f candidates/lookup' % (
+                1000 * statistics['lookup_time']
+                / statistics['sampled_lookups'],
+                float(statistics['candidates'])
+                / statistics['sampled_lookups']
+            )
+
+        if statistics['factory_calls'] > 0:
+            label += ', %d created in %.3f ms, %d failed' % (
+                statistics['factory_calls'],
+                1000 * statistics['factory_time'],
+                statistics['factory_failures']
+            )
+
+        return label + ')'
+
 
 class ServiceRegistryModel(HasTraits):
     """ A model of a service registry.
@@ -76,6 +113,18 @@ class ServiceRegistryModel(HasTraits):
 
             protocol.services.append(service_model)
 
+        # Show the lookup statistics if the registry gathers them (this also
+        # shows protocols that are looked up but have no services).
+        get_statistics = getattr(self.service_registry, 'get_statistics', None)
+        if get_statistics is not None:
+            for protocol_name, statistics in get_statistics().items():
+                protocol = protocols.get(protocol_name)
+                if protocol is None:
+                    protocol = ProtocolModel(name=protocol_name)
+                    protocols[protocol_name] = protocol
+
+                protocol.statistics = statistics
+
         return protocols.values()
 
 
@@ -122,7 +171,7 @@ service_registry_browser_tree_nodes = [
     ProtocolModelTreeNode(
         node_for  = [ProtocolModel],
         auto_open = True,
-        label     = 'name',
+        label     = 'label',
         rename    = False,
         copy      = False,
         delete    = False,
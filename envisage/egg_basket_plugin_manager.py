@@ -43,6 +43,27 @@ class EggBasketPluginManager(PluginManager):
         self._update_sys_dot_path(removed, added)
         self.reset_traits(['_plugins'])
         
+    #### 'PluginManager' protocol ############################################
+
+    def create_plugin(self, plugin):
+        """ Create a new instance of a plugin in the manager.
+
+        The plugin is created from its entry point in the same way as it was
+        when it was found.
+
+        """
+
+        plugin_working_set = pkg_resources.WorkingSet(self.plugin_path)
+        add_eggs_on_path(plugin_working_set, self.plugin_path)
+
+        for ep in self._get_plugin_entry_points(plugin_working_set):
+            if ep.name == plugin.id:
+                return self._create_plugin_from_entry_point(
+                    ep, self.application
+                )
+
+        return super(EggBasketPluginManager, self).create_plugin(plugin)
+
     # Protected 'PluginManager' protocol ######################################
 
     def __plugins_default(self):
@@ -58,6 +58,24 @@ class EggPluginManager(PluginManager):
     # 're' module.
     include = List(Str)
 
+    ###########################################################################
+    # 'PluginManager' interface.
+    ###########################################################################
+
+    def create_plugin(self, plugin):
+        """ Create a new instance of a plugin in the manager.
+
+        The plugin is created from its entry point in the same way as it was
+        when it was found.
+
+        """
+
+        for ep in get_entry_points_in_egg_order(self.working_set,self.PLUGINS):
+            if ep.name == plugin.id:
+                return self._create_plugin_from_ep(ep)
+
+        return super(EggPluginManager, self).create_plugin(plugin)
+
     ###########################################################################
     # Protected 'PluginManager' interface.
     ###########################################################################
@@ -0,0 +1,157 @@
+""" A plugin manager that gets its plugins from distribution entry points. """
+
+
+# Standard library imports.
+import logging, re
+
+# Enthought library imports.
+from traits.api import Either, List, Str
+
+# Local imports.
+from plugin_manager import PluginManager
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+class EntryPointPluginManager(PluginManager):
+    """ A plugin manager that gets its plugins from distribution entry points.
+
+    This is a drop-in alternative to the 'EggPluginManager' that finds the
+    'envisage.plugins' entry points using 'importlib.metadata' (or the
+    'importlib_metadata' backport) instead of 'pkg_resources'. It never
+    imports 'pkg_resources' and it only reads the metadata files that it
+    actually needs, so it is much cheaper to use when starting headless
+    applications.
+
+    Plugins are declared in exactly the same way, e.g.
+
+    [envisage.plugins]
+    acme.foo = acme.foo.foo_plugin:FooPlugin
+
+    and the 'include' and 'exclude' lists are regular expressions that are
+    matched against the entry point names, just as in the 'EggPluginManager'.
+
+    """
+
+    # Entry point Id.
+    PLUGINS = 'envisage.plugins'
+
+    #### 'EntryPointPluginManager' interface ##################################
+
+    # The directories (or zip files) to look for distributions in. By default
+    # (i.e. if this is None) we look on 'sys.path'.
+    path = Either(None, List(Str))
+
+    # An optional list of the Ids of the plugins that are to be excluded by
+    # the manager.
+    #
+    # Each item in the list is actually a regular expression as used by the
+    # 're' module.
+    exclude = List(Str)
+
+    # An optional list of the Ids of the plugins that are to be included by
+    # the manager (i.e. *only* plugins with Ids in this list will be added to
+    # the manager).
+    #
+    # Each item in the list is actually a regular expression as used by the
+    # 're' module.
+    include = List(Str)
+
+    ###########################################################################
+    # 'PluginManager' interface.
+    ###########################################################################
+
+    def create_plugin(self, plugin):
+        """ Create a new instance of a plugin in the manager.
+
+        The plugin is created from its entry point in the same way as it was
+        when it was found.
+
+        """
+
+        from metadata_utils import get_entry_points_in_dependency_order
+
+        for ep in get_entry_points_in_dependency_order(self.PLUGINS,self.path):
+            if ep.name == plugin.id:
+                return self._create_plugin_from_ep(ep)
+
+        return super(EntryPointPluginManager, self).create_plugin(plugin)
+
+    ###########################################################################
+    # Protected 'PluginManager' interface.
+    ###########################################################################
+
+    def __plugins_default(self):
+        """ Trait initializer. """
+
+        # Do the import here so that simply importing this module doesn't
+        # require 'importlib.metadata' (or its backport).
+        from metadata_utils import get_entry_points_in_dependency_order
+
+        plugins = []
+        for ep in get_entry_points_in_dependency_order(self.PLUGINS,self.path):
+            if self._is_included(ep.name) and not self._is_excluded(ep.name):
+                plugin = self._create_plugin_from_ep(ep)
+                plugins.append(plugin)
+
+        logger.debug('entry point plugin manager found plugins <%s>', plugins)
+
+        return plugins
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _create_plugin_from_ep(self, ep):
+        """ Create a plugin from an entry point. """
+
+        klass  = ep.load()
+        plugin = klass(application=self.application)
+
+        # Warn if the entry point is an old-style one where the LHS didn't have
+        # to be the same as the plugin Id.
+        if ep.name != plugin.id:
+            logger.warn(
+                'entry point name <%s> should be the same as the '
+                'plugin id <%s>' % (ep.name, plugin.id)
+            )
+
+        return plugin
+
+    def _is_excluded(self, plugin_id):
+        """ Return True if the plugin Id is excluded.
+
+        If no 'exclude' patterns are specified then this method returns False
+        for all plugin Ids.
+
+        """
+
+        if len(self.exclude) == 0:
+            return False
+
+        for pattern in self.exclude:
+            if re.match(pattern, plugin_id) is not None:
+                return True
+
+        return False
+
+    def _is_included(self, plugin_id):
+        """ Return True if the plugin Id is included.
+
+        If no 'include' patterns are specified then this method returns True
+        for all plugin Ids.
+
+        """
+
+        if len(self.include) == 0:
+            return True
+
+        for pattern in self.include:
+            if re.match(pattern, plugin_id) is not None:
+                return True
+
+        return False
+
+#### EOF ######################################################################
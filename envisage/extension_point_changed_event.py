@@ -1,22 +1,39 @@
 """ An event fired when an extension point's extensions have changed. """
 
 
-# Enthought library imports.
-from traits.api import TraitListEvent
+class ExtensionPointChangedEvent(object):
+    """ An event fired when an extension point's extensions have changed.
 
+    One of these is created every time an extension point changes (which
+    happens a *lot* as plugins are started and stopped), so it is a plain
+    object with slots rather than a 'HasTraits' (or even a 'TraitListEvent').
+    It has the same attributes as a 'TraitListEvent' ('index', 'removed' and
+    'added') plus the extension point Id.
 
-class ExtensionPointChangedEvent(TraitListEvent):
-    """ An event fired when an extension point's extensions have changed. """
+    """
 
-    def __init__ (self, extension_point_id=None, **kw):
-        """ Constructor. """
+    __slots__ = ('extension_point_id', 'index', 'removed', 'added')
 
-        # The base class has the 'index', 'removed' and 'added' attributes.
-        super(ExtensionPointChangedEvent, self).__init__(**kw)
+    def __init__(self, extension_point_id=None, index=0, removed=None,
+                 added=None):
+        """ Constructor. """
 
-        # We add the extension point Id.
         self.extension_point_id = extension_point_id
+        self.index              = index
+        self.removed            = removed if removed is not None else []
+        self.added              = added if added is not None else []
 
         return
 
+    def __repr__(self):
+        """ Return a string representation of the event. """
+
+        return '%s(extension_point_id=%r, index=%r, removed=%r, added=%r)' % (
+            type(self).__name__,
+            self.extension_point_id,
+            self.index,
+            self.removed,
+            self.added
+        )
+
 #### EOF ######################################################################
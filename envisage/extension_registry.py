@@ -132,6 +132,10 @@ class ExtensionRegistry(HasTraits):
     def _call_listeners(self, refs, extension_point_id, added, removed, index):
         """ Call listeners that are listening to an extension point. """
 
+        # Don't even create the event if nobody is listening!
+        if len(refs) == 0:
+            return
+
         event = ExtensionPointChangedEvent(
             extension_point_id = extension_point_id,
             added              = added,
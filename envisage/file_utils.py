@@ -0,0 +1,29 @@
+""" Utility functions for working with files. """
+
+
+# Standard library imports.
+import os
+
+
+def replace_file(source, destination):
+    """ Rename a file, replacing the destination if it already exists.
+
+    Where the platform allows it (i.e. not on Windows) the destination is
+    replaced atomically, so that concurrent readers see either the old file or
+    the new one. Otherwise the destination is removed first.
+
+    """
+
+    try:
+        os.rename(source, destination)
+
+    except OSError:
+        if not os.path.exists(destination):
+            raise
+
+        os.remove(destination)
+        os.rename(source, destination)
+
+    return
+
+#### EOF ######################################################################
@@ -2,15 +2,14 @@
 
 
 # Enthought library imports.
-from apptools.preferences.api import IPreferences
-from traits.api import Event, Instance, Str, VetoableEvent
+from traits.api import Either, Event, Instance, Str, VetoableEvent
 
 # Local imports.
 from i_extension_registry import IExtensionRegistry
 from i_import_manager import IImportManager
 from i_plugin_manager import IPluginManager
 from i_service_registry import IServiceRegistry
-from application_event import ApplicationEvent
+from application_event import ApplicationEvent, LightweightApplicationEvent
 
 
 class IApplication(
@@ -32,7 +31,10 @@ class IApplication(
     user_data = Str
 
     # The root preferences node.
-    preferences = Instance(IPreferences)
+    #
+    # The preferences interface is given by name so that 'apptools' is only
+    # imported when it is needed.
+    preferences = Instance('apptools.preferences.api.IPreferences')
 
     #### Events ####
 
@@ -41,14 +43,14 @@ class IApplication(
     starting = VetoableEvent(ApplicationEvent)
 
     # Fired when all plugins have been started.
-    started = Event(ApplicationEvent)
+    started = Event(Either(ApplicationEvent, LightweightApplicationEvent))
 
     # Fired when the plugin manager is stopping. This is the first thing that
     # happens when the 'stop' method is called.
     stopping = VetoableEvent(ApplicationEvent)
 
     # Fired when all plugins have been stopped.
-    stopped = Event(ApplicationEvent)
+    stopped = Event(Either(ApplicationEvent, LightweightApplicationEvent))
 
     def run(self):
         """ Run the application.
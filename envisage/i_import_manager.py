@@ -44,4 +44,13 @@ class IImportManager(Interface):
 
         """
 
+    def lazy_import_symbol(self, symbol_path):
+        """ Return a proxy for the symbol defined by the symbol path.
+
+        The symbol is not imported until the proxy is first used (i.e. called,
+        or one of its attributes is accessed). The symbol itself can be
+        obtained by calling the proxy's 'resolve' method.
+
+        """
+
 #### EOF ######################################################################
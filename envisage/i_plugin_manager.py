@@ -2,10 +2,10 @@
 
 
 # Enthought library imports.
-from traits.api import Event, Interface
+from traits.api import Either, Event, Interface
 
 # Local imports.
-from plugin_event import PluginEvent
+from plugin_event import LightweightPluginEvent, PluginEvent
 
 
 class IPluginManager(Interface):
@@ -14,10 +14,10 @@ class IPluginManager(Interface):
     #### Events ####
 
     # Fired when a plugin has been added to the manager.
-    plugin_added = Event(PluginEvent)
+    plugin_added = Event(Either(PluginEvent, LightweightPluginEvent))
 
     # Fired when a plugin has been removed from the manager.
-    plugin_removed = Event(PluginEvent)
+    plugin_removed = Event(Either(PluginEvent, LightweightPluginEvent))
 
     def __iter__(self):
         """ Return an iterator over the manager's plugins.
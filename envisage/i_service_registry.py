@@ -49,11 +49,15 @@ class IServiceRegistry(Interface):
     def get_service_from_id(self, service_id):
         """ Return the service with the specified id.
 
+        If the service was registered as a factory then the factory is used
+        to create the service (if it has not been already).
+
         If no such service exists a 'ValueError' exception is raised.
 
         """
 
-    def get_services(self, protocol, query='', minimize='', maximize=''):
+    def get_services(self, protocol, query='', minimize='', maximize='',
+                     limit=None):
         """ Return all services that match the specified query.
 
         The protocol can be an actual class or interface, or the *name* of a
@@ -64,6 +68,20 @@ class IServiceRegistry(Interface):
         If no query is specified then all services that provide the specified
         protocol are returned (if any exist).
 
+        The query can either be a string containing a Python expression that
+        is evaluated over each service's attributes and properties, or a
+        dictionary of property names and values e.g.::
+
+            {'lang' : 'en', 'priority__gt' : 3}
+
+        (see 'envisage.service_query' for details).
+
+        If 'minimize' or 'maximize' is specified then the services are
+        returned in order of that property/attribute (a property registered
+        with a service takes precedence over an attribute of the service).
+
+        If a limit is specified then at most that many services are returned.
+
         """
 
     def get_service_properties(self, service_id):
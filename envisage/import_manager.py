@@ -1,6 +1,9 @@
 """ The default import manager implementation. """
 
 
+# Standard library imports.
+import collections, re, sys, threading
+
 # Enthought library imports.
 from traits.api import HasTraits, implements
 
@@ -8,6 +11,156 @@ from traits.api import HasTraits, implements
 from i_import_manager import IImportManager
 
 
+# A symbol name that can be looked up with 'getattr' rather than 'eval', e.g.
+# 'baz' or 'baz.bling'.
+DOTTED_NAME = re.compile(r'^[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$')
+
+
+class SymbolCache(object):
+    """ A bounded (least recently used) cache of imported symbols.
+
+    The cache is shared by all import managers, and entries are discarded
+    when the module that they were imported from is reloaded (see
+    'envisage.reload_utils') or removed from 'sys.modules'.
+
+    Each entry also remembers the module level name that the symbol was
+    found through (and what it was bound to), so that an entry is not used
+    once that name has been rebound (e.g. by a plain 'reload' of the module,
+    which reuses the module object).
+
+    """
+
+    def __init__(self, size=1024):
+        """ Constructor. """
+
+        # The maximum number of symbols in the cache.
+        self.size = size
+
+        # The cached symbols (the least recently used first).
+        #
+        # { symbol_path : (module_name, module, name, value, symbol) }
+        #
+        # where 'name' is the module level name that the symbol was found
+        # through and 'value' is what the name was bound to.
+        self._symbols = collections.OrderedDict()
+
+        # The lock that protects the cache.
+        self._lock = threading.Lock()
+
+        return
+
+    def clear(self):
+        """ Discard all cached symbols. """
+
+        with self._lock:
+            self._symbols.clear()
+
+        return
+
+    def get(self, symbol_path):
+        """ Return the cached symbol for a symbol path.
+
+        Raise a 'KeyError' if the symbol is not cached.
+
+        """
+
+        with self._lock:
+            entry = self._symbols.pop(symbol_path)
+            module_name, module, name, value, symbol = entry
+
+            # If the module has been removed from (or replaced in)
+            # 'sys.modules', or the name has been rebound in it, then the
+            # symbol is stale.
+            if sys.modules.get(module_name) is not module \
+               or getattr(module, name, None) is not value:
+                raise KeyError(symbol_path)
+
+            self._symbols[symbol_path] = entry
+
+        return symbol
+
+    def invalidate(self, module_names):
+        """ Discard the symbols imported from any of the specified modules.
+
+        """
+
+        module_names = set(module_names)
+        with self._lock:
+            for symbol_path, entry in self._symbols.items():
+                if entry[0] in module_names:
+                    del self._symbols[symbol_path]
+
+        return
+
+    def set(self, symbol_path, module, name, symbol):
+        """ Cache the symbol for a symbol path.
+
+        'name' is the module level name that the symbol was found through.
+
+        """
+
+        value = getattr(module, name)
+        with self._lock:
+            self._symbols.pop(symbol_path, None)
+            self._symbols[symbol_path] = (
+                module.__name__, module, name, value, symbol
+            )
+
+            while len(self._symbols) > self.size:
+                self._symbols.popitem(last=False)
+
+        return
+
+
+# The cache shared by all import managers.
+symbol_cache = SymbolCache()
+
+
+class LazySymbol(object):
+    """ A proxy for a symbol that is only imported when it is first used.
+
+    Calling the proxy calls the symbol, and getting an attribute of the proxy
+    gets the attribute of the symbol. The symbol itself can be obtained by
+    calling 'resolve'.
+
+    """
+
+    def __init__(self, import_manager, symbol_path):
+        """ Constructor. """
+
+        self.__dict__['_import_manager'] = import_manager
+        self.__dict__['_symbol_path']    = symbol_path
+
+        return
+
+    def __call__(self, *args, **kw):
+        """ Call the symbol. """
+
+        return self.resolve()(*args, **kw)
+
+    def __getattr__(self, name):
+        """ Get an attribute of the symbol. """
+
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        """ Return a string representation of the proxy. """
+
+        return '<LazySymbol %s>' % self._symbol_path
+
+    def resolve(self):
+        """ Import the symbol (if it hasn't been already) and return it. """
+
+        try:
+            symbol = self.__dict__['_symbol']
+
+        except KeyError:
+            symbol = self._import_manager.import_symbol(self._symbol_path)
+            self.__dict__['_symbol'] = symbol
+
+        return symbol
+
+
 class ImportManager(HasTraits):
     """ The default import manager implementation.
 
@@ -26,29 +179,24 @@ class ImportManager(HasTraits):
     def import_symbol(self, symbol_path):
         """ Import the symbol defined by the specified symbol path. """
 
-        if ':' in symbol_path:
-            module_name, symbol_name = symbol_path.split(':')
+        try:
+            symbol = symbol_cache.get(symbol_path)
 
-            module = self._import_module(module_name)
-            symbol = eval(symbol_name, module.__dict__)
-
-        else:
-            components = symbol_path.split('.')
-
-            module_name = '.'.join(components[:-1])
-            symbol_name = components[-1]
-
-            module = __import__(
-                module_name, globals(), locals(), [symbol_name]
-            )
-
-            symbol = getattr(module, symbol_name)
+        except KeyError:
+            module, name, symbol = self._import_symbol(symbol_path)
+            if name is not None:
+                symbol_cache.set(symbol_path, module, name, symbol)
 
         # Event notification.
         self.symbol_imported = symbol
 
         return symbol
 
+    def lazy_import_symbol(self, symbol_path):
+        """ Return a proxy for the symbol defined by the symbol path. """
+
+        return LazySymbol(self, symbol_path)
+
     ###########################################################################
     # Private interface.
     ###########################################################################
@@ -71,4 +219,47 @@ class ImportManager(HasTraits):
 
         return module
 
+    def _import_symbol(self, symbol_path):
+        """ Import the symbol defined by the specified symbol path.
+
+        Returns a tuple in the form (module, name, symbol) where 'name' is
+        the module level name that the symbol was found through (or None if
+        the symbol was evaluated and so can't be cached).
+
+        """
+
+        if ':' in symbol_path:
+            module_name, symbol_name = symbol_path.split(':')
+
+            module = self._import_module(module_name)
+
+            # Simple (possibly dotted) names are looked up directly, anything
+            # else is evaluated in the module's namespace.
+            components = symbol_name.split('.')
+            if DOTTED_NAME.match(symbol_name) is not None \
+               and components[0] in module.__dict__:
+                name   = components[0]
+                symbol = module.__dict__[name]
+                for component in components[1:]:
+                    symbol = getattr(symbol, component)
+
+            else:
+                name   = None
+                symbol = eval(symbol_name, module.__dict__)
+
+        else:
+            components = symbol_path.split('.')
+
+            module_name = '.'.join(components[:-1])
+            symbol_name = components[-1]
+
+            module = __import__(
+                module_name, globals(), locals(), [symbol_name]
+            )
+
+            name   = symbol_name
+            symbol = getattr(module, symbol_name)
+
+        return module, name, symbol
+
 #### EOF ######################################################################
@@ -0,0 +1,64 @@
+""" A module whose names are imported when they are first used. """
+
+
+# Standard library imports.
+import types
+
+
+class LazyModule(types.ModuleType):
+    """ A module whose names are imported when they are first used.
+
+    This is used for 'api' modules so that importing them is cheap (only the
+    modules that define the names that are actually used get imported), e.g.
+    at the end of an 'api' module::
+
+        sys.modules[__name__] = LazyModule(
+            __name__, __doc__, {'Foo' : 'acme.foo', 'Bar' : 'acme.bar'}
+        )
+
+    """
+
+    def __init__(self, name, doc, names, module_file=None):
+        """ Constructor.
+
+        'names' is a dictionary that maps each name that the module contains
+        to the (absolute) name of the module that it is imported from.
+
+        """
+
+        super(LazyModule, self).__init__(name, doc)
+
+        # The name of the module that each name is imported from.
+        #
+        # { name : module_name }
+        self._lazy_names = names
+
+        self.__all__ = sorted(names)
+        if module_file is not None:
+            self.__file__ = module_file
+
+        return
+
+    def __dir__(self):
+        """ Return the module's names (including those not imported yet). """
+
+        return sorted(set(self.__dict__) | set(self._lazy_names))
+
+    def __getattr__(self, name):
+        """ Import a name that hasn't been used before. """
+
+        module_name = self._lazy_names.get(name)
+        if module_name is None:
+            raise AttributeError(
+                "module '%s' has no attribute '%s'" % (self.__name__, name)
+            )
+
+        module = __import__(module_name, globals(), locals(), [name])
+        value  = getattr(module, name)
+
+        # Next time it will be found without calling this method.
+        setattr(self, name, value)
+
+        return value
+
+#### EOF ######################################################################
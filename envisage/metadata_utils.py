@@ -0,0 +1,290 @@
+""" Utility functions for working with distribution metadata.
+
+These are the 'importlib.metadata' equivalents of the functions in
+'egg_utils'. They never import 'pkg_resources' and they only read the
+metadata files that they actually need, which makes them a lot cheaper to use
+at application start up.
+
+On Pythons that don't have 'importlib.metadata' in the standard library the
+'importlib_metadata' backport is used instead.
+
+"""
+
+
+# Standard library imports.
+import os, re
+from collections import OrderedDict
+
+# Enthought library imports.
+from traits.util.toposort import topological_sort
+
+try:
+    from importlib import metadata
+
+except ImportError:
+    import importlib_metadata as metadata
+
+
+def get_entry_points_in_dependency_order(entry_point_name, path=None):
+    """ Return entry points in distribution dependency order.
+
+    'path' is a list of directories (or zip files) to look for distributions
+    in. If it is None then 'sys.path' is used.
+
+    """
+
+    # The path is only scanned once (and the distributions are named from
+    # the names of their metadata directories, so no metadata is read).
+    distributions = get_distributions_by_name(path)
+
+    # Find all distributions that actually contain contributions to the
+    # entry point (this reads only the 'entry_points.txt' files, plus the
+    # metadata of the distributions that do contribute).
+    entry_points = get_entry_points_by_distribution(
+        entry_point_name, path, distributions
+    )
+
+    # Order them in dependency order (i.e. ordered by their requirements).
+    # This reads the metadata of the contributing distributions and of the
+    # distributions that they require, but of no others.
+    names = get_distribution_names_in_dependency_order(
+        entry_points.keys(), path, distributions
+    )
+
+    contributions = dict(
+        (normalize_name(name), eps) for name, eps in entry_points.items()
+    )
+
+    ordered = []
+    for name in names:
+        ordered.extend(contributions.get(name, []))
+
+    return ordered
+
+
+def get_entry_points_by_distribution(entry_point_name, path=None,
+                                     distributions=None):
+    """ Return all contributions to an entry point.
+
+    The contributions are returned in a dictionary keyed by the name of the
+    distribution that they came from.
+
+    'distributions' is the dictionary returned by 'get_distributions_by_name'
+    (if it is None then the path is scanned).
+
+    """
+
+    if distributions is None:
+        distributions = get_distributions_by_name(path)
+
+    entry_points = {}
+    for distribution in distributions.values():
+        # Only look at the entry point declarations, and don't even bother
+        # parsing them unless the distribution has some!
+        text = distribution.read_text('entry_points.txt')
+        if text is None:
+            continue
+
+        contributions = parse_entry_points(text, entry_point_name)
+        if len(contributions) > 0:
+            name = distribution.metadata['Name']
+            entry_points.setdefault(name, []).extend(contributions)
+
+    return entry_points
+
+
+def get_distribution_names_in_dependency_order(names, path=None,
+                                               distributions=None):
+    """ Return distribution names in dependency order.
+
+    The requirements of each distribution are followed (via the metadata of
+    the required distributions) so that distributions that are only related
+    indirectly still get ordered correctly.
+
+    The returned names are normalized (see 'normalize_name').
+
+    """
+
+    if distributions is None:
+        distributions = get_distributions_by_name(path)
+
+    # Build a dependency graph (keyed by normalized name).
+    graph = {}
+
+    unvisited = list(names)
+    while len(unvisited) > 0:
+        name = unvisited.pop()
+        if normalize_name(name) in graph:
+            continue
+
+        arcs = graph.setdefault(normalize_name(name), [])
+        for required in get_requires(name, path, distributions):
+            arcs.append(normalize_name(required))
+            if normalize_name(required) not in graph:
+                unvisited.append(required)
+
+    names = topological_sort(graph)
+    names.reverse()
+
+    return names
+
+
+def get_distribution(name, path=None):
+    """ Return the distribution with the specified name.
+
+    Return None if no such distribution exists.
+
+    """
+
+    if path is None:
+        distributions = metadata.distributions(name=name)
+
+    else:
+        distributions = metadata.distributions(name=name, path=path)
+
+    for distribution in distributions:
+        return distribution
+
+    return None
+
+
+def get_distributions(path=None):
+    """ Return all distributions on the path. """
+
+    if path is None:
+        distributions = metadata.distributions()
+
+    else:
+        distributions = metadata.distributions(path=path)
+
+    return distributions
+
+
+def get_distributions_by_name(path=None):
+    """ Return all distributions on the path keyed by their normalized name.
+
+    If a distribution appears more than once on the path (e.g. an egg and a
+    develop install of it) then the first one wins (as in 'pkg_resources').
+
+    The names are taken from the names of the distributions' metadata
+    directories where possible (see 'get_normalized_name') so that this does
+    not have to read the metadata of every distribution on the path.
+
+    """
+
+    distributions = OrderedDict()
+    for distribution in get_distributions(path):
+        name = get_normalized_name(distribution)
+        if name is not None:
+            distributions.setdefault(name, distribution)
+
+    return distributions
+
+
+def get_normalized_name(distribution):
+    """ Return the normalized name of a distribution.
+
+    The name is derived from the name of the distribution's metadata
+    directory, e.g. 'acme.foo-1.0.dist-info', 'acme.foo.egg-info' or the
+    'EGG-INFO' directory of 'acme.foo-1.0-py2.7.egg'. Only if that is not
+    possible is the distribution's metadata read.
+
+    Return None if the distribution has no name.
+
+    """
+
+    # 'PathDistribution' doesn't make the path to the metadata directory
+    # public.
+    path = getattr(distribution, '_path', None)
+    if path is not None:
+        directory = str(path).rstrip('/\\')
+        basename  = os.path.basename(directory)
+        if basename == 'EGG-INFO':
+            basename = os.path.basename(os.path.dirname(directory))
+
+        for extension in ['.dist-info', '.egg-info', '.egg']:
+            if basename.endswith(extension):
+                # Any '-' in the name itself is escaped as '_' so the name
+                # is everything up to the version.
+                name = basename[:-len(extension)].split('-')[0]
+                if len(name) > 0:
+                    return normalize_name(name)
+
+    name = distribution.metadata['Name']
+    if name is None:
+        return None
+
+    return normalize_name(name)
+
+
+def get_requires(name, path=None, distributions=None):
+    """ Return the names of the other distributions that one requires.
+
+    Requirements that only apply to 'extras' are ignored, as are those that
+    cannot be found.
+
+    """
+
+    if distributions is None:
+        distribution = get_distribution(name, path)
+
+    else:
+        distribution = distributions.get(normalize_name(name))
+
+    if distribution is None:
+        return []
+
+    requires = []
+    for requirement in distribution.requires or []:
+        if 'extra' in requirement.partition(';')[2]:
+            continue
+
+        match = REQUIREMENT_NAME.match(requirement)
+        if match is not None:
+            requires.append(match.group(0))
+
+    return requires
+
+
+def normalize_name(name):
+    """ Return the normalized form of a distribution name.
+
+    e.g. 'Acme_Foo', 'acme.foo' and 'acme-foo' are all the same distribution.
+
+    """
+
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def parse_entry_points(text, group):
+    """ Parse the contents of an 'entry_points.txt' file.
+
+    Only the entry points in the specified group are returned.
+
+    """
+
+    entry_points = []
+
+    current_group = None
+    for line in text.splitlines():
+        line = line.strip()
+        if len(line) == 0 or line[0] in '#;':
+            continue
+
+        if line.startswith('[') and line.endswith(']'):
+            current_group = line[1:-1].strip()
+
+        elif current_group == group and '=' in line:
+            name, value = line.split('=', 1)
+            entry_points.append(
+                metadata.EntryPoint(name.strip(), value.strip(), group)
+            )
+
+    return entry_points
+
+
+# The leading part of a requirement specification that names the required
+# distribution, e.g. 'acme.foo' in 'acme.foo >= 1.0; python_version < "3"'.
+REQUIREMENT_NAME = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*')
+
+#### EOF ######################################################################
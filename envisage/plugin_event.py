@@ -11,4 +11,30 @@ class PluginEvent(Vetoable):
     # The plugin that the event is for.
     plugin = Instance('envisage.api.IPlugin')
 
+
+class LightweightPluginEvent(object):
+    """ A plugin event that is a plain object with slots.
+
+    This has the same attributes as a 'PluginEvent' but is much cheaper to
+    create. It is used when nothing needs to observe the traits of the event
+    itself (e.g. the 'plugin_added' and 'plugin_removed' events, which are
+    never vetoed).
+
+    """
+
+    __slots__ = ('plugin', 'veto')
+
+    def __init__(self, plugin=None, veto=False):
+        """ Constructor. """
+
+        self.plugin = plugin
+        self.veto   = veto
+
+        return
+
+    def __repr__(self):
+        """ Return a string representation of the event. """
+
+        return 'LightweightPluginEvent(plugin=%r)' % self.plugin
+
 #### EOF ######################################################################
@@ -1,6 +1,9 @@
 """ An extension registry that uses plugins as extension providers. """
 
 
+# Standard library imports.
+import logging
+
 # Enthought library imports.
 from traits.api import Instance, on_trait_change
 
@@ -9,6 +12,10 @@ from i_plugin_manager import IPluginManager
 from provider_extension_registry import ProviderExtensionRegistry
 
 
+# Logging.
+logger = logging.getLogger(__name__)
+
+
 class PluginExtensionRegistry(ProviderExtensionRegistry):
     """ An extension registry that uses plugins as extension providers.
 
@@ -22,6 +29,12 @@ class PluginExtensionRegistry(ProviderExtensionRegistry):
     # The plugin manager that has the plugins we are after!
     plugin_manager = Instance(IPluginManager)
 
+    # An optional startup snapshot (see 'Application.load_startup_snapshot').
+    #
+    # If set (and validated), the contributions of any plugin that is valid in
+    # the snapshot are taken from it instead of being evaluated live.
+    snapshot = Instance('envisage.startup_snapshot.StartupSnapshot')
+
     ###########################################################################
     # 'PluginExtensionRegistry' interface.
     ###########################################################################
@@ -60,4 +73,35 @@ class PluginExtensionRegistry(ProviderExtensionRegistry):
 
         return
 
+    ###########################################################################
+    # Protected 'ProviderExtensionRegistry' interface.
+    ###########################################################################
+
+    def _initialize_extensions(self, extension_point_id):
+        """ Initialize the extensions to an extension point. """
+
+        if self.snapshot is None:
+            return super(PluginExtensionRegistry, self)._initialize_extensions(
+                extension_point_id
+            )
+
+        # We store the extensions as a list of lists, with each inner list
+        # containing the contributions from a single provider.
+        extensions = []
+        for provider in self._providers:
+            contributions = self.snapshot.get_extensions(
+                extension_point_id, provider.id
+            )
+
+            # If the snapshot can't provide the contributions then we have to
+            # ask the provider for them.
+            if contributions is None:
+                contributions = provider.get_extensions(extension_point_id)[:]
+
+            extensions.append(contributions)
+
+        logger.debug('extensions to <%s> <%s>', extension_point_id, extensions)
+
+        return extensions
+
 #### EOF ######################################################################
@@ -4,12 +4,13 @@
 from fnmatch import fnmatch
 import logging
 
-from traits.api import Event, HasTraits, Instance, List, Str, implements
+from traits.api import Either, Event, HasTraits, Instance, List, Str
+from traits.api import implements
 
 from i_application import IApplication
 from i_plugin import IPlugin
 from i_plugin_manager import IPluginManager
-from plugin_event import PluginEvent
+from plugin_event import LightweightPluginEvent, PluginEvent
 
 
 
@@ -39,10 +40,10 @@ class PluginManager(HasTraits):
     #### 'IPluginManager' protocol #############################################
 
     # Fired when a plugin has been added to the manager.
-    plugin_added = Event(PluginEvent)
+    plugin_added = Event(Either(PluginEvent, LightweightPluginEvent))
 
     # Fired when a plugin has been removed from the manager.
-    plugin_removed = Event(PluginEvent)
+    plugin_removed = Event(Either(PluginEvent, LightweightPluginEvent))
 
     #### 'PluginManager' protocol ##############################################
 
@@ -105,10 +106,25 @@ class PluginManager(HasTraits):
         """ Add a plugin to the manager. """
 
         self._plugins.append(plugin)
-        self.plugin_added = PluginEvent(plugin=plugin)
+        self.plugin_added = LightweightPluginEvent(plugin=plugin)
 
         return
 
+    def create_plugin(self, plugin):
+        """ Create a new instance of a plugin in the manager.
+
+        This is used when a plugin is reloaded, so the new instance is
+        created from the current version of the plugin's class (i.e. the one
+        in its module after the module has been reloaded).
+
+        """
+
+        from reload_utils import get_reloaded_class
+
+        klass = get_reloaded_class(plugin)
+
+        return klass(application=self.application, id=plugin.id)
+
     def get_plugin(self, plugin_id):
         """ Return the plugin with the specified Id. """
 
@@ -128,7 +144,22 @@ class PluginManager(HasTraits):
         """ Remove a plugin from the manager. """
 
         self._plugins.remove(plugin)
-        self.plugin_removed = PluginEvent(plugin=plugin)
+        self.plugin_removed = LightweightPluginEvent(plugin=plugin)
+
+        return
+
+    def replace_plugin(self, old, new):
+        """ Replace a plugin with another (e.g. a reloaded version of it).
+
+        The new plugin takes the old plugin's place in the manager. Note that
+        no 'plugin_added' or 'plugin_removed' events are fired.
+
+        Raise a 'ValueError' if the old plugin is not in the manager.
+
+        """
+
+        index = self._plugins.index(old)
+        self._plugins[index] = new
 
         return
 
@@ -0,0 +1,252 @@
+""" A server that forks worker processes from a started application.
+
+This is intended for running batch jobs against a headless application. The
+application (and hence all of its plugins and services) is started *once* in
+the parent process, and then worker processes are forked from it. Each worker
+therefore starts with a fully booted copy of the application and handling a
+job costs only the job itself.
+
+This module uses 'os.fork' (via 'multiprocessing') and hence only works on
+platforms that support it.
+
+"""
+
+
+# Standard library imports.
+import Queue, logging, multiprocessing, traceback
+
+# Enthought library imports.
+from traits.api import Any, Bool, Callable, HasTraits, Instance, Int, List
+
+# Local imports.
+from i_application import IApplication
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+class PreforkServer(HasTraits):
+    """ A server that forks worker processes from a started application.
+
+    e.g::
+
+        def handler(application, work_item):
+            service = application.get_service(IMyService)
+            return service.process(work_item)
+
+        server = PreforkServer(
+            application = application,
+            handler     = handler,
+            workers     = 4,
+            after_fork  = [reconnect_database]
+        )
+        server.start()
+
+        job_id = server.submit(work_item)
+        job_id, result, error = server.get_result()
+
+        server.stop()
+
+    Work items, results and errors are passed between processes using
+    'multiprocessing' queues and so must be picklable.
+
+    """
+
+    #### 'PreforkServer' interface ############################################
+
+    # The application that is started once and shared by all of the workers.
+    application = Instance(IApplication)
+
+    # The callable that handles a work item in a worker process.
+    #
+    # handler(application, work_item) -> result
+    handler = Callable
+
+    # Callables that are called in each worker process immediately after it
+    # has been forked, e.g. to reopen sockets, database connections or log
+    # files that must not be shared with the parent.
+    #
+    # hook(application) -> None
+    after_fork = List(Callable)
+
+    # The number of worker processes.
+    workers = Int(2)
+
+    # Is the server running?
+    running = Bool(False)
+
+    #### Private interface ####################################################
+
+    # The queue of work items to be handled by the workers.
+    _jobs = Any
+
+    # The id of the next job.
+    _next_job_id = Int
+
+    # The worker processes.
+    _processes = List
+
+    # The queue of results produced by the workers.
+    _results = Any
+
+    # Results taken from the queue whilst the workers were stopping (and not
+    # yet returned by 'get_result').
+    _undelivered = List
+
+    ###########################################################################
+    # 'PreforkServer' interface.
+    ###########################################################################
+
+    def start(self):
+        """ Start the application and fork the worker processes.
+
+        Returns True unless the application start was vetoed.
+
+        """
+
+        if self.running:
+            return True
+
+        logger.debug('---------- prefork server starting ----------')
+
+        if not self.application.start():
+            return False
+
+        self._jobs    = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+
+        self._processes = [
+            self._fork_worker(index) for index in range(self.workers)
+        ]
+
+        self.running = True
+
+        logger.debug('---------- prefork server started ----------')
+
+        return True
+
+    def stop(self):
+        """ Stop the workers and then the application.
+
+        Each worker stops its copy of the application before it exits.
+
+        """
+
+        if not self.running:
+            return
+
+        logger.debug('---------- prefork server stopping ----------')
+
+        # Tell each worker to stop once it has handled the work items queued
+        # before this point.
+        for process in self._processes:
+            self._jobs.put(None)
+
+        # A worker can't exit until all of the results that it has put on
+        # the queue have been written to the pipe, so we have to keep reading
+        # them whilst we wait (otherwise a large result blocks it forever).
+        processes = self._processes[:]
+        while len(processes) > 0:
+            try:
+                self._undelivered.append(self._results.get(timeout=0.1))
+
+            except Queue.Empty:
+                pass
+
+            processes = [
+                process for process in processes if process.is_alive()
+            ]
+
+        for process in self._processes:
+            process.join()
+
+        self._processes = []
+        self.running    = False
+
+        self.application.stop()
+
+        logger.debug('---------- prefork server stopped ----------')
+
+        return
+
+    def submit(self, work_item):
+        """ Submit a work item to be handled by one of the workers.
+
+        Returns the id of the job which is used to identify the result.
+
+        """
+
+        if not self.running:
+            raise SystemError('the prefork server is not running')
+
+        self._next_job_id += 1
+        self._jobs.put((self._next_job_id, work_item))
+
+        return self._next_job_id
+
+    def get_result(self, timeout=None):
+        """ Return the result of the next job to be completed.
+
+        The result is a tuple in the form::
+
+            (job_id, result, error)
+
+        where 'error' is None if the job succeeded, otherwise it contains the
+        formatted traceback of the exception raised by the handler (and
+        'result' is None).
+
+        Raise 'Queue.Empty' if no result is available within the timeout.
+
+        """
+
+        if len(self._undelivered) > 0:
+            return self._undelivered.pop(0)
+
+        return self._results.get(timeout=timeout)
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _fork_worker(self, index):
+        """ Fork a worker process. """
+
+        process = multiprocessing.Process(
+            target = self._worker_main,
+            name   = 'prefork-worker-%d' % index
+        )
+        process.daemon = True
+        process.start()
+
+        logger.debug('forked worker %d (pid %d)', index, process.pid)
+
+        return process
+
+    def _worker_main(self):
+        """ The main loop of a worker process. """
+
+        try:
+            for hook in self.after_fork:
+                hook(self.application)
+
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+
+                job_id, work_item = job
+                try:
+                    result = self.handler(self.application, work_item)
+                    self._results.put((job_id, result, None))
+
+                except Exception:
+                    logger.exception('worker handling job %d', job_id)
+                    self._results.put((job_id, None, traceback.format_exc()))
+
+        finally:
+            self.application.stop()
+
+        return
+
+#### EOF ######################################################################
@@ -69,6 +69,27 @@ class ProviderExtensionRegistry(ExtensionRegistry):
 
         return
 
+    def replace_provider(self, old, new):
+        """ Replace an extension provider with another.
+
+        The new provider takes the place of the old one. Unlike removing the
+        old provider and adding the new one, listeners are only told about
+        the contributions that have actually changed.
+
+        Raise a 'ValueError' if the old provider is not in the registry.
+
+        """
+
+        events = self._replace_provider(old, new)
+
+        for extension_point_id, event in events.items():
+            refs, added, removed, index = event
+            self._call_listeners(
+                refs, extension_point_id, added, removed, index
+            )
+
+        return
+
     ###########################################################################
     # Protected 'ExtensionRegistry' interface.
     ###########################################################################
@@ -173,6 +194,47 @@ class ProviderExtensionRegistry(ExtensionRegistry):
 
         return events
 
+    def _replace_provider(self, old, new):
+        """ Replace a provider. """
+
+        # Find the index of the provider in the provider list. Its
+        # contributions are at the same index in the extensions list of lists.
+        index = self._providers.index(old)
+
+        # Replace the provider's extension points.
+        self._remove_provider_extension_points(old, {})
+        self._add_provider_extension_points(new)
+
+        # Each provider can contribute to multiple extension points, so we
+        # build up a dictionary of the 'ExtensionPointChanged' events that we
+        # need to fire.
+        events = {}
+
+        # Replace the provider's contributions to any extension point that has
+        # already been accessed.
+        for extension_point_id, extensions in self._extensions.items():
+            old_extensions = extensions[index]
+            new_extensions = new.get_extensions(extension_point_id)[:]
+            extensions[index] = new_extensions
+
+            start, removed, added = self._get_delta(
+                old_extensions, new_extensions
+            )
+
+            # We only need fire an event for this extension point if the
+            # contributions have actually changed.
+            if len(removed) > 0 or len(added) > 0:
+                offset = sum(map(len, extensions[:index]))
+                refs   = self._get_listener_refs(extension_point_id)
+                events[extension_point_id] = (
+                    refs, added, removed, offset + start
+                )
+
+        # And finally put the new provider in the old one's place.
+        self._providers[index] = new
+
+        return events
+
     def _remove_provider_extensions(self, provider):
         """ Remove a provider's extensions from the registry. """
 
@@ -282,6 +344,40 @@ class ProviderExtensionRegistry(ExtensionRegistry):
 
         return extensions
 
+    def _get_delta(self, old, new):
+        """ Return the difference between two lists of contributions.
+
+        Returns a tuple in the form (index, removed, added), meaning that the
+        items in 'removed' at 'index' in 'old' were replaced by the items in
+        'added' to get 'new'.
+
+        """
+
+        # Skip over any contributions that are the same at the start...
+        start = 0
+        while start < min(len(old), len(new)) and \
+              self._is_same(old[start], new[start]):
+            start += 1
+
+        # ... and at the end.
+        end = 0
+        while end < min(len(old), len(new)) - start and \
+              self._is_same(old[-end-1], new[-end-1]):
+            end += 1
+
+        return start, old[start:len(old)-end], new[start:len(new)-end]
+
+    def _is_same(self, old, new):
+        """ Return True if two contributions are the same. """
+
+        try:
+            is_same = old is new or bool(old == new)
+
+        except Exception:
+            is_same = False
+
+        return is_same
+
     def _translate_index(self, index, offset):
         """ Translate an event index by the given offset. """
 
@@ -0,0 +1,84 @@
+""" Utility functions for reloading Python modules. """
+
+
+# Standard library imports.
+import logging, sys, types
+
+# Enthought library imports.
+from traits.util.toposort import CyclicGraph, topological_sort
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+def get_modules_in_dependency_order(modules):
+    """ Return modules ordered so that each comes after those it uses.
+
+    A module is deemed to use another if its namespace contains the other
+    module, or an object (e.g. a class or function) defined in it.
+
+    If the modules depend on each other cyclically then they are returned in
+    order of name.
+
+    """
+
+    by_name = dict((module.__name__, module) for module in modules)
+
+    # Build a dependency graph.
+    graph = {}
+    for module in modules:
+        arcs = graph.setdefault(module.__name__, [])
+        for value in vars(module).values():
+            if isinstance(value, types.ModuleType):
+                used = value.__name__
+
+            else:
+                used = getattr(value, '__module__', None)
+
+            if used == module.__name__ or used in arcs:
+                continue
+
+            if used in by_name:
+                arcs.append(used)
+
+    try:
+        names = topological_sort(graph)
+        names.reverse()
+
+    except CyclicGraph:
+        names = sorted(by_name.keys())
+
+    return [by_name[name] for name in names]
+
+
+def get_reloaded_class(obj):
+    """ Return the current version of an object's class.
+
+    i.e. the class with the same name in the (possibly reloaded) module that
+    the object's class was defined in.
+
+    """
+
+    klass = type(obj)
+
+    return getattr(sys.modules[klass.__module__], klass.__name__)
+
+
+def reload_modules(modules):
+    """ Reload modules in dependency order. """
+
+    # Local imports.
+    from import_manager import symbol_cache
+
+    for module in get_modules_in_dependency_order(modules):
+        logger.debug('reloading module <%s>', module.__name__)
+        reload(module)
+
+    # Any symbols imported from the modules before they were reloaded are now
+    # stale.
+    symbol_cache.invalidate([module.__name__ for module in modules])
+
+    return
+
+#### EOF ######################################################################
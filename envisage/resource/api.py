@@ -1,8 +1,12 @@
 from i_resource_protocol import IResourceProtocol
 from i_resource_manager import IResourceManager
 
+from caching_http_resource_protocol import CachingHTTPResourceProtocol
+from caching_resource_manager import CachingResourceManager
 from file_resource_protocol import FileResourceProtocol
 from http_resource_protocol import HTTPResourceProtocol
+from mmap_resource_protocol import MMapResourceProtocol
 from no_such_resource_error import NoSuchResourceError
 from package_resource_protocol import PackageResourceProtocol
 from resource_manager import ResourceManager
+from zip_resource_protocol import ZipResourceProtocol
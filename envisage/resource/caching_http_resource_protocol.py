@@ -0,0 +1,394 @@
+""" A resource protocol for HTTP documents with pooling and caching. """
+
+
+# Standard library imports.
+import cPickle, hashlib, httplib, logging, os, re, socket, threading, time
+import urlparse
+from cStringIO import StringIO
+
+# Enthought library imports.
+from envisage.file_utils import replace_file
+from traits.api import Any, Dict, Float, HasTraits, Int, Str, implements
+
+# Local imports.
+from i_resource_protocol import IResourceProtocol
+from no_such_resource_error import NoSuchResourceError
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+# The 'max-age' directive of a 'Cache-Control' header.
+MAX_AGE = re.compile(r'max-age\s*=\s*(\d+)')
+
+# The status codes of redirects that we follow.
+REDIRECTS = (301, 302, 303, 307)
+
+
+class CachingHTTPResourceProtocol(HasTraits):
+    """ A resource protocol for HTTP documents with pooling and caching.
+
+    This is a replacement for the plain 'HTTPResourceProtocol', e.g::
+
+        resource_manager.resource_protocols['http'] = \\
+            CachingHTTPResourceProtocol(cache_directory=directory)
+
+    It differs in that:-
+
+    1) Connections are kept alive and reused (up to 'max_connections' idle
+       connections are kept per host).
+
+    2) Requests time out after 'timeout' seconds.
+
+    3) Documents are cached on disk. A cached document is used without
+       contacting the server while it is fresh (according to the 'max-age'
+       directive of its 'Cache-Control' header). Once it is stale it is
+       revalidated using its 'ETag' (and/or 'Last-Modified') header.
+       Documents sent with 'Cache-Control: no-store' are never cached.
+
+    4) If the server cannot be reached then any cached copy of a document is
+       used, even if it is stale.
+
+    """
+
+    implements(IResourceProtocol)
+
+    #### 'CachingHTTPResourceProtocol' interface ##############################
+
+    # The directory that documents are cached in.
+    cache_directory = Str
+
+    # The maximum number of idle connections kept for each host.
+    max_connections = Int(4)
+
+    # The maximum number of redirects to follow.
+    max_redirects = Int(5)
+
+    # The timeout (in seconds) for connecting to, and reading from, a server.
+    timeout = Float(10.0)
+
+    #### Private interface ####################################################
+
+    # The idle connections for each host.
+    #
+    # { (host, port) : [connection, ...] }
+    _connections = Dict
+
+    # The lock that protects the connections.
+    _lock = Any
+
+    ###########################################################################
+    # 'IResourceProtocol' interface.
+    ###########################################################################
+
+    def file(self, address):
+        """ Return a readable file-like object for the specified address. """
+
+        url   = 'http://' + address
+        entry = self._load_entry(url)
+
+        # The body is loaded with the entry so that a cached copy is only
+        # used (or revalidated) if both are still there.
+        if entry is not None:
+            cached_body = self._load_body(url)
+            if cached_body is None:
+                entry = None
+
+        if entry is not None and entry['expires'] > time.time():
+            logger.debug('fresh cached copy of <%s>', url)
+            return StringIO(cached_body)
+
+        headers = {}
+        if entry is not None:
+            if entry['etag'] is not None:
+                headers['If-None-Match'] = entry['etag']
+
+            if entry['last_modified'] is not None:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            status, response_headers, body = self._get(url, headers)
+
+        except (socket.error, httplib.HTTPException), e:
+            if entry is None:
+                raise
+
+            logger.warn('using stale copy of <%s> (%s)', url, e)
+            return StringIO(cached_body)
+
+        if status == 304 and entry is not None:
+            logger.debug('cached copy of <%s> not modified', url)
+            body = cached_body
+            self._save_entry(url, response_headers, body, entry)
+
+        elif status == 200:
+            self._save_entry(url, response_headers, body)
+
+        else:
+            raise NoSuchResourceError(url)
+
+        return StringIO(body)
+
+    ###########################################################################
+    # 'CachingHTTPResourceProtocol' interface.
+    ###########################################################################
+
+    def close(self):
+        """ Close all idle connections. """
+
+        with self._lock:
+            for connections in self._connections.values():
+                for connection in connections:
+                    connection.close()
+
+            self._connections = {}
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def __lock_default(self):
+        """ Trait initializer. """
+
+        return threading.Lock()
+
+    def _cache_control(self, headers):
+        """ Return the 'Cache-Control' directives in a response's headers.
+
+        Returns a tuple in the form (no_store, max_age) where 'max_age' is 0
+        if the document must be revalidated every time it is used.
+
+        """
+
+        cache_control = headers.get('cache-control', '').lower()
+
+        no_store = 'no-store' in cache_control
+        match    = MAX_AGE.search(cache_control)
+        if match is not None and 'no-cache' not in cache_control:
+            max_age = int(match.group(1))
+
+        else:
+            max_age = 0
+
+        return no_store, max_age
+
+    def _get(self, url, headers):
+        """ GET a URL, reusing an idle connection if there is one.
+
+        Returns a tuple in the form (status, headers, body) where the
+        headers are a dictionary with lower case names.
+
+        """
+
+        for redirect in range(self.max_redirects + 1):
+            scheme, netloc, path, query, fragment = urlparse.urlsplit(url)
+            if query:
+                path += '?' + query
+
+            status, response_headers, body = self._request(
+                netloc, path or '/', headers
+            )
+            if status not in REDIRECTS or 'location' not in response_headers:
+                break
+
+            url = urlparse.urljoin(url, response_headers['location'])
+            if not url.startswith('http://'):
+                break
+
+        return status, response_headers, body
+
+    def _request(self, netloc, path, headers):
+        """ Make a request, retrying once if a reused connection has died. """
+
+        connection, reused = self._get_connection(netloc)
+        try:
+            try:
+                response = self._send(connection, path, headers)
+
+            except (socket.error, httplib.HTTPException):
+                connection.close()
+                if not reused:
+                    raise
+
+                # The server may have closed an idle connection that we
+                # reused, so try again with a new one.
+                connection = httplib.HTTPConnection(
+                    netloc, timeout=self.timeout
+                )
+                response = self._send(connection, path, headers)
+
+            body = response.read()
+
+        except:
+            connection.close()
+            raise
+
+        response_headers = dict(
+            (name.lower(), value) for name, value in response.getheaders()
+        )
+
+        if response.will_close:
+            connection.close()
+
+        else:
+            self._release_connection(netloc, connection)
+
+        return response.status, response_headers, body
+
+    def _send(self, connection, path, headers):
+        """ Send a GET request on a connection and return the response. """
+
+        connection.request('GET', path, headers=headers)
+
+        return connection.getresponse()
+
+    def _get_connection(self, netloc):
+        """ Return a connection to a host.
+
+        Returns a tuple in the form (connection, reused).
+
+        """
+
+        with self._lock:
+            connections = self._connections.get(netloc)
+            if connections:
+                return connections.pop(), True
+
+        return httplib.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def _release_connection(self, netloc, connection):
+        """ Return a connection to the pool (or close it if it is full). """
+
+        with self._lock:
+            connections = self._connections.setdefault(netloc, [])
+            if len(connections) < self.max_connections:
+                connections.append(connection)
+                connection = None
+
+        if connection is not None:
+            connection.close()
+
+        return
+
+    #### Methods for the disk cache ###########################################
+
+    def _get_filename(self, url, extension):
+        """ Return the name of a cache file for a URL. """
+
+        key = hashlib.sha1(url).hexdigest()
+
+        return os.path.join(self.cache_directory, key + extension)
+
+    def _load_body(self, url):
+        """ Load the cached body of a document.
+
+        Return None if the body is not cached (even if its entry is).
+
+        """
+
+        try:
+            f = file(self._get_filename(url, '.body'), 'rb')
+
+        except IOError:
+            return None
+
+        try:
+            body = f.read()
+
+        finally:
+            f.close()
+
+        return body
+
+    def _load_entry(self, url):
+        """ Load the cache entry for a URL.
+
+        Return None if the document is not cached.
+
+        """
+
+        if len(self.cache_directory) == 0:
+            return None
+
+        try:
+            f = file(self._get_filename(url, '.entry'), 'rb')
+
+        except IOError:
+            return None
+
+        try:
+            try:
+                entry = cPickle.load(f)
+
+            except Exception:
+                logger.exception('reading cache entry for <%s>', url)
+                return None
+
+        finally:
+            f.close()
+
+        # Make sure that this isn't a hash collision!
+        if entry.get('url') != url:
+            return None
+
+        return entry
+
+    def _save_entry(self, url, headers, body, old_entry=None):
+        """ Save a document in the cache (if it is allowed to be cached). """
+
+        if len(self.cache_directory) == 0:
+            return
+
+        no_store, max_age = self._cache_control(headers)
+        if no_store:
+            return
+
+        # A '304 Not Modified' response need not repeat the validators.
+        if old_entry is None:
+            old_entry = dict(etag=None, last_modified=None)
+
+        entry = dict(
+            url           = url,
+            etag          = headers.get('etag', old_entry['etag']),
+            last_modified = headers.get(
+                'last-modified', old_entry['last_modified']
+            ),
+            expires       = time.time() + max_age
+        )
+
+        # A cache that can't be written to (e.g. because the directory is read
+        # only or the disk is full) just means that the document isn't cached.
+        try:
+            if not os.path.isdir(self.cache_directory):
+                os.makedirs(self.cache_directory)
+
+            # Write to temporary files and then rename them so that concurrent
+            # readers never see a partly written file.
+            for extension, data in [('.body', body), ('.entry', entry)]:
+                filename  = self._get_filename(url, extension)
+                temporary = '%s.%d.%d' % (
+                    filename, os.getpid(), threading.current_thread().ident
+                )
+
+                f = file(temporary, 'wb')
+                try:
+                    if extension == '.body':
+                        f.write(data)
+
+                    else:
+                        cPickle.dump(data, f, cPickle.HIGHEST_PROTOCOL)
+
+                finally:
+                    f.close()
+
+                replace_file(temporary, filename)
+
+        except (IOError, OSError):
+            logger.exception('writing cache entry for <%s>', url)
+
+        return
+
+#### EOF ######################################################################
@@ -0,0 +1,164 @@
+""" A resource manager that caches the contents of resources. """
+
+
+# Standard library imports.
+import collections, logging, threading
+from cStringIO import StringIO
+
+# Enthought library imports.
+from traits.api import Any, Int
+
+# Local imports.
+from resource_manager import ResourceManager
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+class CachingResourceManager(ResourceManager):
+    """ A resource manager that caches the contents of resources.
+
+    The contents of resources are kept in memory in a least recently used
+    cache that holds at most 'max_bytes' bytes. Every time a resource is
+    requested it is revalidated (by modification time for files and package
+    resources, and by 'ETag'/'Last-Modified' for HTTP documents) and only
+    read again if it has changed.
+
+    Only resources whose protocol has a 'read_if_modified' method are cached
+    (the default protocols all do). For any others this behaves just like a
+    normal resource manager.
+
+    """
+
+    #### 'CachingResourceManager' interface ###################################
+
+    # The maximum number of bytes of resource contents to cache.
+    max_bytes = Int(16 * 1024 * 1024)
+
+    # The number of requests served from the cache.
+    hits = Int
+
+    # The number of requests that had to read the resource.
+    misses = Int
+
+    # The number of bytes currently in the cache.
+    size = Int
+
+    #### Private interface ####################################################
+
+    # The cached resources (the least recently used first).
+    #
+    # { url : (validator, contents) }
+    _cache = Any
+
+    # The lock that protects the cache.
+    _lock = Any
+
+    ###########################################################################
+    # 'IResourceManager' interface.
+    ###########################################################################
+
+    def file(self, url):
+        """ Return a readable file-like object for the specified url. """
+
+        protocol_name, address = url.split('://')
+
+        protocol = self.resource_protocols.get(protocol_name)
+        if protocol is None:
+            raise ValueError('unknown protocol in URL %s' % url)
+
+        read_if_modified = getattr(protocol, 'read_if_modified', None)
+        if read_if_modified is None:
+            return protocol.file(address)
+
+        return StringIO(self._get_contents(url, address, read_if_modified))
+
+    ###########################################################################
+    # 'CachingResourceManager' interface.
+    ###########################################################################
+
+    def clear(self):
+        """ Discard all cached resources. """
+
+        with self._lock:
+            self._cache.clear()
+            self.size = 0
+
+        return
+
+    def get_statistics(self):
+        """ Return the cache statistics.
+
+        The statistics are returned as a dictionary containing the number of
+        'hits' and 'misses', and the current 'size' (in bytes) of the cache.
+
+        """
+
+        return dict(hits=self.hits, misses=self.misses, size=self.size)
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def __cache_default(self):
+        """ Trait initializer. """
+
+        return collections.OrderedDict()
+
+    def __lock_default(self):
+        """ Trait initializer. """
+
+        return threading.RLock()
+
+    def _get_contents(self, url, address, read_if_modified):
+        """ Return the contents of a resource (from the cache if possible). """
+
+        with self._lock:
+            validator, contents = self._cache.get(url, (None, None))
+
+        new_contents, new_validator = read_if_modified(address, validator)
+
+        with self._lock:
+            if new_contents is None:
+                self.hits += 1
+
+                # This moves the resource to the most recently used end.
+                self._update_cache(url, validator, contents)
+
+            else:
+                self.misses += 1
+                contents = new_contents
+                self._update_cache(url, new_validator, contents)
+
+        return contents
+
+    def _update_cache(self, url, validator, contents):
+        """ Put a resource in the cache.
+
+        This must be called with the lock held.
+
+        """
+
+        old = self._cache.pop(url, None)
+        if old is not None:
+            self.size -= len(old[1])
+
+        # Resources that can't be revalidated, or that are too big, are not
+        # cached.
+        if validator is None or len(contents) > self.max_bytes:
+            return
+
+        self._cache[url] = (validator, contents)
+        self.size += len(contents)
+
+        while self.size > self.max_bytes:
+            evicted_url, (evicted_validator, evicted_contents) = \
+                self._cache.popitem(last=False)
+            self.size -= len(evicted_contents)
+
+            logger.debug('evicted resource <%s>', evicted_url)
+
+        return
+
+#### EOF ######################################################################
@@ -2,7 +2,7 @@
 
 
 # Standard library imports.
-import errno
+import errno, os
 
 # Enthought library imports.
 from traits.api import HasTraits, implements
@@ -38,4 +38,68 @@ class FileResourceProtocol(HasTraits):
 
         return f
 
+    ###########################################################################
+    # 'FileResourceProtocol' interface.
+    ###########################################################################
+
+    def buffer(self, address):
+        """ Return a read-only buffer for the specified address.
+
+        The file is memory-mapped rather than read.
+
+        """
+
+        # Local imports.
+        from mmap_resource_protocol import map_file, read_only_view
+
+        return read_only_view(map_file(address))
+
+    def get_mtime(self, address):
+        """ Return the modification time of the resource at an address. """
+
+        try:
+            mtime = os.path.getmtime(address)
+
+        except OSError, e:
+            if e.errno == errno.ENOENT:
+                raise NoSuchResourceError(address)
+
+            else:
+                raise
+
+        return mtime
+
+    def read_if_modified(self, address, validator=None):
+        """ Read the contents of a resource if it has been modified.
+
+        'validator' is the validator returned when the resource was last
+        read (the file's modification time and size). Returns a tuple in the
+        form (contents, validator) where 'contents' is None if the resource
+        has not been modified.
+
+        """
+
+        try:
+            stat = os.stat(address)
+
+        except OSError, e:
+            if e.errno == errno.ENOENT:
+                raise NoSuchResourceError(address)
+
+            else:
+                raise
+
+        new_validator = (stat.st_mtime, stat.st_size)
+        if new_validator == validator:
+            return None, validator
+
+        f = self.file(address)
+        try:
+            contents = f.read()
+
+        finally:
+            f.close()
+
+        return contents, new_validator
+
 #### EOF ######################################################################
@@ -33,4 +33,60 @@ class HTTPResourceProtocol(HasTraits):
 
         return f
 
+    ###########################################################################
+    # 'HTTPResourceProtocol' interface.
+    ###########################################################################
+
+    def read_if_modified(self, address, validator=None):
+        """ Read the contents of a resource if it has been modified.
+
+        'validator' is the validator returned when the resource was last
+        read. Returns a tuple in the form (contents, validator) where
+        'contents' is None if the resource has not been modified.
+
+        The validator is a tuple containing the 'ETag' and 'Last-Modified'
+        headers of the response, and the request is made conditional on them.
+
+        """
+
+        # Do the import here 'cos I'm not sure how much this will actually
+        # be used.
+        import urllib2
+
+        request = urllib2.Request('http://' + address)
+        if validator is not None:
+            etag, last_modified = validator
+            if etag is not None:
+                request.add_header('If-None-Match', etag)
+
+            if last_modified is not None:
+                request.add_header('If-Modified-Since', last_modified)
+
+        try:
+            f = urllib2.urlopen(request)
+
+        except urllib2.HTTPError, e:
+            if e.code == 304:
+                return None, validator
+
+            raise NoSuchResourceError('http://' + address)
+
+        try:
+            contents = f.read()
+            headers  = f.info()
+
+        finally:
+            f.close()
+
+        new_validator = (
+            headers.getheader('ETag'), headers.getheader('Last-Modified')
+        )
+
+        # If the server doesn't give us anything to revalidate with then we
+        # can't cache the contents.
+        if new_validator == (None, None):
+            new_validator = None
+
+        return contents, new_validator
+
 #### EOF ######################################################################
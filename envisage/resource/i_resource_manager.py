@@ -14,6 +14,22 @@ class IResourceManager(Interface):
     # The protocols used by the manager to resolve resource URLs.
     resource_protocols = Instance(IResourceProtocol)
 
+    def buffer(self, url):
+        """ Return a read-only buffer for the specified url.
+
+        Raise a 'NoSuchResourceError' if the resource does not exist.
+
+        Where possible (e.g. for 'file', 'mmap' and unzipped 'pkgfile'
+        resources) the buffer is a view of a memory-mapped file, so the
+        memory is shared with anything else that maps the same file and the
+        data is only paged in as it is used.
+
+        e.g.::
+
+          table = manager.buffer('mmap:///usr/share/acme/table.dat')
+
+        """
+
     def file(self, url):
         """ Return a readable file-like object for the specified url.
 
@@ -25,4 +41,30 @@ class IResourceManager(Interface):
 
         """
 
+    def files(self, urls, max_workers=8):
+        """ Fetch the resources at the specified urls concurrently.
+
+        Up to 'max_workers' resources are fetched at the same time, so one
+        slow resource (e.g. on a remote server) does not hold up the others.
+        The contents of each resource are read completely before this method
+        returns.
+
+        Returns a list in the same order as 'urls', with a tuple in the form
+        (file, error) for each resource. If the resource was fetched
+        successfully then 'file' is a readable file-like object containing
+        its contents and 'error' is None, otherwise 'file' is None and
+        'error' is the exception that was raised (e.g. a
+        'NoSuchResourceError').
+
+        """
+
+    def get_mtime(self, url):
+        """ Return the modification time of the resource at a url.
+
+        Return None if the resource's protocol cannot tell (e.g. for HTTP
+        documents). Raise a 'NoSuchResourceError' if the resource does not
+        exist.
+
+        """
+
 #### EOF ######################################################################
@@ -0,0 +1,82 @@
+""" A resource protocol for memory-mapped files. """
+
+
+# Standard library imports.
+import errno, mmap
+
+# Local imports.
+from file_resource_protocol import FileResourceProtocol
+from no_such_resource_error import NoSuchResourceError
+
+
+def map_file(filename):
+    """ Memory-map a file for reading.
+
+    Returns a read-only 'mmap' object, or None if the file is empty (empty
+    files cannot be mapped).
+
+    """
+
+    try:
+        f = file(filename, 'rb')
+
+    except IOError, e:
+        if e.errno == errno.ENOENT:
+            raise NoSuchResourceError(filename)
+
+        else:
+            raise
+
+    # The mapping stays valid after the file is closed.
+    try:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        except ValueError:
+            mapping = None
+
+    finally:
+        f.close()
+
+    return mapping
+
+
+def read_only_view(data):
+    """ Return a read-only view of a string or a memory-mapped file.
+
+    This is a 'memoryview' where possible. On Python 2 'mmap' objects do not
+    support the 'memoryview' buffer interface, so they are wrapped in a
+    (read-only) 'buffer' instead. Either way the data is not copied.
+
+    """
+
+    if data is None:
+        data = ''
+
+    try:
+        view = memoryview(data)
+
+    except TypeError:
+        view = buffer(data)
+
+    return view
+
+
+class MMapResourceProtocol(FileResourceProtocol):
+    """ A resource protocol for memory-mapped files.
+
+    An address for this protocol is the name of a file in the local file
+    system (just as for the 'file' protocol).
+
+    The pages of a memory-mapped file are shared between everything that
+    maps it, so large read-only data files (e.g. lookup tables) can be used
+    by many plugins without each one having its own copy. Use the resource
+    manager's 'buffer' method to get a read-only view of the data ('file'
+    still returns an ordinary file object).
+
+    The 'file' protocol maps files for 'buffer' too, this protocol just
+    makes the intent explicit in the URL.
+
+    """
+
+#### EOF ######################################################################
@@ -2,7 +2,7 @@
 
 
 # Standard library imports.
-import errno, pkg_resources
+import errno, os, pkg_resources
 
 # Enthought library imports.
 from traits.api import HasTraits, implements
@@ -57,4 +57,106 @@ class PackageResourceProtocol(HasTraits):
 
         return f
 
+    ###########################################################################
+    # 'PackageResourceProtocol' interface.
+    ###########################################################################
+
+    def buffer(self, address):
+        """ Return a read-only buffer for the specified address.
+
+        Resources in the file system are memory-mapped. Resources in an
+        archive (e.g. a zipped egg) have to be read (and hence copied).
+
+        """
+
+        # Local imports.
+        from mmap_resource_protocol import map_file, read_only_view
+
+        package, resource_name = address.split('/', 1)
+
+        try:
+            provider = pkg_resources.get_provider(package)
+
+        except ImportError:
+            raise NoSuchResourceError(address)
+
+        if isinstance(provider, pkg_resources.DefaultProvider):
+            filename = pkg_resources.resource_filename(package, resource_name)
+            try:
+                return read_only_view(map_file(filename))
+
+            except NoSuchResourceError:
+                raise NoSuchResourceError(address)
+
+        f = self.file(address)
+        try:
+            contents = f.read()
+
+        finally:
+            f.close()
+
+        return read_only_view(contents)
+
+    def get_mtime(self, address):
+        """ Return the modification time of the resource at an address.
+
+        This is the modification time of the resource's file, or of the
+        archive that contains it (e.g. for a zipped egg). Return None if it
+        cannot be determined.
+
+        """
+
+        package, resource_name = address.split('/', 1)
+
+        try:
+            provider = pkg_resources.get_provider(package)
+
+        except ImportError:
+            raise NoSuchResourceError(address)
+
+        # Resources in an archive (e.g. a zipped egg) change when the archive
+        # does.
+        archive = getattr(getattr(provider, 'loader', None), 'archive', None)
+        if archive is not None:
+            filename = archive
+
+        elif isinstance(provider, pkg_resources.DefaultProvider):
+            filename = pkg_resources.resource_filename(package, resource_name)
+
+        else:
+            return None
+
+        try:
+            mtime = os.path.getmtime(filename)
+
+        except OSError:
+            mtime = None
+
+        return mtime
+
+    def read_if_modified(self, address, validator=None):
+        """ Read the contents of a resource if it has been modified.
+
+        'validator' is the validator returned when the resource was last
+        read. Returns a tuple in the form (contents, validator) where
+        'contents' is None if the resource has not been modified.
+
+        The validator is the modification time of the resource's file, or of
+        the archive that contains it (e.g. for a zipped egg).
+
+        """
+
+        new_validator = self.get_mtime(address)
+        if new_validator is not None and new_validator == validator:
+            return None, validator
+
+        f = self.file(address)
+        try:
+            contents = f.read()
+
+        finally:
+            f.close()
+
+        return contents, new_validator
+
 #### EOF ######################################################################
@@ -1,6 +1,9 @@
 """ The default resource manager. """
 
 
+# Standard library imports.
+from cStringIO import StringIO
+
 # Enthought library imports.
 from traits.api import Dict, HasTraits, Str, implements
 
@@ -32,18 +35,49 @@ class ResourceManager(HasTraits):
         # that doesn't use the default protocol(s).
         from file_resource_protocol import FileResourceProtocol
         from http_resource_protocol import HTTPResourceProtocol
+        from mmap_resource_protocol import MMapResourceProtocol
         from package_resource_protocol import PackageResourceProtocol
+        from zip_resource_protocol import ZipResourceProtocol
 
         resource_protocols = {
             'file'    : FileResourceProtocol(),
             'http'    : HTTPResourceProtocol(),
-            'pkgfile' : PackageResourceProtocol()
+            'mmap'    : MMapResourceProtocol(),
+            'pkgfile' : PackageResourceProtocol(),
+            'zip'     : ZipResourceProtocol()
         }
 
         return resource_protocols
 
     #### Methods ##############################################################
 
+    def buffer(self, url):
+        """ Return a read-only buffer for the specified url. """
+
+        protocol_name, address = url.split('://')
+
+        protocol = self.resource_protocols.get(protocol_name)
+        if protocol is None:
+            raise ValueError('unknown protocol in URL %s' % url)
+
+        # Protocols that can provide a buffer without copying the data (e.g.
+        # by memory-mapping a file) do so, otherwise the resource is read.
+        buffer = getattr(protocol, 'buffer', None)
+        if buffer is not None:
+            return buffer(address)
+
+        # Local imports.
+        from mmap_resource_protocol import read_only_view
+
+        f = protocol.file(address)
+        try:
+            contents = f.read()
+
+        finally:
+            f.close()
+
+        return read_only_view(contents)
+
     def file(self, url):
         """ Return a readable file-like object for the specified url. """
 
@@ -55,4 +89,64 @@ class ResourceManager(HasTraits):
 
         return protocol.file(address)
 
+    def files(self, urls, max_workers=8):
+        """ Fetch the resources at the specified urls concurrently. """
+
+        if len(urls) < 2 or max_workers < 2:
+            return map(self._fetch, urls)
+
+        # Standard library imports.
+        #
+        # We do the import here as most resource managers never need it.
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(min(max_workers, len(urls)))
+        try:
+            results = pool.map(self._fetch, urls)
+
+        finally:
+            pool.close()
+            pool.join()
+
+        return results
+
+    def get_mtime(self, url):
+        """ Return the modification time of the resource at a url. """
+
+        protocol_name, address = url.split('://')
+
+        protocol = self.resource_protocols.get(protocol_name)
+        if protocol is None:
+            raise ValueError('unknown protocol in URL %s' % url)
+
+        get_mtime = getattr(protocol, 'get_mtime', None)
+        if get_mtime is None:
+            return None
+
+        return get_mtime(address)
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _fetch(self, url):
+        """ Read the contents of a resource into memory.
+
+        Returns a tuple in the form (file, error), see 'files'.
+
+        """
+
+        try:
+            f = self.file(url)
+            try:
+                contents = f.read()
+
+            finally:
+                f.close()
+
+        except Exception, e:
+            return None, e
+
+        return StringIO(contents), None
+
 #### EOF ######################################################################
@@ -0,0 +1,269 @@
+""" Tests for the caching HTTP resource protocol. """
+
+
+# Standard library imports.
+import BaseHTTPServer, glob, os, shutil, socket, SocketServer, tempfile, threading
+import unittest
+
+# Enthought library imports.
+from envisage.resource.api import CachingHTTPResourceProtocol
+from envisage.resource.api import NoSuchResourceError
+
+
+class DocumentHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """ Serves a single document over keep-alive connections. """
+
+    # Use keep-alive connections.
+    protocol_version = 'HTTP/1.1'
+
+    # The document contents, its 'ETag' and its 'Cache-Control' header.
+    contents      = 'version 1'
+    etag          = '"1"'
+    cache_control = 'no-cache'
+
+    # The number of connections and requests made to the server, and the
+    # status of each response.
+    connections = 0
+    statuses    = []
+
+    def setup(self):
+        """ Set up a new connection. """
+
+        DocumentHandler.connections += 1
+
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+
+        return
+
+    def do_GET(self):
+        """ Handle a GET request. """
+
+        if self.path != '/doc':
+            self._send(404, '')
+
+        elif self.headers.getheader('If-None-Match') == self.etag:
+            self._send(304, None)
+
+        else:
+            self._send(200, self.contents)
+
+        return
+
+    def log_message(self, *args):
+        """ Don't log requests. """
+
+        return
+
+    def _send(self, status, contents):
+        """ Send a response. """
+
+        self.statuses.append(status)
+
+        self.send_response(status)
+        self.send_header('ETag', self.etag)
+        self.send_header('Cache-Control', self.cache_control)
+        if contents is not None:
+            self.send_header('Content-Length', str(len(contents)))
+            self.end_headers()
+            self.wfile.write(contents)
+
+        else:
+            self.end_headers()
+
+        return
+
+
+class DocumentServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """ Serves each (keep-alive) connection in its own thread. """
+
+    daemon_threads = True
+
+
+class CachingHTTPResourceProtocolTestCase(unittest.TestCase):
+    """ Tests for the caching HTTP resource protocol. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        DocumentHandler.contents      = 'version 1'
+        DocumentHandler.etag          = '"1"'
+        DocumentHandler.cache_control = 'no-cache'
+        DocumentHandler.connections   = 0
+        DocumentHandler.statuses      = []
+
+        self.tmpdir = tempfile.mkdtemp()
+
+        self.server = DocumentServer(('127.0.0.1', 0), DocumentHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+        self.address = '127.0.0.1:%d/doc' % self.server.server_port
+
+        self.protocol = CachingHTTPResourceProtocol(
+            cache_directory=self.tmpdir, timeout=5.0
+        )
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        self.protocol.close()
+        self._stop_server()
+        shutil.rmtree(self.tmpdir)
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_connections_are_reused(self):
+        """ connections are reused """
+
+        for i in range(3):
+            contents = self.protocol.file(self.address).read()
+            self.assertEqual('version 1', contents)
+
+        self.assertEqual(1, DocumentHandler.connections)
+
+        return
+
+    def test_document_is_revalidated(self):
+        """ document is revalidated """
+
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+        self.assertEqual([200, 304], DocumentHandler.statuses)
+
+        DocumentHandler.contents = 'version 2'
+        DocumentHandler.etag     = '"2"'
+        self.assertEqual('version 2', self.protocol.file(self.address).read())
+        self.assertEqual([200, 304, 200], DocumentHandler.statuses)
+
+        # The cache is on disk, so a new protocol can use it too.
+        protocol = CachingHTTPResourceProtocol(cache_directory=self.tmpdir)
+        self.assertEqual('version 2', protocol.file(self.address).read())
+        self.assertEqual([200, 304, 200, 304], DocumentHandler.statuses)
+        protocol.close()
+
+        return
+
+    def test_fresh_document_is_not_revalidated(self):
+        """ fresh document is not revalidated """
+
+        DocumentHandler.cache_control = 'max-age=3600'
+
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+
+        DocumentHandler.contents = 'version 2'
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+        self.assertEqual([200], DocumentHandler.statuses)
+
+        return
+
+    def test_no_store_document_is_not_cached(self):
+        """ no-store document is not cached """
+
+        DocumentHandler.cache_control = 'no-store'
+
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+        self.assertEqual([200, 200], DocumentHandler.statuses)
+
+        return
+
+    def test_stale_document_is_used_when_server_is_down(self):
+        """ stale document is used when server is down """
+
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+        self.protocol.close()
+        self._stop_server()
+
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+
+        # A document that was never fetched can't be used.
+        self.failUnlessRaises(
+            socket.error, self.protocol.file, self.address + '?x'
+        )
+
+        return
+
+    def test_missing_body_is_a_cache_miss(self):
+        """ missing body is a cache miss """
+
+        DocumentHandler.cache_control = 'max-age=3600'
+
+        self.assertEqual('version 1', self.protocol.file(self.address).read())
+
+        # Remove the cached body but leave its entry.
+        for filename in glob.glob(os.path.join(self.tmpdir, '*.body')):
+            os.remove(filename)
+
+        DocumentHandler.contents = 'version 2'
+        DocumentHandler.etag     = '"2"'
+        self.assertEqual('version 2', self.protocol.file(self.address).read())
+        self.assertEqual([200, 200], DocumentHandler.statuses)
+
+        # Without a body the document can't be used when the server is down.
+        for filename in glob.glob(os.path.join(self.tmpdir, '*.body')):
+            os.remove(filename)
+
+        self.protocol.close()
+        self._stop_server()
+        self.failUnlessRaises(socket.error, self.protocol.file, self.address)
+
+        return
+
+    def test_unwritable_cache_is_ignored(self):
+        """ unwritable cache is ignored """
+
+        # The cache directory can't be created because a file is in the way.
+        filename = os.path.join(self.tmpdir, 'not_a_directory')
+        file(filename, 'w').close()
+
+        protocol = CachingHTTPResourceProtocol(cache_directory=filename)
+        try:
+            self.assertEqual('version 1', protocol.file(self.address).read())
+            self.assertEqual('version 1', protocol.file(self.address).read())
+            self.assertEqual([200, 200], DocumentHandler.statuses)
+
+        finally:
+            protocol.close()
+
+        return
+
+    def test_no_such_resource(self):
+        """ no such resource """
+
+        self.failUnlessRaises(
+            NoSuchResourceError, self.protocol.file, self.address + 'x'
+        )
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _stop_server(self):
+        """ Stop the server (if it is running). """
+
+        if self.thread is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.thread = None
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
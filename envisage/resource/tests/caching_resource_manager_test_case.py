@@ -0,0 +1,177 @@
+""" Tests for the caching resource manager. """
+
+
+# Standard library imports.
+import BaseHTTPServer, os, shutil, tempfile, threading, unittest
+
+# Enthought library imports.
+from envisage.resource.api import CachingResourceManager
+from envisage.resource.api import NoSuchResourceError
+
+
+class DocumentHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """ Serves a single document with an 'ETag'. """
+
+    # The document contents and its 'ETag'.
+    contents = 'version 1'
+    etag     = '"1"'
+
+    def do_GET(self):
+        """ Handle a GET request. """
+
+        if self.headers.getheader('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+
+        else:
+            self.send_response(200)
+            self.send_header('ETag', self.etag)
+            self.send_header('Content-Length', str(len(self.contents)))
+            self.end_headers()
+            self.wfile.write(self.contents)
+
+        return
+
+    def log_message(self, *args):
+        """ Don't log requests. """
+
+        return
+
+
+class CachingResourceManagerTestCase(unittest.TestCase):
+    """ Tests for the caching resource manager. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        self.tmpdir = tempfile.mkdtemp()
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        shutil.rmtree(self.tmpdir)
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_file_resource_is_revalidated(self):
+        """ file resource is revalidated """
+
+        filename = os.path.join(self.tmpdir, 'foo.txt')
+        self._write(filename, 'foo')
+
+        rm = CachingResourceManager()
+        self.assertEqual('foo', rm.file('file://' + filename).read())
+        self.assertEqual('foo', rm.file('file://' + filename).read())
+        self.assertEqual(1, rm.misses)
+        self.assertEqual(1, rm.hits)
+
+        # Change the file.
+        self._write(filename, 'foobar')
+        os.utime(filename, (0, 0))
+        self.assertEqual('foobar', rm.file('file://' + filename).read())
+        self.assertEqual(2, rm.misses)
+        self.assertEqual(6, rm.size)
+
+        os.remove(filename)
+        self.failUnlessRaises(
+            NoSuchResourceError, rm.file, 'file://' + filename
+        )
+
+        return
+
+    def test_package_resource_is_cached(self):
+        """ package resource is cached """
+
+        rm = CachingResourceManager()
+
+        url = 'pkgfile://envisage.resource/api.py'
+        contents = rm.file(url).read()
+        self.assertEqual(contents, rm.file(url).read())
+        self.assertEqual(
+            dict(hits=1, misses=1, size=len(contents)), rm.get_statistics()
+        )
+
+        return
+
+    def test_least_recently_used_resources_are_evicted(self):
+        """ least recently used resources are evicted """
+
+        rm = CachingResourceManager(max_bytes=10)
+
+        urls = []
+        for name in ['a', 'b', 'c']:
+            filename = os.path.join(self.tmpdir, name)
+            self._write(filename, name * 4)
+            urls.append('file://' + filename)
+
+        rm.file(urls[0])
+        rm.file(urls[1])
+        rm.file(urls[0])
+        rm.file(urls[2])
+        self.assertEqual(8, rm.size)
+
+        # 'b' was evicted, but 'a' was not.
+        rm.file(urls[0])
+        self.assertEqual(2, rm.hits)
+        rm.file(urls[1])
+        self.assertEqual(2, rm.hits)
+
+        return
+
+    def test_http_resource_is_revalidated(self):
+        """ http resource is revalidated """
+
+        server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), DocumentHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:%d/doc' % server.server_port
+
+            rm = CachingResourceManager()
+            self.assertEqual('version 1', rm.file(url).read())
+            self.assertEqual('version 1', rm.file(url).read())
+            self.assertEqual(1, rm.hits)
+
+            DocumentHandler.contents = 'version 2'
+            DocumentHandler.etag     = '"2"'
+            self.assertEqual('version 2', rm.file(url).read())
+            self.assertEqual(2, rm.misses)
+
+        finally:
+            DocumentHandler.contents = 'version 1'
+            DocumentHandler.etag     = '"1"'
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _write(self, filename, contents):
+        """ Write the contents of a file. """
+
+        f = file(filename, 'wb')
+        f.write(contents)
+        f.close()
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
@@ -161,6 +161,110 @@ class ResourceManagerTestCase(unittest.TestCase):
         return
 
 
+    def test_files(self):
+        """ files """
+
+        rm = ResourceManager()
+
+        urls = [
+            'pkgfile://envisage.resource/api.py',
+            'http://localhost:1234/file.dat',
+            'pkgfile://envisage.resource/bogus.py',
+            'bogus://foo/bar/baz'
+        ]
+
+        results = rm.files(urls, max_workers=4)
+        self.assertEqual(len(urls), len(results))
+
+        # The results are in the same order as the urls.
+        f, error = results[0]
+        self.assertEqual(None, error)
+        self.assertEqual(rm.file(urls[0]).read(), f.read())
+
+        f, error = results[1]
+        self.assertEqual(None, error)
+        self.assertEqual('This is a test file.\n', f.read())
+
+        # Errors are returned rather than raised.
+        f, error = results[2]
+        self.assertEqual(None, f)
+        self.assert_(isinstance(error, NoSuchResourceError))
+
+        f, error = results[3]
+        self.assertEqual(None, f)
+        self.assert_(isinstance(error, ValueError))
+
+        return
+
+    def test_buffer(self):
+        """ buffer """
+
+        rm = ResourceManager()
+
+        # Get the filename of the 'api.py' file.
+        filename = resource_filename('envisage.resource', 'api.py')
+
+        g = file(filename, 'rb')
+        contents = g.read()
+        g.close()
+
+        urls = [
+            'file://' + filename,
+            'mmap://' + filename,
+            'pkgfile://envisage.resource/api.py'
+        ]
+
+        for url in urls:
+            buffer = rm.buffer(url)
+            self.assertEqual(contents, buffer[:])
+
+            # The buffer is read-only.
+            def assign():
+                buffer[0] = 'x'
+
+            self.failUnlessRaises(TypeError, assign)
+
+        # Protocols that can't map resources return a copy.
+        buffer = rm.buffer('http://localhost:1234/file.dat')
+        self.assertEqual('This is a test file.\n', buffer.tobytes())
+
+        return
+
+    def test_mmap_resource(self):
+        """ mmap resource """
+
+        rm = ResourceManager()
+
+        # Get the filename of the 'api.py' file.
+        filename = resource_filename('envisage.resource', 'api.py')
+
+        f = rm.file('mmap://' + filename)
+        contents = f.read()
+        f.close()
+
+        g = file(filename, 'rb')
+        self.assertEqual(g.read(), contents)
+        g.close()
+
+        return
+
+    def test_no_such_buffer_resource(self):
+        """ no such buffer resource """
+
+        rm = ResourceManager()
+
+        self.failUnlessRaises(
+            NoSuchResourceError, rm.buffer, 'mmap://../bogus.py'
+        )
+
+        self.failUnlessRaises(
+            NoSuchResourceError,
+            rm.buffer,
+            'pkgfile://envisage.resource/bogus.py'
+        )
+
+        return
+
     def test_unknown_protocol(self):
         """ unknown protocol """
 
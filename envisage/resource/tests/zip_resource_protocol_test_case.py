@@ -0,0 +1,199 @@
+""" Tests for the zip resource protocol. """
+
+
+# Standard library imports.
+import os, shutil, tempfile, unittest, zipfile
+
+# Enthought library imports.
+from envisage.resource.api import NoSuchResourceError, ResourceManager
+from envisage.resource.api import ZipResourceProtocol
+
+
+class ZipResourceProtocolTestCase(unittest.TestCase):
+    """ Tests for the zip resource protocol. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        self.tmpdir = tempfile.mkdtemp()
+
+        self.protocol = ZipResourceProtocol()
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        self.protocol.close()
+        shutil.rmtree(self.tmpdir)
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_members(self):
+        """ members """
+
+        archive = self._create_archive(
+            'acme.egg', {'acme/a.ini' : 'a' * 1000, 'acme/b.png' : 'b'}
+        )
+
+        f = self.protocol.file(archive + '!/acme/a.ini')
+        self.assertEqual('a' * 1000, f.read())
+        f.close()
+
+        f = self.protocol.file(archive + '!/acme/b.png')
+        self.assertEqual('b', f.read())
+        f.close()
+
+        # The archive is only opened once.
+        self.assertEqual([archive], self.protocol._handles.keys())
+
+        return
+
+    def test_members_are_streamed(self):
+        """ members are streamed """
+
+        lines = ''.join('line %d\n' % i for i in range(100000))
+        archive = self._create_archive('acme.egg', {'a' : lines, 'b' : 'b'})
+
+        f = self.protocol.file(archive + '!/a')
+        self.assertEqual('line 0\n', f.readline())
+        self.assertEqual('line', f.read(4))
+
+        # The archive file is in use until the member has been read...
+        self.assertEqual([], self.protocol._handles.keys())
+        self.assertEqual(' 1\n', f.readline())
+        self.assertEqual(lines.splitlines(True)[2:], list(f))
+        self.assertEqual('', f.read())
+
+        # ... at which point it goes back in the pool.
+        self.assertEqual([archive], self.protocol._handles.keys())
+        f.close()
+
+        # Closing a member before reading it all also gives the file back.
+        with self.protocol.file(archive + '!/a') as f:
+            f.read(10)
+
+        self.assertEqual([archive], self.protocol._handles.keys())
+        self.assertEqual('b', self.protocol.file(archive + '!/b').read())
+
+        return
+
+    def test_resource_manager(self):
+        """ resource manager """
+
+        archive = self._create_archive('acme.egg', {'acme/a.ini' : 'a'})
+
+        rm = ResourceManager()
+        f = rm.file('zip://' + archive + '!/acme/a.ini')
+        self.assertEqual('a', f.read())
+        f.close()
+
+        return
+
+    def test_no_such_resource(self):
+        """ no such resource """
+
+        archive = self._create_archive('acme.egg', {'acme/a.ini' : 'a'})
+
+        self.failUnlessRaises(
+            NoSuchResourceError, self.protocol.file, archive + '!/bogus.ini'
+        )
+
+        self.failUnlessRaises(
+            NoSuchResourceError, self.protocol.file, archive + 'x!/acme/a.ini'
+        )
+
+        self.failUnlessRaises(
+            NoSuchResourceError, self.protocol.file, archive
+        )
+
+        return
+
+    def test_open_archives_are_bounded(self):
+        """ open archives are bounded """
+
+        self.protocol.max_open_archives = 2
+
+        archives = [
+            self._create_archive('%d.egg' % i, {'x' : str(i)})
+            for i in range(3)
+        ]
+
+        for i, archive in enumerate(archives):
+            f = self.protocol.file(archive + '!/x')
+            self.assertEqual(str(i), f.read())
+
+        # The least recently used archive was closed...
+        self.assertEqual(archives[1:], self.protocol._handles.keys())
+
+        # ... but its index was kept, and it can still be used.
+        self.assertEqual(3, len(self.protocol._indexes))
+        self.assertEqual('0', self.protocol.file(archives[0] + '!/x').read())
+
+        return
+
+    def test_modified_archive_is_reindexed(self):
+        """ modified archive is reindexed """
+
+        archive = self._create_archive('acme.egg', {'a' : 'a'})
+        self.assertEqual('a', self.protocol.file(archive + '!/a').read())
+
+        os.remove(archive)
+        self._create_archive('acme.egg', {'a' : 'aa', 'b' : 'bbb'})
+        os.utime(archive, (0, 0))
+
+        self.assertEqual('aa', self.protocol.file(archive + '!/a').read())
+        self.assertEqual('bbb', self.protocol.file(archive + '!/b').read())
+
+        return
+
+    def test_read_if_modified(self):
+        """ read if modified """
+
+        archive = self._create_archive('acme.egg', {'a' : 'a'})
+
+        contents, validator = self.protocol.read_if_modified(archive + '!/a')
+        self.assertEqual('a', contents)
+
+        self.assertEqual(
+            (None, validator),
+            self.protocol.read_if_modified(archive + '!/a', validator)
+        )
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _create_archive(self, name, members):
+        """ Create a zip archive containing the specified members. """
+
+        filename = os.path.join(self.tmpdir, name)
+
+        # Alternate between compressed and uncompressed members.
+        archive = zipfile.ZipFile(filename, 'w')
+        for i, (member, contents) in enumerate(sorted(members.items())):
+            compress_type = [zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED][i % 2]
+            archive.writestr(
+                zipfile.ZipInfo(member), contents, compress_type
+            )
+
+        archive.close()
+
+        return filename
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
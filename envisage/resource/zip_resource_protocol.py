@@ -0,0 +1,465 @@
+""" A resource protocol for members of zip archives (e.g. zipped eggs). """
+
+
+# Standard library imports.
+import collections, errno, os, struct, threading, zipfile, zlib
+
+# Enthought library imports.
+from traits.api import Any, Dict, HasTraits, Int, implements
+
+# Local imports.
+from i_resource_protocol import IResourceProtocol
+from no_such_resource_error import NoSuchResourceError
+
+
+# The signature and size of the local header that precedes each member.
+LOCAL_HEADER_SIGNATURE = 'PK\003\004'
+LOCAL_HEADER_SIZE      = 30
+
+# The number of (compressed) bytes read from an archive at a time.
+CHUNK_SIZE = 64 * 1024
+
+
+class ZipResourceProtocol(HasTraits):
+    """ A resource protocol for members of zip archives (e.g. zipped eggs).
+
+    An address for this protocol is a string in the form::
+
+        'archive!/member'
+
+    e.g::
+
+        '/usr/lib/python2.7/site-packages/acme.ui-1.0.egg!/acme/ui/ui.ini'
+
+    Each archive's central directory is read once (when the archive is first
+    used) and kept in memory, and members are streamed directly from the
+    archive (nothing is extracted to the file system, and a member is only
+    decompressed as it is read). At most 'max_open_archives' archive files
+    are kept open, the least recently used being closed first.
+
+    The file returned for a member has the archive file to itself until the
+    member has been read to the end or the member file is closed.
+
+    If an archive is modified (i.e. its modification time or size changes)
+    then its central directory is read again.
+
+    """
+
+    implements(IResourceProtocol)
+
+    #### 'ZipResourceProtocol' interface ######################################
+
+    # The maximum number of archive files to keep open.
+    max_open_archives = Int(8)
+
+    #### Private interface ####################################################
+
+    # The open archive files (the least recently used first).
+    #
+    # { archive : file }
+    _handles = Any
+
+    # The central directory of each archive.
+    #
+    # { archive : ((mtime, size), { member : ZipInfo }) }
+    _indexes = Dict
+
+    # The lock that protects the open files and the indexes.
+    _lock = Any
+
+    ###########################################################################
+    # 'IResourceProtocol' interface.
+    ###########################################################################
+
+    def file(self, address):
+        """ Return a readable file-like object for the specified address. """
+
+        archive, member = self._parse_address(address)
+
+        f, stat = self._open(address, archive, member)
+
+        return f
+
+    ###########################################################################
+    # 'ZipResourceProtocol' interface.
+    ###########################################################################
+
+    def close(self):
+        """ Close all open archive files and discard their indexes. """
+
+        with self._lock:
+            for f in self._handles.values():
+                f.close()
+
+            self._handles.clear()
+            self._indexes = {}
+
+        return
+
+    def get_mtime(self, address):
+        """ Return the modification time of the resource at an address.
+
+        This is the modification time of the archive that contains it.
+
+        """
+
+        archive, member = self._parse_address(address)
+
+        return self._stat(address, archive)[0]
+
+    def read_if_modified(self, address, validator=None):
+        """ Read the contents of a resource if it has been modified.
+
+        'validator' is the validator returned when the resource was last
+        read (the modification time and size of the archive). Returns a
+        tuple in the form (contents, validator) where 'contents' is None if
+        the resource has not been modified.
+
+        """
+
+        archive, member = self._parse_address(address)
+        if self._stat(address, archive) == validator:
+            return None, validator
+
+        return self._read(address, archive, member)
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    #### Trait initializers ###################################################
+
+    def __handles_default(self):
+        """ Trait initializer. """
+
+        return collections.OrderedDict()
+
+    def __lock_default(self):
+        """ Trait initializer. """
+
+        return threading.Lock()
+
+    #### Methods ##############################################################
+
+    def _check_in(self, archive, f):
+        """ Return an archive file to the pool of open files. """
+
+        with self._lock:
+            if archive not in self._handles:
+                self._handles[archive] = f
+                f = None
+
+            while len(self._handles) > self.max_open_archives:
+                archive, evicted = self._handles.popitem(last=False)
+                evicted.close()
+
+        if f is not None:
+            f.close()
+
+        return
+
+    def _check_out(self, archive):
+        """ Take an open archive file from the pool (or open a new one).
+
+        Files are checked out so that only one thread at a time seeks and
+        reads in each file.
+
+        """
+
+        with self._lock:
+            f = self._handles.pop(archive, None)
+
+        if f is None:
+            f = file(archive, 'rb')
+
+        return f
+
+    def _get_index(self, address, archive, stat, f):
+        """ Return the central directory of an archive. """
+
+        with self._lock:
+            index_stat, index = self._indexes.get(archive, (None, None))
+
+        if index_stat != stat:
+            # A new (or modified) archive - any open file may refer to a
+            # previous version of it.
+            f.seek(0)
+            index = dict(
+                (info.filename, info)
+                for info in zipfile.ZipFile(f).infolist()
+            )
+
+            with self._lock:
+                self._indexes[archive] = (stat, index)
+
+        return index
+
+    def _parse_address(self, address):
+        """ Split an address into the archive and member names. """
+
+        if '!/' not in address:
+            raise NoSuchResourceError(address)
+
+        return address.split('!/', 1)
+
+    def _open(self, address, archive, member):
+        """ Open a member of an archive.
+
+        Returns a tuple in the form (file, validator) where 'file' is a
+        'ZipMemberFile' that has the archive file checked out.
+
+        """
+
+        stat = self._stat(address, archive)
+
+        f = self._check_out(archive)
+        try:
+            # The file may have been opened before the archive was replaced.
+            if os.fstat(f.fileno()).st_mtime != stat[0]:
+                f.close()
+                f = file(archive, 'rb')
+
+            info = self._get_index(address, archive, stat, f).get(member)
+            if info is None:
+                raise NoSuchResourceError(address)
+
+            member_file = ZipMemberFile(
+                f, info, lambda f: self._check_in(archive, f)
+            )
+
+        except:
+            f.close()
+            raise
+
+        return member_file, stat
+
+    def _read(self, address, archive, member):
+        """ Read a member of an archive.
+
+        Returns a tuple in the form (contents, validator).
+
+        """
+
+        f, stat = self._open(address, archive, member)
+        try:
+            contents = f.read()
+
+        finally:
+            f.close()
+
+        return contents, stat
+
+    def _stat(self, address, archive):
+        """ Return the modification time and size of an archive. """
+
+        try:
+            stat = os.stat(archive)
+
+        except OSError, e:
+            if e.errno in (errno.ENOENT, errno.ENOTDIR):
+                raise NoSuchResourceError(address)
+
+            else:
+                raise
+
+        return (stat.st_mtime, stat.st_size)
+
+
+class ZipMemberFile(object):
+    """ A readable file-like object for a member of an open archive.
+
+    The member's data is read from the archive (and decompressed) a chunk
+    at a time as it is read from this file, and its CRC is checked once it
+    has all been read.
+
+    """
+
+    def __init__(self, f, info, check_in):
+        """ Constructor.
+
+        'f' is the open archive file (which this file has to itself until
+        it is closed or read to the end), 'info' is the member's 'ZipInfo'
+        and 'check_in' is called with 'f' when this file has finished with
+        it.
+
+        """
+
+        if info.flag_bits & 0x1:
+            raise zipfile.BadZipfile('encrypted member %s' % info.filename)
+
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+
+        elif info.compress_type == zipfile.ZIP_STORED:
+            self._decompressor = None
+
+        else:
+            raise zipfile.BadZipfile(
+                'unsupported compression for %s' % info.filename
+            )
+
+        # The local header has its own (variable length) name and extra
+        # fields, so we have to read it to find where the data starts.
+        f.seek(info.header_offset)
+        header = f.read(LOCAL_HEADER_SIZE)
+        if header[:4] != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipfile('bad local header for %s' % info.filename)
+
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        f.seek(name_length + extra_length, os.SEEK_CUR)
+
+        # Is the file closed?
+        self.closed = False
+
+        # The member's name.
+        self.name = info.filename
+
+        # The open archive file (None once we have finished with it).
+        self._file = f
+
+        # Called with the archive file when we have finished with it.
+        self._check_in = check_in
+
+        # The member's 'ZipInfo'.
+        self._info = info
+
+        # The data that has been decompressed but not read yet.
+        self._buffer = ''
+
+        # The CRC of the data decompressed so far.
+        self._crc = 0
+
+        # The number of compressed bytes that have not been read yet.
+        self._remaining = info.compress_size
+
+        return
+
+    def __enter__(self):
+        """ Enter a 'with' statement. """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ Exit a 'with' statement. """
+
+        self.close()
+
+        return
+
+    def __iter__(self):
+        """ Iterate over the lines in the file. """
+
+        return iter(self.readline, '')
+
+    def close(self):
+        """ Close the file. """
+
+        self.closed  = True
+        self._buffer = ''
+        self._release()
+
+        return
+
+    def read(self, size=-1):
+        """ Read at most 'size' bytes (all of them if 'size' is negative). """
+
+        if size is None or size < 0:
+            chunks = [self._buffer]
+            while self._file is not None:
+                chunks.append(self._read_chunk())
+
+            self._buffer = ''
+
+            return ''.join(chunks)
+
+        while len(self._buffer) < size and self._file is not None:
+            self._buffer += self._read_chunk()
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        return data
+
+    def readline(self, size=-1):
+        """ Read a line (of at most 'size' bytes if 'size' is not negative).
+
+        """
+
+        while '\n' not in self._buffer and self._file is not None:
+            if size >= 0 and len(self._buffer) >= size:
+                break
+
+            self._buffer += self._read_chunk()
+
+        end = self._buffer.find('\n') + 1
+        if end == 0:
+            end = len(self._buffer)
+
+        if size >= 0:
+            end = min(end, size)
+
+        line, self._buffer = self._buffer[:end], self._buffer[end:]
+
+        return line
+
+    def readlines(self):
+        """ Read all of the lines in the file. """
+
+        return list(self)
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _read_chunk(self):
+        """ Read and decompress the next chunk of the member.
+
+        Once the member has all been read its CRC is checked, and we have
+        finished with the archive file.
+
+        """
+
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+
+        try:
+            chunk = self._file.read(min(CHUNK_SIZE, self._remaining))
+            if len(chunk) == 0 and self._remaining > 0:
+                raise zipfile.BadZipfile('truncated member %s' % self.name)
+
+            self._remaining -= len(chunk)
+
+            if self._decompressor is not None:
+                data = self._decompressor.decompress(chunk)
+                if self._remaining == 0:
+                    data += self._decompressor.flush()
+
+            else:
+                data = chunk
+
+            self._crc = zlib.crc32(data, self._crc)
+            if self._remaining == 0:
+                if self._crc & 0xffffffff != self._info.CRC:
+                    raise zipfile.BadZipfile('bad CRC for %s' % self.name)
+
+                self._release()
+
+        except:
+            # Don't give a file in an unknown state back to the pool.
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            raise
+
+        return data
+
+    def _release(self):
+        """ Give the archive file back (if we haven't already). """
+
+        f, self._file = self._file, None
+        if f is not None:
+            self._check_in(f)
+
+        return
+
+#### EOF ######################################################################
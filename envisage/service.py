@@ -2,16 +2,26 @@
 
 
 # Standard library imports.
-import logging
+import logging, threading, weakref
 
 # Enthought library imports.
 from traits.api import TraitType
 
+# Local imports.
+from service_lifetime import ServiceLifetimeManager
+from service_registry import ServiceRegistry
+
 
 # Logging.
 logger = logging.getLogger(__name__)
 
 
+# The service caches, keyed by the service registry that they cache.
+#
+# { service_registry : ServiceCache }
+_service_caches = weakref.WeakKeyDictionary()
+
+
 class Service(TraitType):
     """ A trait type used to access services.
 
@@ -25,9 +35,18 @@ class Service(TraitType):
     ###########################################################################
 
     def __init__(
-        self, protocol=None, query='', minimize='', maximize='', **metadata
+        self, protocol=None, query='', minimize='', maximize='', cache=False,
+        **metadata
     ):
-        """ Constructor. """
+        """ Constructor.
+
+        If 'cache' is True then the service is looked up the first time the
+        trait is read and then remembered until a service is registered or
+        unregistered against the same protocol. Only ask for this if the
+        service's properties (and the attributes used in the query) do not
+        change, as the cache does not notice when they do.
+
+        """
 
         super(Service, self).__init__(**metadata)
 
@@ -43,6 +62,9 @@ class Service(TraitType):
         # The optional name of the trait/property to maximize.
         self._maximize = maximize
 
+        # Should the service be cached?
+        self._cache = cache
+
         return
 
     ###########################################################################
@@ -54,11 +76,28 @@ class Service(TraitType):
 
         service_registry = self._get_service_registry(obj)
 
-        obj = service_registry.get_service(
+        service_cache = self._get_service_cache(service_registry)
+        if service_cache is not None:
+            try:
+                return service_cache.get(self._protocol, obj, trait_name)
+
+            except KeyError:
+                pass
+
+            # If the cache is invalidated whilst we are looking the service
+            # up then the service we find may already be stale.
+            generation = service_cache.get_generation(self._protocol)
+
+        service = service_registry.get_service(
             self._protocol, self._query, self._minimize, self._maximize
         )
 
-        return obj
+        if service_cache is not None:
+            service_cache.set(
+                self._protocol, obj, trait_name, service, generation
+            )
+
+        return service
 
     def set(self, obj, name, value):
         """ Trait type setter. """
@@ -69,6 +108,33 @@ class Service(TraitType):
     # Private interface.
     ###########################################################################
 
+    def _get_service_cache(self, service_registry):
+        """ Return the cache for a service registry.
+
+        Return None if the service should not be cached.
+
+        """
+
+        if not self._cache:
+            return None
+
+        # Applications (and workbench windows etc) delegate to the service
+        # registry that actually fires the 'registered' and 'unregistered'
+        # events.
+        while not isinstance(service_registry, ServiceRegistry):
+            service_registry = getattr(
+                service_registry, 'service_registry', None
+            )
+            if service_registry is None:
+                return None
+
+        service_cache = _service_caches.get(service_registry)
+        if service_cache is None:
+            service_cache = ServiceCache(service_registry)
+            _service_caches[service_registry] = service_cache
+
+        return service_cache
+
     def _get_service_registry(self, obj):
         """ Return the service registry in effect for an object. """
 
@@ -83,4 +149,135 @@ class Service(TraitType):
 
         return service_registry
 
+
+class ServiceCache(object):
+    """ A cache of the services looked up by 'Service' traits.
+
+    There is one cache per service registry. Services are cached per object
+    and trait name, and the cached services for a protocol are discarded
+    whenever a service is registered or unregistered against it.
+
+    Note that the cache does *not* notice changes to service properties or
+    to the attributes used in queries.
+
+    """
+
+    def __init__(self, service_registry):
+        """ Constructor. """
+
+        # The names of the protocols that have services registered with a
+        # lifetime other than 'singleton' (these must be looked up every time
+        # and so are never cached).
+        self._uncacheable = set(
+            service[0] for service in service_registry._services.values()
+
+            if isinstance(service[1], ServiceLifetimeManager)
+        )
+
+        # The cached services.
+        #
+        # { protocol_name : { obj : { trait_name : service } } }
+        self._services = {}
+
+        # The number of times that the cached services for each protocol have
+        # been invalidated.
+        #
+        # { protocol_name : int }
+        self._generations = {}
+
+        # The lock that makes checking the generation and caching a service
+        # atomic with respect to invalidation.
+        self._lock = threading.Lock()
+
+        # The cache must not keep the registry alive (the caches are keyed
+        # weakly by registry).
+        self._service_registry = weakref.ref(service_registry)
+
+        # The registry's 'registered' and 'unregistered' events may be fired
+        # later (and in another thread) than the change itself, so we listen
+        # to the event that is always fired straight away.
+        service_registry.on_trait_change(
+            self._on_services_modified, '_services_modified'
+        )
+
+        return
+
+    ###########################################################################
+    # 'ServiceCache' interface.
+    ###########################################################################
+
+    def get(self, protocol, obj, trait_name):
+        """ Return the cached service for an object's trait.
+
+        Raise a 'KeyError' if no service is cached.
+
+        """
+
+        protocol_name = self._service_registry()._get_protocol_name(protocol)
+
+        return self._services[protocol_name][obj][trait_name]
+
+    def get_generation(self, protocol):
+        """ Return the generation of the cached services for a protocol.
+
+        The generation changes every time the cached services are invalidated.
+
+        """
+
+        protocol_name = self._service_registry()._get_protocol_name(protocol)
+
+        return self._generations.get(protocol_name, 0)
+
+    def set(self, protocol, obj, trait_name, service, generation):
+        """ Cache the service for an object's trait.
+
+        'generation' is the generation of the cache when the service was
+        looked up. The service is not cached if the cache has been
+        invalidated since then.
+
+        """
+
+        protocol_name = self._service_registry()._get_protocol_name(protocol)
+        if protocol_name in self._uncacheable:
+            return
+
+        with self._lock:
+            if self._generations.get(protocol_name, 0) != generation:
+                return
+
+            services = self._services.get(protocol_name)
+            if services is None:
+                services = weakref.WeakKeyDictionary()
+                self._services[protocol_name] = services
+
+            services.setdefault(obj, {})[trait_name] = service
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _invalidate(self, protocol_name):
+        """ Discard the cached services for a protocol. """
+
+        with self._lock:
+            self._generations[protocol_name] = (
+                self._generations.get(protocol_name, 0) + 1
+            )
+            self._services.pop(protocol_name, None)
+
+        return
+
+    def _on_services_modified(self, modification):
+        """ Dynamic trait change handler. """
+
+        protocol_name, obj = modification
+        if isinstance(obj, ServiceLifetimeManager):
+            self._uncacheable.add(protocol_name)
+
+        self._invalidate(protocol_name)
+
+        return
+
 #### EOF ######################################################################
@@ -0,0 +1,416 @@
+""" Service lifetimes other than the default 'singleton'.
+
+By default, a service registered as a factory is created the first time it
+is looked up and then shared by everybody (i.e. it is a 'singleton'). A
+service offer can specify a different lifetime:-
+
+'per_thread'
+
+  Each thread gets its own instance of the service (created the first time
+  that the thread looks it up).
+
+'transient'
+
+  A new instance of the service is created every time it is looked up.
+
+pooled(min, max, idle_timeout)
+
+  Looking up the service returns a 'ServicePool' and instances are checked
+  out of (and returned to) the pool, e.g::
+
+    pool = application.get_service(IDatabase)
+    with pool.checkout() as database:
+        database.execute(...)
+
+  At most 'max' instances are ever created. Instances that have been idle for
+  longer than 'idle_timeout' seconds are discarded (and closed if they have
+  a 'close' method), but the pool never shrinks below 'min' instances.
+
+"""
+
+
+# Standard library imports.
+import collections, contextlib, logging, threading, time
+
+# Enthought library imports.
+from traits.api import Any, Dict, Either, Float, HasTraits, Int
+
+# Local imports.
+from import_manager import ImportManager
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+def pooled(min=0, max=10, idle_timeout=None):
+    """ Return a pooled lifetime for a service offer. """
+
+    return PooledLifetime(min=min, max=max, idle_timeout=idle_timeout)
+
+
+def create_service_lifetime_manager(lifetime, factory, properties):
+    """ Create the lifetime manager for a service.
+
+    Return None if the service is a 'singleton' (which is handled by the
+    service registry itself).
+
+    """
+
+    if lifetime == 'singleton':
+        manager = None
+
+    elif lifetime == 'per_thread':
+        manager = PerThreadService(factory=factory, properties=properties)
+
+    elif lifetime == 'transient':
+        manager = TransientService(factory=factory, properties=properties)
+
+    elif isinstance(lifetime, PooledLifetime):
+        manager = ServicePool(
+            factory      = factory,
+            properties   = properties,
+            min          = lifetime.min,
+            max          = lifetime.max,
+            idle_timeout = lifetime.idle_timeout
+        )
+
+    else:
+        raise ValueError('unknown service lifetime <%s>' % lifetime)
+
+    return manager
+
+
+class PooledLifetime(HasTraits):
+    """ The lifetime of services that are checked out of a pool. """
+
+    # The number of instances that are never discarded, even when idle.
+    min = Int(0)
+
+    # The maximum number of instances.
+    max = Int(10)
+
+    # The number of seconds after which an idle instance (over and above
+    # 'min') is discarded (None means never).
+    idle_timeout = Either(None, Float)
+
+
+class ServiceLifetimeManager(HasTraits):
+    """ The base class for all service lifetime managers.
+
+    A lifetime manager is registered in the service registry in place of the
+    service factory, and the registry asks it for the actual service every
+    time the service is looked up.
+
+    """
+
+    #### 'ServiceLifetimeManager' interface ###################################
+
+    # A callable (or a string that can be used to import a callable) that is
+    # the factory that creates the actual service objects.
+    factory = Any
+
+    # The properties that are passed as keyword arguments to the factory.
+    properties = Dict
+
+    ###########################################################################
+    # 'ServiceLifetimeManager' interface.
+    ###########################################################################
+
+    def get_service(self):
+        """ Return the service for the current lookup. """
+
+        raise NotImplementedError
+
+    ###########################################################################
+    # Protected 'ServiceLifetimeManager' interface.
+    ###########################################################################
+
+    def _create_service(self):
+        """ Create a new instance of the service. """
+
+        if isinstance(self.factory, basestring):
+            self.factory = ImportManager().import_symbol(self.factory)
+
+        return self.factory(**self.properties)
+
+
+class PerThreadService(ServiceLifetimeManager):
+    """ Creates one instance of a service per thread. """
+
+    #### Private interface ####################################################
+
+    # The thread local storage for the instances.
+    _local = Any
+
+    ###########################################################################
+    # 'ServiceLifetimeManager' interface.
+    ###########################################################################
+
+    def get_service(self):
+        """ Return the service for the current lookup. """
+
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._local.service = self._create_service()
+
+        return service
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def __local_default(self):
+        """ Trait initializer. """
+
+        return threading.local()
+
+
+class TransientService(ServiceLifetimeManager):
+    """ Creates a new instance of a service every time it is looked up. """
+
+    ###########################################################################
+    # 'ServiceLifetimeManager' interface.
+    ###########################################################################
+
+    def get_service(self):
+        """ Return the service for the current lookup. """
+
+        return self._create_service()
+
+
+class ServicePool(ServiceLifetimeManager):
+    """ A bounded pool of service instances. """
+
+    #### 'ServicePool' interface ##############################################
+
+    # The number of seconds after which an idle instance (over and above
+    # 'min') is discarded (None means never).
+    idle_timeout = Either(None, Float)
+
+    # The maximum number of instances.
+    max = Int(10)
+
+    # The number of instances that are never discarded, even when idle.
+    min = Int(0)
+
+    # The number of instances that currently exist (both checked out and
+    # idle).
+    size = Int(0)
+
+    #### Private interface ####################################################
+
+    # The instances that are currently checked out (keyed by 'id' since
+    # services need not be hashable).
+    #
+    # { id(service) : service }
+    _checked_out = Dict
+
+    # The condition used to wait for an instance to be returned.
+    _condition = Any
+
+    # The idle instances (the most recently used at the end).
+    #
+    # [(service, time_returned), ...]
+    _idle = Any
+
+    ###########################################################################
+    # 'ServiceLifetimeManager' interface.
+    ###########################################################################
+
+    def get_service(self):
+        """ Return the service for the current lookup.
+
+        For a pool this is the pool itself!
+
+        """
+
+        self.fill()
+
+        return self
+
+    ###########################################################################
+    # 'ServicePool' interface.
+    ###########################################################################
+
+    def acquire(self, timeout=None):
+        """ Check out an instance of the service.
+
+        If the pool is at its maximum size then wait for an instance to be
+        returned. Raise a 'SystemError' if none is returned in time.
+
+        """
+
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        service = None
+        evicted = []
+        with self._condition:
+            while True:
+                evicted.extend(self._evict_idle_services())
+                if len(self._idle) > 0:
+                    service, returned = self._idle.pop()
+                    self._checked_out[id(service)] = service
+                    break
+
+                if self.size < self.max:
+                    self.size += 1
+                    break
+
+                if timeout is None:
+                    self._condition.wait()
+
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise SystemError('service pool exhausted')
+
+                    self._condition.wait(remaining)
+
+        self._close_services(evicted)
+
+        # Create the instance outside of the lock so that other threads can
+        # return instances to the pool whilst we are doing it.
+        if service is None:
+            service = self._create_new_service()
+
+        return service
+
+    @contextlib.contextmanager
+    def checkout(self, timeout=None):
+        """ A context manager that checks out an instance of the service.
+
+        The instance is returned to the pool when the context exits.
+
+        """
+
+        service = self.acquire(timeout)
+        try:
+            yield service
+
+        finally:
+            self.release(service)
+
+    def fill(self):
+        """ Make sure that the pool contains at least 'min' instances. """
+
+        while True:
+            with self._condition:
+                if self.size >= self.min:
+                    break
+
+                self.size += 1
+
+            service = self._create_new_service()
+            self.release(service)
+
+        return
+
+    def release(self, service):
+        """ Return an instance of the service to the pool.
+
+        Only instances checked out of the pool (by 'acquire' or 'checkout')
+        can be returned to it, and only once. Raise a 'ValueError' otherwise.
+
+        """
+
+        with self._condition:
+            if self._checked_out.pop(id(service), None) is not service:
+                raise ValueError(
+                    'service <%s> is not checked out of the pool' % service
+                )
+
+            self._idle.append((service, time.time()))
+            evicted = self._evict_idle_services()
+            self._condition.notify()
+
+        self._close_services(evicted)
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def __condition_default(self):
+        """ Trait initializer. """
+
+        return threading.Condition(threading.RLock())
+
+    def __idle_default(self):
+        """ Trait initializer. """
+
+        return collections.deque()
+
+    def _close_services(self, services):
+        """ Close services that have been discarded from the pool.
+
+        Services without a 'close' method are simply forgotten.
+
+        """
+
+        for service in services:
+            close = getattr(service, 'close', None)
+            if close is None:
+                continue
+
+            try:
+                close()
+
+            except:
+                logger.exception('error closing idle service <%s>', service)
+
+        return
+
+    def _create_new_service(self):
+        """ Create an instance that the pool has already made room for.
+
+        The instance is checked out. If the factory fails then the room is
+        given back.
+
+        """
+
+        try:
+            service = self._create_service()
+
+        except:
+            with self._condition:
+                self.size -= 1
+                self._condition.notify()
+
+            raise
+
+        with self._condition:
+            self._checked_out[id(service)] = service
+
+        return service
+
+    def _evict_idle_services(self):
+        """ Discard services that have been idle for too long.
+
+        This must be called with the condition's lock held. Returns the
+        discarded services, which the caller should close once it has
+        released the lock.
+
+        """
+
+        evicted = []
+        if self.idle_timeout is None:
+            return evicted
+
+        expired = time.time() - self.idle_timeout
+        while len(self._idle) > 0 and self.size > self.min:
+            service, returned = self._idle[0]
+            if returned > expired:
+                break
+
+            self._idle.popleft()
+            self.size -= 1
+            evicted.append(service)
+
+            logger.debug('discarding idle service <%s>', service)
+
+        return evicted
+
+#### EOF ######################################################################
@@ -1,8 +1,12 @@
 """ An offer to provide a service. """
 
 
+# Standard library imports.
+import threading
+
 # Enthought library imports.
-from traits.api import Callable, Dict, Either, HasTraits, Str, Type
+from traits.api import Any, Bool, Callable, Dict, Either, Enum, HasTraits
+from traits.api import Instance, Str, Type
 
 
 class ServiceOffer(HasTraits):
@@ -33,4 +37,77 @@ class ServiceOffer(HasTraits):
     # This dictionary is passed as keyword arguments to the factory.
     properties = Dict
 
+    # How long each instance of the service lives. One of:-
+    #
+    # 'singleton'  - one instance is created on first use and shared.
+    # 'per_thread' - one instance is created for each thread.
+    # 'transient'  - a new instance is created every time the service is
+    #                looked up.
+    # pooled(min, max, idle_timeout) - looking up the service returns a pool
+    #                that instances are checked out of (see
+    #                'envisage.service_lifetime').
+    lifetime = Either(
+        Enum('singleton', 'per_thread', 'transient'),
+        Instance('envisage.service_lifetime.PooledLifetime'),
+        default = 'singleton'
+    )
+
+    # When the service is created. One of:-
+    #
+    # 'lazy'       - the first time that it is looked up.
+    # 'eager'      - when the offer is registered (i.e. when the core plugin
+    #                is started).
+    # 'background' - in a worker thread as soon as the application has
+    #                started.
+    warmup = Enum('lazy', 'eager', 'background')
+
+    # Has the service been warmed up? This is set when the service has been
+    # created (and immediately for 'lazy' offers). It is *not* set if the
+    # warm-up failed (in which case the service will be created on first use
+    # as usual).
+    ready = Bool(False)
+
+    #### Private interface ####################################################
+
+    # The event that is set when the warm-up has finished (whether or not it
+    # succeeded).
+    _warmed_up = Any
+
+    ###########################################################################
+    # 'ServiceOffer' interface.
+    ###########################################################################
+
+    def wait_until_ready(self, timeout=None):
+        """ Wait for the service to be warmed up.
+
+        Return True if the service is ready, or False if the warm-up failed
+        or did not finish within the timeout.
+
+        """
+
+        self._warmed_up.wait(timeout)
+
+        return self.ready
+
+    ###########################################################################
+    # Protected 'ServiceOffer' interface.
+    ###########################################################################
+
+    def _set_warmed_up(self, ready):
+        """ Record that the warm-up has finished. """
+
+        self.ready = ready
+        self._warmed_up.set()
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def __warmed_up_default(self):
+        """ Trait initializer. """
+
+        return threading.Event()
+
 #### EOF ######################################################################
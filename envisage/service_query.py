@@ -0,0 +1,262 @@
+""" Support for querying services in the service registry.
+
+Two kinds of query are supported:-
+
+1) Strings containing a Python expression, e.g. 'lang == "en" and x > 3'.
+
+   The expression is evaluated in a namespace containing the service's
+   attributes and its properties (the properties take precedence). Each
+   distinct expression is only compiled once (a bounded number of the most
+   recently used compiled expressions are kept).
+
+2) Dictionaries of property names and values, e.g.::
+
+     {'lang' : 'en', 'priority__gt' : 3}
+
+   Each key is a property name, optionally followed by a double underscore
+   and an operator (one of 'eq', 'ne', 'lt', 'le', 'gt', 'ge' or 'in'). A
+   service matches if *all* of the terms match its *properties* (its
+   attributes are not considered). Equality terms are answered from hash
+   indexes on the properties, so no expressions are evaluated and the
+   service objects are not even looked at (and hence services that are
+   registered as factories are not created unless they match!).
+
+"""
+
+
+# Standard library imports.
+import collections, logging, operator, threading
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+# The operators that can be used in structured queries.
+OPERATORS = {
+    'eq' : operator.eq,
+    'ne' : operator.ne,
+    'lt' : operator.lt,
+    'le' : operator.le,
+    'gt' : operator.gt,
+    'ge' : operator.ge,
+    'in' : lambda value, values: value in values
+}
+
+
+# The maximum number of compiled string queries that are kept.
+MAX_COMPILED_QUERIES = 256
+
+
+# The compiled versions of string queries (the least recently used first).
+#
+# { query : code_object_or_None }
+#
+# The value is None if the query could not be compiled.
+_compiled_queries = collections.OrderedDict()
+
+# The lock that protects the compiled queries.
+_compiled_queries_lock = threading.Lock()
+
+
+def compile_query(query):
+    """ Return the code object for a string query.
+
+    Return None if the query is not a valid Python expression.
+
+    """
+
+    with _compiled_queries_lock:
+        try:
+            code = _compiled_queries.pop(query)
+            _compiled_queries[query] = code
+            return code
+
+        except KeyError:
+            pass
+
+    try:
+        code = compile(query, '<query>', 'eval')
+
+    except SyntaxError:
+        logger.warn('invalid service query <%s>', query)
+        code = None
+
+    with _compiled_queries_lock:
+        _compiled_queries[query] = code
+        while len(_compiled_queries) > MAX_COMPILED_QUERIES:
+            _compiled_queries.popitem(last=False)
+
+    return code
+
+
+def create_query_namespace(service, properties):
+    """ Create the namespace that a string query is evaluated in.
+
+    The namespace is used as the *globals* so that the names are visible
+    inside any generator expressions or lambdas in the query.
+
+    """
+
+    namespace = {}
+    namespace.update(getattr(service, '__dict__', {}))
+    namespace.update(properties)
+
+    return namespace
+
+
+def eval_query(query, service, properties):
+    """ Evaluate a string query over a single service.
+
+    Return True if the service matches the query, otherwise return False.
+
+    """
+
+    code = compile_query(query)
+    if code is None:
+        return False
+
+    namespace = create_query_namespace(service, properties)
+    try:
+        result = eval(code, namespace)
+
+    except Exception:
+        logger.debug('service query <%s> failed', query, exc_info=True)
+        result = False
+
+    return result
+
+
+def parse_structured_query(query):
+    """ Parse a structured query into a list of terms.
+
+    Each term is a tuple in the form (property_name, operator_name, value).
+
+    Raise a 'ValueError' if the query contains an unknown operator.
+
+    """
+
+    terms = []
+    for key, value in query.items():
+        name, separator, operator_name = key.rpartition('__')
+        if len(separator) == 0 or len(name) == 0:
+            name, operator_name = key, 'eq'
+
+        elif operator_name not in OPERATORS:
+            raise ValueError(
+                'unknown operator <%s> in service query <%s>' % (
+                    operator_name, key
+                )
+            )
+
+        terms.append((name, operator_name, value))
+
+    return terms
+
+
+def match_terms(terms, properties):
+    """ Return True if a service's properties match all of the terms. """
+
+    for name, operator_name, value in terms:
+        if name not in properties:
+            return False
+
+        try:
+            if not OPERATORS[operator_name](properties[name], value):
+                return False
+
+        except TypeError:
+            return False
+
+    return True
+
+
+class PropertyIndex(object):
+    """ Hash indexes on the properties of services registered for a protocol.
+
+    """
+
+    def __init__(self):
+        """ Constructor. """
+
+        # The Ids of the services with a particular value for a property.
+        #
+        # { property_name : { value : set([service_id, ...]) } }
+        self._values = {}
+
+        # The Ids of the services with an unhashable value for a property (and
+        # which therefore have to be checked the hard way!).
+        #
+        # { property_name : set([service_id, ...]) }
+        self._unhashable = {}
+
+        return
+
+    def add(self, service_id, properties):
+        """ Add a service's properties to the index. """
+
+        for name, value in properties.items():
+            try:
+                values = self._values.setdefault(name, {})
+                ids    = values.setdefault(value, set())
+
+            except TypeError:
+                ids = self._unhashable.setdefault(name, set())
+
+            ids.add(service_id)
+
+        return
+
+    def remove(self, service_id, properties):
+        """ Remove a service's properties from the index. """
+
+        for name, value in properties.items():
+            try:
+                values = self._values[name]
+                ids    = values[value]
+                ids.discard(service_id)
+                if len(ids) == 0:
+                    del values[value]
+
+            except TypeError:
+                self._unhashable.get(name, set()).discard(service_id)
+
+            except KeyError:
+                pass
+
+        return
+
+    def get_candidates(self, terms):
+        """ Return the Ids of the services that may match the terms.
+
+        Only the equality terms are used, so the candidates must still be
+        checked against the other terms. Returns None if there are no
+        equality terms (i.e. *every* service is a candidate).
+
+        """
+
+        candidates = None
+        for name, operator_name, value in terms:
+            if operator_name != 'eq':
+                continue
+
+            try:
+                ids = self._values.get(name, {}).get(value, set())
+
+            except TypeError:
+                ids = set()
+
+            ids = ids | self._unhashable.get(name, set())
+
+            if candidates is None:
+                candidates = ids
+
+            else:
+                candidates = candidates & ids
+
+            if len(candidates) == 0:
+                break
+
+        return candidates
+
+#### EOF ######################################################################
@@ -2,21 +2,34 @@
 
 
 # Standard library imports.
-import logging
+import heapq, logging, random, threading, time
 
 # Enthought library imports.
-from traits.api import Dict, Event, HasTraits, Int, Undefined, implements
+from traits.api import Any, Dict, Event, Float, HasTraits, Int, Set
+from traits.api import Undefined
+from traits.api import implements
 from traits.protocols.interfaces import Protocol
 
 # Local imports.
 from i_service_registry import IServiceRegistry
 from import_manager import ImportManager
+from service_lifetime import ServiceLifetimeManager
+from service_query import PropertyIndex, eval_query, match_terms
+from service_query import parse_structured_query
 
 
 # Logging.
 logger = logging.getLogger(__name__)
 
 
+# The names of the statistics gathered for each protocol (see
+# 'ServiceRegistry.get_statistics').
+STATISTICS = [
+    'lookups', 'sampled_lookups', 'lookup_time', 'candidates', 'query_time',
+    'factory_calls', 'factory_time', 'factory_failures'
+]
+
+
 class ServiceRegistry(HasTraits):
     """ The service registry. """
 
@@ -30,6 +43,13 @@ class ServiceRegistry(HasTraits):
     # An event that is fired when a service is unregistered.
     unregistered = Event
 
+    ####  'ServiceRegistry' interface #########################################
+
+    # The fraction of lookups that are timed when gathering statistics (see
+    # 'get_statistics'). 0 (the default) means that no statistics are
+    # gathered at all, 1 means that every lookup is timed.
+    statistics_sample_rate = Float(0.0)
+
     ####  Private interface ###################################################
 
     # The services in the registry.
@@ -47,10 +67,59 @@ class ServiceRegistry(HasTraits):
     # registered with the object.
     _services = Dict
 
+    # The Ids of the services in the registry, keyed by protocol name.
+    #
+    # { protocol_name : [service_id, ...] }
+    #
+    # The Ids for each protocol are in the order that the services were
+    # registered. This means that a lookup only has to look at the services
+    # registered against the protocol rather than at all services.
+    _services_by_protocol = Dict
+
+    # Hash indexes on the properties of the services, keyed by protocol name.
+    #
+    # { protocol_name : PropertyIndex }
+    #
+    # These are used to answer structured (i.e. dictionary) queries without
+    # looking at every service.
+    _property_indexes = Dict
+
+    # The actual protocols that services have been registered against (if
+    # they were registered using the protocol rather than its name).
+    #
+    # { protocol_name : protocol }
+    _protocols = Dict
+
+    # The Ids of the services that are known to be actual service objects
+    # rather than factories (i.e. those that have been resolved).
+    _resolved_service_ids = Set(Int)
+
+    # The locks used to make sure that only one thread at a time resolves the
+    # factory of each service.
+    #
+    # { service_id : threading.RLock }
+    _resolution_locks = Dict
+
+    # The lock that protects the registry's own bookkeeping.
+    _lock = Any
+
+    # The statistics gathered for each protocol.
+    #
+    # { protocol_name : { statistic_name : value } }
+    _statistics = Dict
+
     # The next service Id (service Ids are never persisted between process
     # invocations so this is simply an ever increasing integer!).
     _service_id = Int
 
+    # An event that is fired when a service is registered or unregistered.
+    # Unlike 'registered' and 'unregistered' this is always fired in the
+    # thread that made the change (and before those events), so that caches
+    # of lookups can be kept consistent. The value is a tuple in the form::
+    #
+    # (protocol_name, obj)
+    _services_modified = Event
+
     ###########################################################################
     # 'IServiceRegistry' interface.
     ###########################################################################
@@ -58,7 +127,9 @@ class ServiceRegistry(HasTraits):
     def get_service(self, protocol, query='', minimize='', maximize=''):
         """ Return at most one service that matches the specified query. """
 
-        services = self.get_services(protocol, query, minimize, maximize)
+        services = self.get_services(
+            protocol, query, minimize, maximize, limit=1
+        )
         if len(services) > 0:
             service = services[0]
 
@@ -71,45 +142,55 @@ class ServiceRegistry(HasTraits):
         """ Return the service with the specified id. """
 
         try:
-            protocol, obj, properties = self._services[service_id]
+            name, obj, properties = self._services[service_id]
 
         except KeyError:
             raise ValueError('no service with id <%d>' % service_id)
 
-        return obj
+        # If the registered service is actually a factory then use it to
+        # create the actual object (the protocol is only needed, and hence
+        # only imported, if we don't already know whether it is a factory).
+        if service_id in self._resolved_service_ids \
+           or isinstance(obj, ServiceLifetimeManager):
+            protocol = None
+
+        else:
+            protocol = self._get_protocol(name)
 
-    def get_services(self, protocol, query='', minimize='', maximize=''):
+        service = self._resolve_factory(
+            protocol, name, obj, properties, service_id
+        )
+        if service is None:
+            raise ValueError('no service with id <%d>' % service_id)
+
+        return service
+
+    def get_services(self, protocol, query='', minimize='', maximize='',
+                     limit=None):
         """ Return all services that match the specified query. """
 
-        services = []
-        for service_id, (name, obj, properties) in self._services.items():
-            if self._get_protocol_name(protocol) == name:
-                # If the protocol is a string then we need to import it!
-                if isinstance(protocol, basestring):
-                    actual_protocol = ImportManager().import_symbol(protocol)
-
-                # Otherwise, it is an actual protocol, so just use it!
-                else:
-                    actual_protocol = protocol
-
-                # If the registered service is actually a factory then use it
-                # to create the actual object.
-                obj = self._resolve_factory(
-                    actual_protocol, name, obj, properties, service_id
-                )
+        name = self._get_protocol_name(protocol)
 
-                # If a query was specified then only add the service if it
-                # matches it!
-                if len(query) == 0 or self._eval_query(obj, properties, query):
-                    services.append(obj)
+        rate = self.statistics_sample_rate
+        if rate <= 0:
+            return self._get_services(
+                protocol, name, query, minimize, maximize, limit, None
+            )
 
-        # Are we minimizing or maximising anything? If so then sort the list
-        # of services by the specified attribute/property.
-        if minimize != '':
-            services.sort(None, lambda x: getattr(x, minimize))
+        # Every lookup is counted, but only a sample of them are timed.
+        statistics = self._get_protocol_statistics(name)
+        statistics['lookups'] += 1
+        if rate < 1 and random.random() >= rate:
+            return self._get_services(
+                protocol, name, query, minimize, maximize, limit, None
+            )
 
-        elif maximize != '':
-            services.sort(None, lambda x: getattr(x, maximize), reverse=True)
+        start    = time.time()
+        services = self._get_services(
+            protocol, name, query, minimize, maximize, limit, statistics
+        )
+        statistics['sampled_lookups'] += 1
+        statistics['lookup_time']     += time.time() - start
 
         return services
 
@@ -129,14 +210,23 @@ class ServiceRegistry(HasTraits):
         """ Register a service. """
 
         protocol_name = self._get_protocol_name(protocol)
+        if not isinstance(protocol, basestring):
+            self._protocols[protocol_name] = protocol
 
         # Make sure each service gets its own properties dictionary.
         if properties is None:
             properties = {}
 
-        service_id = self._next_service_id()
-        self._services[service_id] = (protocol_name, obj, properties)
-        self.registered = service_id
+        with self._lock:
+            service_id = self._next_service_id()
+            self._services[service_id] = (protocol_name, obj, properties)
+            self._services_by_protocol.setdefault(protocol_name, []).append(
+                service_id
+            )
+            self._get_property_index(protocol_name).add(service_id, properties)
+
+        self._services_modified = (protocol_name, obj)
+        self._notify_listeners('registered', service_id)
 
         logger.debug('service <%d> registered %s', service_id, protocol_name)
 
@@ -145,41 +235,237 @@ class ServiceRegistry(HasTraits):
     def set_service_properties(self, service_id, properties):
         """ Set the dictionary of properties associated with a service. """
 
-        try:
-            protocol, obj, old_properties = self._services[service_id]
+        with self._lock:
+            try:
+                protocol, obj, old_properties = self._services[service_id]
+
+            except KeyError:
+                raise ValueError('no service with id <%d>' % service_id)
+
             self._services[service_id] = protocol, obj, properties.copy()
 
-        except KeyError:
-            raise ValueError('no service with id <%d>' % service_id)
+            index = self._get_property_index(protocol)
+            index.remove(service_id, old_properties)
+            index.add(service_id, properties)
 
         return
 
     def unregister_service(self, service_id):
         """ Unregister a service. """
 
-        try:
-            protocol, obj, properties = self._services.pop(service_id)
-            self.unregistered = service_id
+        with self._lock:
+            try:
+                protocol, obj, properties = self._services.pop(service_id)
 
-            logger.debug('service <%d> unregistered', service_id)
+            except KeyError:
+                raise ValueError('no service with id <%d>' % service_id)
 
-        except KeyError:
-            raise ValueError('no service with id <%d>' % service_id)
+            service_ids = self._services_by_protocol[protocol]
+            service_ids.remove(service_id)
+            if len(service_ids) == 0:
+                del self._services_by_protocol[protocol]
+                del self._property_indexes[protocol]
+
+            else:
+                self._property_indexes[protocol].remove(service_id, properties)
+
+            self._resolved_service_ids.discard(service_id)
+            self._resolution_locks.pop(service_id, None)
+
+        self._services_modified = (protocol, obj)
+        self._notify_listeners('unregistered', service_id)
+
+        logger.debug('service <%d> unregistered', service_id)
+
+        return
+
+    ###########################################################################
+    # 'ServiceRegistry' interface.
+    ###########################################################################
+
+    def aget_service(self, protocol, query='', minimize='', maximize='',
+                     loop=None, executor=None):
+        """ Look up a service without blocking an asyncio event loop.
+
+        The lookup (including calling the service's factory if need be) is
+        done in an executor, and this returns a future for the service (or
+        None if there is no matching service), e.g::
+
+            service = await registry.aget_service(IFoo)
+
+        If no loop is specified then the current event loop is used. If no
+        executor is specified then the loop's default executor is used.
+
+        """
+
+        # Do the import here so that asyncio is only needed if it is used.
+        from asyncio_utils import get_event_loop
+
+        loop = get_event_loop(loop)
+
+        return loop.run_in_executor(
+            executor, self.get_service, protocol, query, minimize, maximize
+        )
+
+    def get_statistics(self):
+        """ Return the statistics gathered for each protocol.
+
+        Statistics are only gathered if 'statistics_sample_rate' is greater
+        than 0. The statistics are returned as a dictionary in the form::
+
+            { protocol_name : { statistic_name : value } }
+
+        where the statistics are:-
+
+        'lookups'          - the number of lookups.
+        'sampled_lookups'  - the number of lookups that were timed.
+        'lookup_time'      - the total time (in seconds) spent in the sampled
+                             lookups.
+        'candidates'       - the total number of services looked at by the
+                             sampled lookups.
+        'query_time'       - the total time spent evaluating string queries
+                             in the sampled lookups.
+        'factory_calls'    - the number of times a service was created by a
+                             factory.
+        'factory_time'     - the total time spent in factories.
+        'factory_failures' - the number of times that a factory raised an
+                             exception.
+
+        The counts are not protected by a lock and so may be slightly out if
+        services are being looked up concurrently.
+
+        """
+
+        return dict(
+            (name, statistics.copy())
+            for name, statistics in self._statistics.items()
+        )
+
+    def reset_statistics(self):
+        """ Discard all of the statistics gathered so far. """
+
+        self._statistics = {}
 
         return
 
+    def wait_for_service(self, protocol, query='', timeout=None, loop=None):
+        """ Wait for a service to be registered.
+
+        This returns an awaitable for the first service that matches the
+        protocol and query. If there is no such service yet then it waits
+        for one to be registered, e.g::
+
+            service = await registry.wait_for_service(IFoo, timeout=10)
+
+        Services can be registered from any thread. Lookups are done in the
+        loop's default executor so that factories don't block the loop.
+
+        If a timeout (in seconds) is specified and no service is registered in
+        time then the awaitable raises 'asyncio.TimeoutError'.
+
+        """
+
+        # Do the import here so that asyncio is only needed if it is used.
+        from asyncio_utils import create_future, get_event_loop
+        from asyncio_utils import import_asyncio
+
+        loop   = get_event_loop(loop)
+        future = create_future(loop)
+
+        def on_lookup_done(lookup):
+            """ Called when a lookup has finished. """
+
+            if future.done():
+                return
+
+            if lookup.exception() is not None:
+                future.set_exception(lookup.exception())
+
+            elif lookup.result() is not None:
+                future.set_result(lookup.result())
+
+            return
+
+        def look_up_service():
+            """ Look up the service (in the event loop's thread). """
+
+            if not future.done():
+                lookup = self.aget_service(protocol, query, loop=loop)
+                lookup.add_done_callback(on_lookup_done)
+
+            return
+
+        def on_registered(service_id):
+            """ Called when a service is registered (in any thread). """
+
+            loop.call_soon_threadsafe(look_up_service)
+
+            return
+
+        def on_timeout():
+            """ Called if no service is registered in time. """
+
+            if not future.done():
+                future.set_exception(import_asyncio().TimeoutError())
+
+            return
+
+        if timeout is not None:
+            timer = loop.call_later(timeout, on_timeout)
+
+        else:
+            timer = None
+
+        def on_future_done(future):
+            """ Called when the future is done (or cancelled). """
+
+            self.on_trait_change(on_registered, 'registered', remove=True)
+            if timer is not None:
+                timer.cancel()
+
+            return
+
+        # Start listening *before* the first lookup so that we can't miss a
+        # registration.
+        self.on_trait_change(on_registered, 'registered')
+        future.add_done_callback(on_future_done)
+        look_up_service()
+
+        return future
+
     ###########################################################################
     # Private interface.
     ###########################################################################
 
-    def _create_namespace(self, service, properties):
-        """ Create a namespace in which to evaluate a query. """
+    #### Trait initializers ###################################################
+
+    def __lock_default(self):
+        """ Trait initializer. """
 
-        namespace = {}
-        namespace.update(service.__dict__)
-        namespace.update(properties)
+        return threading.RLock()
 
-        return namespace
+    #### Methods ##############################################################
+
+    def _call_factory(self, protocol_name, factory, properties):
+        """ Call a service factory (recording statistics if required). """
+
+        if self.statistics_sample_rate <= 0:
+            return factory(**properties)
+
+        statistics = self._get_protocol_statistics(protocol_name)
+        start      = time.time()
+        try:
+            obj = factory(**properties)
+
+        except:
+            statistics['factory_failures'] += 1
+            raise
+
+        finally:
+            statistics['factory_calls'] += 1
+            statistics['factory_time']  += time.time() - start
+
+        return obj
 
     def _eval_query(self, service, properties, query):
         """ Evaluate a query over a single service.
@@ -188,14 +474,204 @@ class ServiceRegistry(HasTraits):
 
         """
 
-        namespace = self._create_namespace(service, properties)
-        try:
-            result = eval(query, namespace)
+        return eval_query(query, service, properties)
 
-        except:
-            result = False
+    def _get_matching_service_ids(self, protocol_name, query):
+        """ Return the Ids of the services that match a structured query.
+
+        The Ids are returned in the order that the services were registered.
+
+        """
+
+        terms = parse_structured_query(query)
+
+        with self._lock:
+            service_ids = self._services_by_protocol.get(protocol_name)
+            if service_ids is None:
+                return []
+
+            candidates = self._property_indexes[protocol_name].get_candidates(
+                terms
+            )
+
+            # Service Ids are allocated in increasing order, so sorting them
+            # puts them in registration order.
+            if candidates is None:
+                candidates = service_ids[:]
+
+            else:
+                candidates = sorted(candidates)
+
+            services = [
+                (service_id, self._services[service_id])
+                for service_id in candidates
+            ]
+
+        return [
+            service_id for service_id, (name, obj, properties) in services
+
+            if match_terms(terms, properties)
+        ]
+
+    def _get_service_ids_in_rank_order(self, protocol, service_ids, rank,
+                                       reverse):
+        """ Generate service Ids in order of a property/attribute.
+
+        The value of a property registered with a service takes precedence
+        over an attribute of the service object (just like in a query) and so
+        a factory only has to be resolved to rank its service if the property
+        was *not* registered with it.
+
+        Every service is ranked up front (which means resolving the factories
+        of any services that don't have the property registered), but they are
+        then put on a heap rather than sorted, so only as many are popped off
+        it as the caller actually consumes. Services with equal values are
+        generated in the order that they were registered.
+
+        """
+
+        heap = []
+        for index, service_id in enumerate(service_ids):
+            # The service may have been unregistered by another thread.
+            service = self._services.get(service_id)
+            if service is None:
+                continue
+
+            name, obj, properties = service
+            if rank in properties:
+                value = properties[rank]
+
+            else:
+                obj = self._resolve_factory(
+                    protocol, name, obj, properties, service_id
+                )
+                if obj is None:
+                    continue
+
+                value = getattr(obj, rank)
+
+            if reverse:
+                value = _Reversed(value)
+
+            heap.append((value, index, service_id))
+
+        heapq.heapify(heap)
+        while len(heap) > 0:
+            value, index, service_id = heapq.heappop(heap)
+
+            yield service_id
+
+        return
+
+    def _get_services(self, protocol, name, query, minimize, maximize, limit,
+                      statistics):
+        """ Return all services that match the specified query.
+
+        If 'statistics' is not None then it is the dictionary of statistics
+        for the protocol that the lookup is recorded in.
+
+        """
+
+        # Structured queries are answered (at least partly) from the property
+        # indexes, and so the candidate services are found *before* any
+        # factories are resolved.
+        if isinstance(query, dict):
+            service_ids = self._get_matching_service_ids(name, query)
+            query       = ''
+
+        else:
+            with self._lock:
+                service_ids = self._services_by_protocol.get(name, [])[:]
+
+        # The actual protocol is only resolved (which may mean importing it)
+        # if there are any services registered against it.
+        if len(service_ids) == 0:
+            return []
+
+        actual_protocol = self._get_protocol(protocol)
+
+        # Are we minimizing or maximising anything? If so then visit the
+        # services in order of the specified property/attribute.
+        if minimize != '':
+            service_ids = self._get_service_ids_in_rank_order(
+                actual_protocol, service_ids, minimize, reverse=False
+            )
+
+        elif maximize != '':
+            service_ids = self._get_service_ids_in_rank_order(
+                actual_protocol, service_ids, maximize, reverse=True
+            )
+
+        services = []
+        for service_id in service_ids:
+            # The service may have been unregistered by another thread.
+            service = self._services.get(service_id)
+            if service is None:
+                continue
+
+            name, obj, properties = service
+            if statistics is not None:
+                statistics['candidates'] += 1
+
+            # If the registered service is actually a factory then use it
+            # to create the actual object.
+            obj = self._resolve_factory(
+                actual_protocol, name, obj, properties, service_id
+            )
+            if obj is None:
+                continue
+
+            # If a query was specified then only add the service if it
+            # matches it!
+            if len(query) == 0:
+                matches = True
+
+            elif statistics is None:
+                matches = self._eval_query(obj, properties, query)
 
-        return result
+            else:
+                start   = time.time()
+                matches = self._eval_query(obj, properties, query)
+                statistics['query_time'] += time.time() - start
+
+            if matches:
+                services.append(obj)
+
+                # Once we have as many services as were asked for we can stop
+                # looking (and hence we don't resolve any more factories!).
+                if limit is not None and len(services) >= limit:
+                    break
+
+        return services
+
+    def _get_property_index(self, protocol_name):
+        """ Return the property index for a protocol.
+
+        The index is created if it does not already exist.
+
+        """
+
+        index = self._property_indexes.get(protocol_name)
+        if index is None:
+            index = self._property_indexes[protocol_name] = PropertyIndex()
+
+        return index
+
+    def _get_protocol(self, protocol_or_name):
+        """ Returns the actual protocol for a protocol or protocol name. """
+
+        # If the protocol is a string then we need to import it (unless a
+        # service has been registered using the actual protocol)!
+        if isinstance(protocol_or_name, basestring):
+            protocol = self._protocols.get(protocol_or_name)
+            if protocol is None:
+                protocol = ImportManager().import_symbol(protocol_or_name)
+
+        # Otherwise, it is an actual protocol, so just use it!
+        else:
+            protocol = protocol_or_name
+
+        return protocol
 
     def _get_protocol_name(self, protocol_or_name):
         """ Returns the full class name for a protocol. """
@@ -210,6 +686,19 @@ class ServiceRegistry(HasTraits):
 
         return name
 
+    def _get_protocol_statistics(self, protocol_name):
+        """ Return the statistics for a protocol (creating them if need be).
+
+        """
+
+        statistics = self._statistics.get(protocol_name)
+        if statistics is None:
+            statistics = self._statistics.setdefault(
+                protocol_name, dict.fromkeys(STATISTICS, 0)
+            )
+
+        return statistics
+
     def _is_service_factory(self, protocol, obj):
         """ Is the object a factory for services supporting the protocol? """
 
@@ -230,33 +719,115 @@ class ServiceRegistry(HasTraits):
 
         return is_service_factory
 
+    def _get_resolution_lock(self, service_id):
+        """ Return the lock used to resolve the factory of a service. """
+
+        with self._lock:
+            lock = self._resolution_locks.get(service_id)
+            if lock is None:
+                lock = self._resolution_locks[service_id] = threading.RLock()
+
+        return lock
+
     def _next_service_id(self):
         """ Returns the next service ID. """
 
-        self._service_id += 1
+        with self._lock:
+            self._service_id += 1
+            service_id = self._service_id
+
+        return service_id
 
-        return self._service_id
+    def _notify_listeners(self, trait_name, service_id):
+        """ Fire the 'registered' or 'unregistered' event.
+
+        This is a separate method so that derived classes can choose where
+        (e.g. in which thread) listeners are called.
+
+        """
+
+        setattr(self, trait_name, service_id)
+
+        return
 
     def _resolve_factory(self, protocol, name, obj, properties, service_id):
-        """ If 'obj' is a factory then use it to create the actual service. """
+        """ If 'obj' is a factory then use it to create the actual service.
 
-        # Is the registered service actually a service *factory*?
-        if self._is_service_factory(protocol, obj):
-            # A service factory is any callable that takes two arguments, the
-            # first is the protocol, the second is the (possibly empty)
-            # dictionary of properties that were registered with the service.
-            #
-            # If the factory is specified as a symbol path then import it.
-            if isinstance(obj, basestring):
-                obj = ImportManager().import_symbol(obj)
+        Only one thread at a time resolves the factory of a service. Any
+        others wait for it to finish and then get the service that it created.
 
-            obj = obj(**properties)
+        Returns None if the service was unregistered before we got to it (in
+        which case the factory is not called).
+
+        """
+
+        # Services with a lifetime other than 'singleton' are created (or
+        # checked out) by their lifetime manager every time they are looked
+        # up.
+        if isinstance(obj, ServiceLifetimeManager):
+            return obj.get_service()
+
+        # Once a service has been resolved we know that the registered object
+        # is the actual service, so there is no need to check again.
+        if service_id in self._resolved_service_ids:
+            return self._services.get(service_id, (name, obj, properties))[1]
+
+        with self._get_resolution_lock(service_id):
+            # Another thread may have resolved (or unregistered!) the service
+            # whilst we were waiting for the lock.
+            service = self._services.get(service_id)
+            if service is None:
+                return None
+
+            name, obj, properties = service
+            if service_id in self._resolved_service_ids:
+                return obj
+
+            # Is the registered service actually a service *factory*?
+            if self._is_service_factory(protocol, obj):
+                # A service factory is any callable that takes two arguments,
+                # the first is the protocol, the second is the (possibly
+                # empty) dictionary of properties that were registered with
+                # the service.
+                #
+                # If the factory is specified as a symbol path then import it.
+                if isinstance(obj, basestring):
+                    obj = ImportManager().import_symbol(obj)
+
+                obj = self._call_factory(name, obj, properties)
 
             # The resulting service object replaces the factory in the cache
             # (i.e. the factory will not get called again unless it is
-            # unregistered first).
-            self._services[service_id] = (name, obj, properties)
+            # unregistered first). If the service was unregistered whilst
+            # its factory was being called then we don't resurrect it!
+            with self._lock:
+                if service_id in self._services:
+                    self._services[service_id] = (name, obj, properties)
+                    self._resolved_service_ids.add(service_id)
+                    self._resolution_locks.pop(service_id, None)
 
         return obj
 
+class _Reversed(object):
+    """ Wraps a value so that it sorts in reverse order. """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        """ Constructor. """
+
+        self.value = value
+
+        return
+
+    def __eq__(self, other):
+        """ Equality. """
+
+        return self.value == other.value
+
+    def __lt__(self, other):
+        """ Less than. """
+
+        return other.value < self.value
+
 #### EOF ######################################################################
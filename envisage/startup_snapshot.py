@@ -0,0 +1,255 @@
+""" A snapshot of an application's assembled plugin/extension state. """
+
+
+# Standard library imports.
+import cPickle, logging, os, sys
+
+# Enthought library imports.
+from traits.api import Dict, HasTraits, List, Set, Str
+
+
+# Logging.
+logger = logging.getLogger(__name__)
+
+
+class StartupSnapshot(HasTraits):
+    """ A snapshot of an application's assembled plugin/extension state.
+
+    Applications that start with the same set of plugins every time can save
+    a snapshot of the plugin order and of the contributions made to every
+    extension point, and then use it on subsequent ('warm') starts to avoid
+    evaluating the contributions again.
+
+    Each plugin in the snapshot is 'fingerprinted' by the modification time
+    of the module that defines its class, and by the version of the package
+    that the module lives in. On a warm start, only the contributions of
+    plugins whose fingerprint still matches are taken from the snapshot; the
+    contributions of any other plugins are evaluated live as usual.
+
+    Only contributions that can be pickled are stored in the snapshot. Any
+    contributions that cannot be pickled are always evaluated live.
+
+    """
+
+    # The snapshot file format version. Snapshots with a different version are
+    # ignored.
+    FORMAT_VERSION = 1
+
+    #### 'StartupSnapshot' interface ##########################################
+
+    # The Ids of the plugins in the order that they were in when the snapshot
+    # was taken.
+    plugin_ids = List(Str)
+
+    # The fingerprint of each plugin, keyed by plugin Id.
+    #
+    # { plugin_id : (class_path, module_mtime, package_version) }
+    fingerprints = Dict
+
+    # The pickled contributions made by each plugin to each extension point.
+    #
+    # { extension_point_id : { plugin_id : pickled_contributions_or_None } }
+    #
+    # Plugins that did not contribute to an extension point do not appear in
+    # its dictionary. If the contributions could not be pickled then the value
+    # is None (and the contributions are evaluated live).
+    extensions = Dict
+
+    # The Ids of the plugins whose contributions can be taken from the
+    # snapshot (this is set by 'validate').
+    valid_plugin_ids = Set(Str)
+
+    ###########################################################################
+    # 'StartupSnapshot' class interface.
+    ###########################################################################
+
+    @classmethod
+    def from_application(cls, application):
+        """ Take a snapshot of an application's plugins and extensions. """
+
+        plugins = list(application)
+
+        extensions = {}
+        for extension_point in application.get_extension_points():
+            contributions = {}
+            for plugin in plugins:
+                contributed = plugin.get_extensions(extension_point.id)
+                if len(contributed) > 0:
+                    contributions[plugin.id] = cls._pickle_contributions(
+                        plugin, extension_point.id, contributed
+                    )
+
+            extensions[extension_point.id] = contributions
+
+        snapshot = cls(
+            plugin_ids   = [plugin.id for plugin in plugins],
+            fingerprints = dict(
+                (plugin.id, cls.get_fingerprint(plugin)) for plugin in plugins
+            ),
+            extensions   = extensions
+        )
+
+        return snapshot
+
+    @classmethod
+    def get_fingerprint(cls, plugin):
+        """ Return the fingerprint of a plugin.
+
+        The fingerprint is a tuple containing the path of the plugin's class,
+        the modification time of the module that the class is defined in, and
+        the version of the top-level package that the module is in.
+
+        """
+
+        klass  = type(plugin)
+        module = sys.modules.get(klass.__module__)
+
+        filename = getattr(module, '__file__', None)
+        if filename is not None and os.path.exists(filename):
+            mtime = os.path.getmtime(filename)
+
+        else:
+            mtime = None
+
+        package = sys.modules.get(klass.__module__.split('.')[0])
+        version = getattr(package, '__version__', None)
+
+        return ('%s.%s' % (klass.__module__, klass.__name__), mtime, version)
+
+    @classmethod
+    def load(cls, path):
+        """ Load a snapshot from a file.
+
+        Return None if the file does not exist or cannot be read.
+
+        """
+
+        try:
+            f = file(path, 'rb')
+
+        except IOError:
+            return None
+
+        try:
+            try:
+                state = cPickle.load(f)
+
+            except Exception:
+                logger.exception('reading startup snapshot <%s>', path)
+                return None
+
+        finally:
+            f.close()
+
+        if state.get('format_version') != cls.FORMAT_VERSION:
+            logger.debug('ignoring startup snapshot <%s> (old format)', path)
+            return None
+
+        return cls(
+            plugin_ids   = state['plugin_ids'],
+            fingerprints = state['fingerprints'],
+            extensions   = state['extensions']
+        )
+
+    ###########################################################################
+    # 'StartupSnapshot' interface.
+    ###########################################################################
+
+    def get_extensions(self, extension_point_id, plugin_id):
+        """ Return a plugin's snapshot contributions to an extension point.
+
+        Return None if the contributions must be evaluated live (i.e. if the
+        plugin is not valid, or its contributions could not be pickled).
+
+        """
+
+        if plugin_id not in self.valid_plugin_ids:
+            return None
+
+        contributions = self.extensions.get(extension_point_id)
+        if contributions is None:
+            return None
+
+        if plugin_id not in contributions:
+            return []
+
+        pickled = contributions[plugin_id]
+        if pickled is None:
+            return None
+
+        return cPickle.loads(pickled)
+
+    def save(self, path):
+        """ Save the snapshot to a file. """
+
+        state = dict(
+            format_version = self.FORMAT_VERSION,
+            plugin_ids     = self.plugin_ids,
+            fingerprints   = self.fingerprints,
+            extensions     = self.extensions
+        )
+
+        f = file(path, 'wb')
+        try:
+            cPickle.dump(state, f, cPickle.HIGHEST_PROTOCOL)
+
+        finally:
+            f.close()
+
+        return
+
+    def validate(self, plugins):
+        """ Validate the snapshot against the actual plugins.
+
+        Return True if the snapshot can be used (i.e. if the plugins are in the
+        same order as when the snapshot was taken), otherwise return False.
+
+        This also sets 'valid_plugin_ids' to the Ids of those plugins whose
+        fingerprints still match.
+
+        """
+
+        plugins = list(plugins)
+        if [plugin.id for plugin in plugins] != self.plugin_ids:
+            self.valid_plugin_ids = set()
+            return False
+
+        self.valid_plugin_ids = set(
+            plugin.id for plugin in plugins
+
+            if self.fingerprints.get(plugin.id) == self.get_fingerprint(plugin)
+        )
+
+        logger.debug(
+            'startup snapshot valid for plugins <%s>', self.valid_plugin_ids
+        )
+
+        return True
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    @classmethod
+    def _pickle_contributions(cls, plugin, extension_point_id, contributed):
+        """ Pickle a plugin's contributions to an extension point.
+
+        Return None if the contributions cannot be pickled.
+
+        """
+
+        try:
+            pickled = cPickle.dumps(
+                list(contributed), cPickle.HIGHEST_PROTOCOL
+            )
+
+        except Exception:
+            logger.debug(
+                'contributions of <%s> to <%s> cannot be pickled',
+                plugin.id, extension_point_id
+            )
+            pickled = None
+
+        return pickled
+
+#### EOF ######################################################################
@@ -0,0 +1,117 @@
+""" Tests for the (lazily imported) Envisage API. """
+
+
+# Standard library imports.
+import os, subprocess, sys
+
+# Enthought library imports.
+import envisage
+from traits.testing.unittest_tools import unittest
+
+
+# The code run in a fresh interpreter to find out what importing the API
+# imports. It prints the names of the interesting modules that were imported.
+SCRIPT = """
+import sys
+%s
+print ' '.join(
+    sorted(
+        name for name in sys.modules
+
+        if sys.modules[name] is not None and (
+            name.split('.')[0] in ('apptools', 'pkg_resources')
+            or name.startswith('envisage.')
+        )
+    )
+)
+"""
+
+
+class APITestCase(unittest.TestCase):
+    """ Tests for the (lazily imported) Envisage API. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_importing_the_api_imports_nothing_else(self):
+        """ importing the api imports nothing else """
+
+        modules = self._get_imported_modules('import envisage.api')
+        self.assertEqual(['envisage.api', 'envisage.lazy_module'], modules)
+
+        return
+
+    def test_using_application_and_plugin(self):
+        """ using application and plugin """
+
+        modules = self._get_imported_modules(
+            'from envisage.api import Application, Plugin'
+        )
+
+        # Neither 'pkg_resources' nor 'apptools' are needed until an
+        # application is actually created.
+        self.assert_('envisage.application' in modules)
+        self.assert_('envisage.plugin' in modules)
+        self.assert_('pkg_resources' not in modules)
+        self.assert_('apptools' not in modules)
+        self.assert_('envisage.egg_plugin_manager' not in modules)
+
+        return
+
+    def test_all_names_can_be_imported(self):
+        """ all names can be imported """
+
+        import envisage.api
+
+        for name in envisage.api.__all__:
+            self.assert_(getattr(envisage.api, name) is not None)
+
+        self.assert_('Application' in dir(envisage.api))
+        self.failUnlessRaises(AttributeError, getattr, envisage.api, 'Bogus')
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _get_imported_modules(self, statement):
+        """ Return the interesting modules imported by a statement. """
+
+        # Make sure that the interpreter imports this copy of Envisage.
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join(
+            [os.path.dirname(os.path.dirname(envisage.__file__))]
+            + [path for path in [env.get('PYTHONPATH')] if path]
+        )
+
+        process = subprocess.Popen(
+            [sys.executable, '-c', SCRIPT % statement],
+            env=env, stdout=subprocess.PIPE
+        )
+        output, error = process.communicate()
+        self.assertEqual(0, process.returncode)
+
+        return output.split()
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
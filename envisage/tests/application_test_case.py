@@ -2,13 +2,14 @@
 
 
 # Standard library imports.
-import os, shutil, unittest
+import os, shutil, tempfile, unittest
 
 # Enthought library imports.
+from apptools.preferences.api import ScopedPreferences
 from traits.etsconfig.api import ETSConfig
 from envisage.api import Application, ExtensionPoint
 from envisage.api import Plugin, PluginManager
-from traits.api import Bool, Int, List
+from traits.api import Bool, HasTraits, Int, List
 
 # Local imports.
 #
@@ -487,6 +488,104 @@ class ApplicationTestCase(unittest.TestCase):
 
         return
 
+    def test_lifecycle_event_types(self):
+        """ lifecycle event types """
+
+        application = TestApplication()
+
+        def on_event(obj, trait_name, old, new):
+            """ Called when a lifecycle event is fired. """
+
+            on_event.events[trait_name] = new
+
+            return
+
+        on_event.events = {}
+
+        for trait_name in ['starting', 'started', 'stopping', 'stopped']:
+            application.on_trait_change(on_event, trait_name)
+
+        application.add_plugin(SimplePlugin())
+        application.start()
+        application.stop()
+
+        # Events that can be vetoed are full 'HasTraits' events...
+        self.assert_(isinstance(on_event.events['starting'], HasTraits))
+        self.assert_(isinstance(on_event.events['stopping'], HasTraits))
+
+        # ... but the others are lightweight.
+        for trait_name in ['started', 'stopped']:
+            event = on_event.events[trait_name]
+            self.assert_(not isinstance(event, HasTraits))
+            self.assertEqual(application, event.application)
+
+        return
+
+    def test_only_modified_preferences_are_saved(self):
+        """ only modified preferences are saved """
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'preferences.ini')
+
+            preferences = ScopedPreferences(
+                application_preferences_filename=filename
+            )
+            application = TestApplication(preferences=preferences)
+
+            # Nothing has changed so nothing gets saved.
+            application.start()
+            application.stop()
+            self.assert_(not os.path.exists(filename))
+
+            # Changing the (transient) default scope doesn't matter either.
+            application.start()
+            preferences.set('default/acme.x', 1)
+            application.stop()
+            self.assert_(not os.path.exists(filename))
+
+            # But changing the application scope does.
+            application.start()
+            preferences.set('application/acme.x', 2)
+            application.stop()
+            self.assert_(os.path.exists(filename))
+
+            preferences = ScopedPreferences(
+                application_preferences_filename=filename
+            )
+            self.assertEqual('2', preferences.get('application/acme.x'))
+
+        finally:
+            shutil.rmtree(tmpdir)
+
+        return
+
+    def test_preferences_modified_before_start_are_saved(self):
+        """ preferences modified before start are saved """
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'preferences.ini')
+
+            preferences = ScopedPreferences(
+                application_preferences_filename=filename
+            )
+            application = TestApplication(preferences=preferences)
+
+            preferences.set('application/acme.x', 1)
+            application.start()
+            application.stop()
+
+            preferences = ScopedPreferences(
+                application_preferences_filename=filename
+            )
+            self.assertEqual('1', preferences.get('application/acme.x'))
+
+        finally:
+            shutil.rmtree(tmpdir)
+
+        return
+
 
 # Entry point for stand-alone testing.
 if __name__ == '__main__':
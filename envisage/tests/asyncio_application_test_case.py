@@ -0,0 +1,309 @@
+""" Tests for the asyncio application. """
+
+
+# Standard library imports.
+import threading
+
+# Enthought library imports.
+from envisage.api import AsyncioApplication, ExtensionPoint, Plugin, Service
+from traits.api import Any, HasTraits, Interface, List, implements
+from traits.api import pop_exception_handler, push_exception_handler
+from traits.testing.unittest_tools import unittest
+
+
+class IFoo(Interface):
+    pass
+
+
+class Foo(HasTraits):
+    implements(IFoo)
+
+
+class AsyncPlugin(Plugin):
+    """ A plugin whose start and stop are asynchronous. """
+
+    #### 'IPlugin' interface ##################################################
+
+    # The plugin's unique identifier.
+    id = 'async'
+
+    #### 'AsyncPlugin' interface ##############################################
+
+    # What happened (and when!). This is a list that can be shared by
+    # plugins.
+    events = Any
+
+    ###########################################################################
+    # 'IPlugin' interface.
+    ###########################################################################
+
+    def start(self):
+        """ Start the plugin. """
+
+        self.events.append('%s starting' % self.id)
+
+        return self._complete_later('%s started' % self.id)
+
+    def stop(self):
+        """ Stop the plugin. """
+
+        self.events.append('%s stopping' % self.id)
+
+        return self._complete_later('%s stopped' % self.id)
+
+    def unregister_services(self):
+        """ Unregister any service offered by the plugin. """
+
+        self.events.append('%s unregistered services' % self.id)
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _complete_later(self, event):
+        """ Return a future that completes (and records an event) later. """
+
+        from envisage.asyncio_utils import create_future
+
+        loop   = self.application.loop
+        future = create_future(loop)
+        future.add_done_callback(lambda future: self.events.append(event))
+        loop.call_later(0.01, future.set_result, None)
+
+        return future
+
+
+class ExtensionPointPlugin(Plugin):
+    """ A plugin that offers an extension point. """
+
+    id = 'extension_point'
+
+    x = ExtensionPoint(List, id='x')
+
+
+class ContributingPlugin(Plugin):
+    """ A plugin that contributes to the extension point. """
+
+    id = 'contributing'
+
+    x = List([42], contributes_to='x')
+
+
+class ServiceUserPlugin(Plugin):
+    """ A plugin that uses a (cached) service. """
+
+    id = 'service_user'
+
+    foo = Service(IFoo, cache=True)
+
+
+class AsyncioApplicationTestCase(unittest.TestCase):
+    """ Tests for the asyncio application. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        try:
+            from envisage.asyncio_utils import import_asyncio
+            self.asyncio = import_asyncio()
+
+        except ImportError:
+            raise unittest.SkipTest('asyncio is not available')
+
+        self.loop = self.asyncio.new_event_loop()
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        self.asyncio.set_event_loop(None)
+        self.loop.close()
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_asynchronous_start_and_stop(self):
+        """ asynchronous start and stop """
+
+        events = []
+        a = AsyncPlugin(id='a', events=events)
+        b = AsyncPlugin(id='b', events=events)
+
+        application = AsyncioApplication(
+            id='test', loop=self.loop, plugins=[a, b]
+        )
+        application.on_trait_change(
+            lambda: events.append('application started'), 'started'
+        )
+        application.on_trait_change(
+            lambda: events.append('application stopped'), 'stopped'
+        )
+
+        # Stop the application as soon as the event loop is running.
+        self.loop.call_soon(application.stop)
+        self.assertEqual(True, application.start())
+
+        # The plugins started (and stopped) concurrently, and the application
+        # waited for them before firing its 'started' (and 'stopped') events.
+        expected = [
+            'a starting', 'b starting',
+            'a started', 'b started', 'application started',
+            'b stopping', 'a stopping',
+            'b stopped', 'b unregistered services',
+            'a stopped', 'a unregistered services',
+            'application stopped'
+        ]
+        self.assertEqual(expected, events)
+
+        # The plugins were started and stopped in the application's loop.
+        self.assertEqual(self.loop, a.activator.loop)
+
+        return
+
+    def test_stop_vetoed(self):
+        """ stop vetoed """
+
+        application = AsyncioApplication(id='test', loop=self.loop)
+
+        vetoes = []
+        def vetoer(event):
+            """ Veto the first stop. """
+
+            if len(vetoes) == 0:
+                vetoes.append(event)
+                event.veto = True
+                self.loop.call_soon(application.stop)
+
+            return
+
+        application.on_trait_change(vetoer, 'stopping')
+
+        self.loop.call_soon(application.stop)
+        self.assertEqual(True, application.start())
+        self.assertEqual(1, len(vetoes))
+
+        return
+
+    def test_listeners_are_called_in_the_loop_thread(self):
+        """ listeners are called in the loop thread """
+
+        application = AsyncioApplication(
+            id='test', loop=self.loop, plugins=[ExtensionPointPlugin()]
+        )
+
+        threads = []
+        def listener(*args):
+            """ Record the thread that the listener is called in. """
+
+            threads.append(threading.current_thread())
+
+            return
+
+        # Listeners are only called for extension points whose extensions
+        # have been asked for.
+        application.add_extension_point_listener(listener, 'x')
+        self.assertEqual([], application.get_extensions('x'))
+        application.service_registry.on_trait_change(listener, 'registered')
+
+        def change_things():
+            """ Register a service and contribute to the extension point. """
+
+            application.register_service(IFoo, Foo())
+            application.add_plugin(ContributingPlugin())
+            application.stop()
+
+            return
+
+        thread = threading.Thread(target=change_things)
+        self.loop.call_soon(thread.start)
+        application.start()
+        thread.join()
+
+        self.assertEqual([threading.current_thread()] * 2, threads)
+        self.assertEqual(
+            [42], application.get_plugin('extension_point').x
+        )
+
+        return
+
+    def test_services_changed_in_another_thread(self):
+        """ services changed in another thread """
+
+        plugin = ServiceUserPlugin()
+        application = AsyncioApplication(
+            id='test', loop=self.loop, plugins=[plugin]
+        )
+
+        foo = Foo()
+        registered   = threading.Event()
+        unregister   = threading.Event()
+        unregistered = threading.Event()
+        def change_services():
+            """ Register and then unregister a service. """
+
+            foo_id = application.register_service(IFoo, foo)
+            registered.set()
+            unregister.wait()
+            application.unregister_service(foo_id)
+            unregistered.set()
+
+            return
+
+        services = []
+        def use_services():
+            """ Use the service whilst the other thread changes things. """
+
+            # The (lack of a) service is cached.
+            services.append(plugin.foo)
+
+            # The loop thread is kept busy until the changes have been made,
+            # so the 'registered' and 'unregistered' events are not fired
+            # until they both have.
+            thread = threading.Thread(target=change_services)
+            thread.start()
+            registered.wait()
+            services.append(plugin.foo)
+            unregister.set()
+            unregistered.wait()
+            services.append(plugin.foo)
+            thread.join()
+
+            application.stop()
+
+            return
+
+        errors = []
+        push_exception_handler(
+            handler=lambda obj, name, old, new: errors.append(name),
+            reraise_exceptions=False
+        )
+        try:
+            self.loop.call_soon(use_services)
+            application.start()
+
+        finally:
+            pop_exception_handler()
+
+        # The cache never returns a service that has gone, or hides one that
+        # has arrived, even though the events are fired later.
+        self.assertEqual([None, foo, None], services)
+        self.assertEqual([], errors)
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
@@ -0,0 +1,11 @@
+""" Another test class used to test categories. """
+
+
+# Enthought library imports.
+from traits.api import HasTraits, Int
+
+
+class BazCategory(HasTraits):
+    z = Int
+
+#### EOF ######################################################################
@@ -2,7 +2,8 @@
 
 
 from envisage.api import ClassLoadHook
-from traits.api import HasTraits
+from envisage.class_load_hook import class_load_hook_dispatcher
+from traits.api import HasTraits, MetaHasTraits
 from traits.testing.unittest_tools import unittest
 
 
@@ -113,6 +114,115 @@ class ClassLoadHookTestCase(unittest.TestCase):
 
         return
 
+    def test_disconnect_before_class_is_loaded(self):
+        """ disconnect before class is loaded """
+
+        classes = []
+
+        class_name = ClassLoadHookTestCase.__module__ + '.Bar'
+        hook = ClassLoadHook(class_name=class_name, on_load=classes.append)
+        hook.connect()
+        self.assertEqual(1, len(MetaHasTraits._listeners.get(class_name, [])))
+
+        # Disconnecting the last hook for a class removes the listener too.
+        hook.disconnect()
+        self.assertEqual([], MetaHasTraits._listeners.get(class_name, []))
+
+        class Bar(HasTraits):
+            pass
+
+        self.assertEqual([], classes)
+
+        return
+
+    def test_other_listeners_for_the_class_are_called(self):
+        """ other listeners for the class are called """
+
+        classes = []
+
+        # The hook connects another hook when it is called (which must not
+        # remove the first hook's listener whilst its class is being created).
+        other = ClassLoadHook(
+            class_name=ClassLoadHookTestCase.__module__ + '.Other'
+        )
+        def on_class_loaded(cls):
+            """ Called when a class is loaded. """
+
+            classes.append(cls)
+            other.connect()
+
+            return
+
+        class_name = ClassLoadHookTestCase.__module__ + '.Baz'
+        hook = ClassLoadHook(class_name=class_name, on_load=on_class_loaded)
+        hook.connect()
+
+        # Another listener for the same class (registered after the hook's).
+        listener = lambda cls: classes.append(cls)
+        MetaHasTraits.add_listener(listener, class_name)
+        try:
+            class Baz(HasTraits):
+                pass
+
+        finally:
+            MetaHasTraits.remove_listener(listener, class_name)
+
+        self.assertEqual([Baz, Baz], classes)
+
+        # Tidy up the hooks' listeners.
+        other.disconnect()
+        self.assertEqual([], MetaHasTraits._listeners.get(class_name, []))
+
+        return
+
+    def test_hook_is_only_called_once(self):
+        """ hook is only called once """
+
+        def on_class_loaded(cls):
+            """ Called when a class is loaded. """
+
+            on_class_loaded.classes.append(cls)
+
+            return
+
+        on_class_loaded.classes = []
+
+        # To register with 'MetaHasTraits' we use 'module_name.class_name'.
+        class_name = ClassLoadHookTestCase.__module__ + '.Foo'
+        hooks = [
+            ClassLoadHook(class_name=class_name, on_load=on_class_loaded)
+
+            for i in range(10)
+        ]
+
+        for hook in hooks:
+            hook.connect()
+
+        # All of the hooks share a single 'MetaHasTraits' listener for their
+        # class (and nothing listens for every class).
+        self.assertEqual(1, len(MetaHasTraits._listeners.get(class_name, [])))
+        self.assert_(
+            class_load_hook_dispatcher._on_class_created
+            not in MetaHasTraits._listeners.get('', [])
+        )
+
+        class Foo(HasTraits):
+            pass
+
+        self.assertEqual([Foo] * 10, on_class_loaded.classes)
+
+        # The listener is removed once the class has been loaded (the next
+        # time that hooks are added or removed).
+        hooks[0].disconnect()
+        self.assertEqual([], MetaHasTraits._listeners.get(class_name, []))
+
+        class Foo(HasTraits):
+            pass
+
+        self.assertEqual(10, len(on_class_loaded.classes))
+
+        return
+
     ###########################################################################
     # Private interface.
     ###########################################################################
@@ -160,6 +160,136 @@ class CompositePluginManagerTestCase(unittest.TestCase):
         
         return
     
+    def test_merged_view_reflects_plugins_added_and_removed(self):
+
+        a = PluginManager(plugins=[SimplePlugin(id='red')])
+        b = PluginManager(plugins=[SimplePlugin(id='green')])
+
+        composite_plugin_manager = CompositePluginManager(
+            plugin_managers = [a, b]
+        )
+        self.assertEqual(
+            ['red', 'green'],
+            [plugin.id for plugin in composite_plugin_manager]
+        )
+
+        # Plugins added to a plugin manager appear after its other plugins but
+        # before the plugins of any subsequent plugin managers.
+        yellow = SimplePlugin(id='yellow')
+        a.add_plugin(yellow)
+        self.assertEqual(
+            ['red', 'yellow', 'green'],
+            [plugin.id for plugin in composite_plugin_manager]
+        )
+        self.assertEqual(yellow, composite_plugin_manager.get_plugin('yellow'))
+
+        a.remove_plugin(yellow)
+        self.assertEqual(
+            ['red', 'green'],
+            [plugin.id for plugin in composite_plugin_manager]
+        )
+        self.assertEqual(None, composite_plugin_manager.get_plugin('yellow'))
+
+        return
+
+    def test_adding_and_removing_plugins_does_not_rebuild_merged_view(self):
+
+        a = PluginManager(plugins=[SimplePlugin(id='red')])
+        b = PluginManager(plugins=[SimplePlugin(id='green')])
+
+        composite_plugin_manager = CompositePluginManager(
+            plugin_managers = [a, b]
+        )
+        self.assertEqual(2, len(list(composite_plugin_manager)))
+
+        rebuilds = []
+        composite_plugin_manager.on_trait_change(
+            lambda: rebuilds.append(True), '_plugins_valid'
+        )
+
+        yellow = SimplePlugin(id='yellow')
+        a.add_plugin(yellow)
+        b.remove_plugin(b.get_plugin('green'))
+        self.assertEqual(
+            ['red', 'yellow'],
+            [plugin.id for plugin in composite_plugin_manager]
+        )
+        self.assertEqual([], rebuilds)
+
+        # Replacing a plugin manager's plugins does rebuild it.
+        b._plugins = [SimplePlugin(id='blue')]
+        self.assertEqual(
+            ['red', 'yellow', 'blue'],
+            [plugin.id for plugin in composite_plugin_manager]
+        )
+        self.assertEqual([True, True], rebuilds)
+
+        return
+
+    def test_merged_view_reflects_changes_to_plugin_managers(self):
+
+        a = PluginManager(plugins=[SimplePlugin(id='red')])
+        b = PluginManager(plugins=[SimplePlugin(id='green')])
+
+        composite_plugin_manager = CompositePluginManager(
+            plugin_managers = [a]
+        )
+        self.assertEqual(
+            ['red'], [plugin.id for plugin in composite_plugin_manager]
+        )
+
+        composite_plugin_manager.plugin_managers.append(b)
+        self.assertEqual(
+            ['red', 'green'],
+            [plugin.id for plugin in composite_plugin_manager]
+        )
+
+        b.exclude = ['green']
+        self.assertEqual(
+            ['red'], [plugin.id for plugin in composite_plugin_manager]
+        )
+        self.assertEqual(None, composite_plugin_manager.get_plugin('green'))
+
+        return
+
+    def test_add_and_remove_plugins_via_the_composite(self):
+
+        a = PluginManager()
+        b = PluginManager()
+
+        composite_plugin_manager = CompositePluginManager(
+            plugin_managers = [a, b]
+        )
+
+        # By default, plugins are added to the first plugin manager.
+        red = SimplePlugin(id='red')
+        composite_plugin_manager.add_plugin(red)
+        self.assertEqual(red, a.get_plugin('red'))
+
+        # ... unless a default plugin manager is specified.
+        composite_plugin_manager.default_plugin_manager = b
+        green = SimplePlugin(id='green')
+        composite_plugin_manager.add_plugin(green)
+        self.assertEqual(green, b.get_plugin('green'))
+
+        self.assertEqual(
+            ['red', 'green'],
+            [plugin.id for plugin in composite_plugin_manager]
+        )
+
+        # Plugins are removed from whichever manager contains them.
+        composite_plugin_manager.remove_plugin(red)
+        self.assertEqual(None, a.get_plugin('red'))
+        self.assertEqual(
+            ['green'], [plugin.id for plugin in composite_plugin_manager]
+        )
+
+        self.failUnlessRaises(
+            ValueError, composite_plugin_manager.remove_plugin, red
+        )
+
+        return
+
     #### Private protocol #####################################################
 
     def _plugin_count(self, plugin_manager):
@@ -1,12 +1,15 @@
 """ Tests for the core plugin. """
 
 
+# Standard library imports.
+import os, shutil, tempfile
+
 # Major package imports.
 from pkg_resources import resource_filename
 
 # Enthought library imports.
 from envisage.api import Application, Category, ClassLoadHook, Plugin
-from envisage.api import ServiceOffer
+from envisage.api import ServiceOffer, ServicePool, pooled
 from traits.api import HasTraits, Int, Interface, List
 from traits.testing.unittest_tools import unittest
 
@@ -91,6 +94,151 @@ class CorePluginTestCase(unittest.TestCase):
 
         return
 
+    def test_service_offer_lifetimes(self):
+        """ service offer lifetimes """
+
+        import threading
+        from envisage.core_plugin import CorePlugin
+
+        class ISingleton(Interface):
+            pass
+
+        class IPerThread(Interface):
+            pass
+
+        class ITransient(Interface):
+            pass
+
+        class IPooled(Interface):
+            pass
+
+        class Foo(HasTraits):
+            pass
+
+        class PluginA(Plugin):
+            id = 'A'
+
+            service_offers = List(
+                contributes_to='envisage.service_offers'
+            )
+
+            def _service_offers_default(self):
+                """ Trait initializer. """
+
+                service_offers = [
+                    ServiceOffer(protocol=ISingleton, factory=Foo),
+                    ServiceOffer(
+                        protocol=IPerThread, factory=Foo, lifetime='per_thread'
+                    ),
+                    ServiceOffer(
+                        protocol=ITransient, factory=Foo, lifetime='transient'
+                    ),
+                    ServiceOffer(
+                        protocol=IPooled, factory=Foo, lifetime=pooled(1, 2)
+                    )
+                ]
+
+                return service_offers
+
+        application = TestApplication(plugins=[CorePlugin(), PluginA()])
+        application.start()
+
+        get_service = application.get_service
+        self.assertEqual(get_service(ISingleton), get_service(ISingleton))
+        self.assertEqual(get_service(IPerThread), get_service(IPerThread))
+        self.assertNotEqual(get_service(ITransient), get_service(ITransient))
+
+        services = []
+        thread = threading.Thread(
+            target=lambda: services.append(get_service(IPerThread))
+        )
+        thread.start()
+        thread.join()
+        self.assertNotEqual(get_service(IPerThread), services[0])
+
+        # Pooled services are checked out of the pool.
+        pool = get_service(IPooled)
+        self.assert_(isinstance(pool, ServicePool))
+        self.assertEqual(1, pool.size)
+        with pool.checkout() as foo:
+            self.assert_(isinstance(foo, Foo))
+
+        application.stop()
+
+        return
+
+    def test_service_offer_warmup(self):
+        """ service offer warmup """
+
+        import threading
+        from envisage.core_plugin import CorePlugin
+
+        class ILazy(Interface):
+            pass
+
+        class IEager(Interface):
+            pass
+
+        class IBackground(Interface):
+            pass
+
+        created = []
+        release = threading.Event()
+
+        class Foo(HasTraits):
+            def __init__(self, name, **traits):
+                if name == 'background':
+                    release.wait()
+
+                created.append(name)
+
+        offers = [
+            ServiceOffer(
+                protocol=ILazy, factory=Foo, properties={'name' : 'lazy'}
+            ),
+            ServiceOffer(
+                protocol=IEager, factory=Foo, properties={'name' : 'eager'},
+                warmup='eager'
+            ),
+            ServiceOffer(
+                protocol=IBackground, factory=Foo,
+                properties={'name' : 'background'}, warmup='background'
+            )
+        ]
+
+        class PluginA(Plugin):
+            id = 'A'
+
+            service_offers = List(
+                offers, contributes_to='envisage.service_offers'
+            )
+
+        application = TestApplication(plugins=[CorePlugin(), PluginA()])
+        application.start()
+
+        # The eager service was created when the core plugin started, but the
+        # lazy one has not been created yet.
+        self.assertEqual(['eager'], created)
+        self.assertEqual(True, offers[0].ready)
+        self.assertEqual(True, offers[1].ready)
+
+        # The background service is being created.
+        self.assertEqual(False, offers[2].wait_until_ready(0.01))
+        release.set()
+        self.assertEqual(True, offers[2].wait_until_ready(5))
+        self.assertEqual(['eager', 'background'], created)
+
+        # Looking the background service up does not create it again.
+        self.assertNotEqual(None, application.get_service(IBackground))
+        self.assertEqual(['eager', 'background'], created)
+
+        application.get_service(ILazy)
+        self.assertEqual(['eager', 'background', 'lazy'], created)
+
+        application.stop()
+
+        return
+
     def test_dynamically_added_service_offer(self):
         """ dynamically added service offer """
 
@@ -192,6 +340,59 @@ class CorePluginTestCase(unittest.TestCase):
 
         return
 
+    def test_categories_for_the_same_class(self):
+        """ categories for the same class """
+
+        from envisage.class_load_hook import class_load_hook_dispatcher
+        from envisage.core_plugin import CorePlugin
+
+        target_class_name = CorePluginTestCase.__module__ + '.Bar'
+
+        class PluginA(Plugin):
+            id = 'A'
+
+            categories = List(
+                [
+                    Category(
+                        class_name = PKG + '.bar_category.BarCategory',
+                        target_class_name = target_class_name
+                    ),
+
+                    Category(
+                        class_name = PKG + '.baz_category.BazCategory',
+                        target_class_name = target_class_name
+                    )
+                ],
+
+                contributes_to='envisage.categories'
+            )
+
+        core = CorePlugin()
+        a    = PluginA()
+
+        application = TestApplication(plugins=[core, a])
+        application.start()
+
+        # Both categories are added by a single hook.
+        self.assertEqual(
+            1, len(class_load_hook_dispatcher._hooks[target_class_name])
+        )
+
+        # Create the target class.
+        class Bar(HasTraits):
+            x = Int
+
+        # Make sure both categories were imported and added.
+        self.assert_('y' in Bar.class_traits())
+        self.assert_('z' in Bar.class_traits())
+
+        # The hook has been removed now that it has been called.
+        self.assert_(
+            target_class_name not in class_load_hook_dispatcher._hooks
+        )
+
+        return
+
     def test_dynamically_added_category(self):
         """ dynamically added category """
 
@@ -396,6 +597,111 @@ class CorePluginTestCase(unittest.TestCase):
 
         return
 
+    def test_preferences_are_loaded_in_contribution_order(self):
+        """ preferences are loaded in contribution order """
+
+        # The core plugin is the plugin that offers the preferences extension
+        # point.
+        from envisage.core_plugin import CorePlugin
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            urls = []
+            for i in range(10):
+                filename = os.path.join(tmpdir, 'preferences_%d.ini' % i)
+                f = file(filename, 'w')
+                f.write('[enthought.test]\nx = %d\ny%d = %d\n' % (i, i, i))
+                f.close()
+
+                urls.append('file://' + filename)
+
+            class PluginA(Plugin):
+                id = 'A'
+                preferences = List(urls, contributes_to='envisage.preferences')
+
+            core = CorePlugin(preferences_workers=4)
+            a    = PluginA()
+
+            application = TestApplication(plugins=[core, a])
+            application.run()
+
+        finally:
+            shutil.rmtree(tmpdir)
+
+        # The last file contributed wins...
+        self.assertEqual('9', application.preferences.get('enthought.test.x'))
+
+        # ... but the values from all of the files are there.
+        for i in range(10):
+            self.assertEqual(
+                str(i), application.preferences.get('enthought.test.y%d' % i)
+            )
+
+        return
+
+    def test_preferences_are_cached(self):
+        """ preferences are cached """
+
+        # The core plugin is the plugin that offers the preferences extension
+        # point.
+        from envisage.core_plugin import CorePlugin
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'preferences.ini')
+            self._write_preferences(filename, 'x = 1', 1000)
+
+            class PluginA(Plugin):
+                id = 'A'
+                preferences = List(
+                    ['file://' + filename],
+                    contributes_to='envisage.preferences'
+                )
+
+            def get_x():
+                """ Start an application and get the value of 'x'. """
+
+                core = CorePlugin(
+                    preferences_cache_filename=os.path.join(tmpdir, 'cache')
+                )
+                a    = PluginA()
+
+                application = TestApplication(plugins=[core, a])
+                application.run()
+
+                return application.preferences.get('enthought.test.x')
+
+            self.assertEqual('1', get_x())
+
+            # Change the file without changing its modification time. The
+            # (now stale ;^) cached value is used.
+            self._write_preferences(filename, 'x = 2', 1000)
+            self.assertEqual('1', get_x())
+
+            # Now change the modification time too.
+            self._write_preferences(filename, 'x = 2', 2000)
+            self.assertEqual('2', get_x())
+
+        finally:
+            shutil.rmtree(tmpdir)
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _write_preferences(self, filename, line, mtime):
+        """ Write a preferences file with the specified modification time. """
+
+        f = file(filename, 'w')
+        f.write('[enthought.test]\n%s\n' % line)
+        f.close()
+
+        os.utime(filename, (mtime, mtime))
+
+        return
+
 
 # Entry point for stand-alone testing.
 if __name__ == '__main__':
@@ -0,0 +1,197 @@
+""" Tests for the entry point plugin manager. """
+
+
+# Standard library imports.
+import sys
+from glob import glob
+from os.path import dirname, join
+
+# Enthought library imports.
+from envisage.api import EntryPointPluginManager
+from traits.testing.unittest_tools import unittest
+
+# The plugin manager requires either 'importlib.metadata' or the
+# 'importlib_metadata' backport.
+try:
+    import envisage.metadata_utils
+
+except ImportError:
+    metadata_available = False
+
+else:
+    metadata_available = True
+
+
+@unittest.skipUnless(metadata_available, 'importlib.metadata not available')
+class EntryPointPluginManagerTestCase(unittest.TestCase):
+    """ Tests for the entry point plugin manager. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        # The eggs built for the version of Python that we are running under.
+        pattern   = '*-py%d.%d.egg' % sys.version_info[:2]
+        self.eggs = glob(join(dirname(__file__), 'eggs', pattern))
+
+        # The eggs must be on sys.path so that the plugins can be imported.
+        self.original_sys_path = sys.path[:]
+        sys.path.extend(self.eggs)
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        sys.path[:] = self.original_sys_path
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_plugins_are_found_in_dependency_order(self):
+        """ plugins are found in dependency order """
+
+        # 'acme.baz' requires 'acme.bar' which requires 'acme.foo'.
+        expected = ['acme.foo', 'acme.bar', 'acme.baz']
+
+        plugin_manager = EntryPointPluginManager(path=self.eggs)
+
+        self._test_start_and_stop(plugin_manager, expected)
+
+        return
+
+    def test_duplicate_distributions_are_ignored(self):
+        """ duplicate distributions are ignored """
+
+        # The first occurrence of a distribution on the path wins.
+        expected = ['acme.foo', 'acme.bar', 'acme.baz']
+
+        plugin_manager = EntryPointPluginManager(path=self.eggs + self.eggs)
+
+        self._test_start_and_stop(plugin_manager, expected)
+
+        return
+
+    def test_only_contributing_metadata_is_read(self):
+        """ only contributing metadata is read """
+
+        from envisage.metadata_utils import metadata, normalize_name
+
+        # Record the distributions whose metadata is read.
+        names    = []
+        original = metadata.Distribution.metadata
+        def get_metadata(distribution):
+            """ Record the name of the distribution and get its metadata. """
+
+            distribution_metadata = original.fget(distribution)
+            names.append(normalize_name(distribution_metadata['Name']))
+
+            return distribution_metadata
+
+        metadata.Distribution.metadata = property(get_metadata)
+        try:
+            plugin_manager = EntryPointPluginManager(
+                path=self.eggs + self.original_sys_path
+            )
+            ids = [plugin.id for plugin in plugin_manager]
+
+        finally:
+            metadata.Distribution.metadata = original
+
+        self.assertEqual(['acme.foo', 'acme.bar', 'acme.baz'], ids)
+        self.assertEqual(
+            set(['acme-foo', 'acme-bar', 'acme-baz']), set(names)
+        )
+
+        return
+
+    def test_no_include_or_exclude_on_sys_path(self):
+        """ no include or exclude on sys.path """
+
+        plugin_manager = EntryPointPluginManager()
+
+        # We don't know how many plugins we will actually get - it depends on
+        # what is on sys.path! What we *do* know however is the the 3 'acme'
+        # test eggs should be in there!
+        ids = [plugin.id for plugin in plugin_manager]
+
+        self.assertEqual(1, ids.count('acme.foo'))
+        self.assertEqual(1, ids.count('acme.bar'))
+        self.assertEqual(1, ids.count('acme.baz'))
+
+        return
+
+    def test_include_specific(self):
+        """ include specific """
+
+        expected = ['acme.foo', 'acme.bar']
+        include  = ['acme\.foo', 'acme\.bar']
+
+        plugin_manager = EntryPointPluginManager(
+            path=self.eggs, include=include
+        )
+
+        self._test_start_and_stop(plugin_manager, expected)
+
+        return
+
+    def test_exclude_multiple(self):
+        """ exclude multiple """
+
+        expected = ['acme.foo']
+        exclude  = ['acme\.b.*']
+
+        plugin_manager = EntryPointPluginManager(
+            path=self.eggs, exclude=exclude
+        )
+
+        self._test_start_and_stop(plugin_manager, expected)
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _test_start_and_stop(self, plugin_manager, expected):
+        """ Make sure the plugin manager starts and stops the expected plugins.
+
+        """
+
+        # Make sure the plugin manager found only the required plugins.
+        self.assertEqual(expected, [plugin.id for plugin in plugin_manager])
+
+        # Start the plugin manager. This starts all of the plugin manager's
+        # plugins.
+        plugin_manager.start()
+
+        # Make sure all of the the plugins were started.
+        for id in expected:
+            plugin = plugin_manager.get_plugin(id)
+            self.assertNotEqual(None, plugin)
+            self.assertEqual(True, plugin.started)
+
+        # Stop the plugin manager. This stops all of the plugin manager's
+        # plugins.
+        plugin_manager.stop()
+
+        # Make sure all of the the plugins were stopped.
+        for id in expected:
+            plugin = plugin_manager.get_plugin(id)
+            self.assertNotEqual(None, plugin)
+            self.assertEqual(True, plugin.stopped)
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
@@ -167,6 +167,40 @@ class ExtensionRegistryTestCase(unittest.TestCase):
 
         return
 
+    def test_extension_point_changed_event(self):
+        """ extension point changed event """
+
+        registry = ExtensionRegistry()
+
+        def listener(extension_registry, event):
+            """ Called when an extension point has changed. """
+
+            listener.events.append(event)
+
+            return
+
+        listener.events = []
+
+        # Add an extension *point*.
+        registry.add_extension_point(self._create_extension_point('my.ep'))
+        registry.add_extension_point_listener(listener, 'my.ep')
+
+        # Set some extensions.
+        registry.set_extensions('my.ep', [1, 2, 3])
+
+        self.assertEqual(1, len(listener.events))
+
+        event = listener.events[0]
+        self.assertEqual('my.ep', event.extension_point_id)
+        self.assertEqual([1, 2, 3], event.added)
+        self.assertEqual([], event.removed)
+        self.assertEqual(None, event.index)
+
+        # The event is a lightweight object.
+        self.assert_(not hasattr(event, '__dict__'))
+
+        return
+
     ###########################################################################
     # Private interface.
     ###########################################################################
@@ -0,0 +1,117 @@
+""" Tests for the file utilities. """
+
+
+# Standard library imports.
+import os, shutil, tempfile
+
+# Enthought library imports.
+from envisage.file_utils import replace_file
+from traits.testing.unittest_tools import unittest
+
+
+class FileUtilsTestCase(unittest.TestCase):
+    """ Tests for the file utilities. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        self.tmpdir = tempfile.mkdtemp()
+
+        self.source      = os.path.join(self.tmpdir, 'source')
+        self.destination = os.path.join(self.tmpdir, 'destination')
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        os.rename = self._rename
+        shutil.rmtree(self.tmpdir)
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_replace_file(self):
+        """ replace file """
+
+        self._write(self.source, 'new')
+        self._write(self.destination, 'old')
+
+        replace_file(self.source, self.destination)
+        self.assertEqual('new', self._read(self.destination))
+        self.assertEqual(False, os.path.exists(self.source))
+
+        return
+
+    def test_replace_file_where_rename_cannot_replace(self):
+        """ replace file where rename cannot replace """
+
+        self._write(self.source, 'new')
+        self._write(self.destination, 'old')
+
+        # Rename like Windows does, i.e. refuse to replace an existing file.
+        def rename(source, destination):
+            """ Rename a file that does not already exist. """
+
+            if os.path.exists(destination):
+                raise OSError('file exists')
+
+            self._rename(source, destination)
+
+        os.rename = rename
+
+        replace_file(self.source, self.destination)
+        self.assertEqual('new', self._read(self.destination))
+        self.assertEqual(False, os.path.exists(self.source))
+
+        # A failure for any other reason is still raised.
+        self.failUnlessRaises(
+            OSError, replace_file, self.source, self.destination
+        )
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    # The real 'os.rename' (restored after each test).
+    _rename = staticmethod(os.rename)
+
+    def _read(self, filename):
+        """ Return the contents of a file. """
+
+        f = file(filename)
+        try:
+            contents = f.read()
+
+        finally:
+            f.close()
+
+        return contents
+
+    def _write(self, filename, contents):
+        """ Write the contents of a file. """
+
+        f = file(filename, 'w')
+        try:
+            f.write(contents)
+
+        finally:
+            f.close()
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
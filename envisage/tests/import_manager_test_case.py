@@ -1,8 +1,12 @@
 """ Tests for the import manager. """
 
 
+# Standard library imports.
+import glob, os, shutil, sys, tempfile, types
+
 # Enthought library imports.
 from envisage.api import Application, ImportManager
+from envisage.import_manager import symbol_cache
 from traits.testing.unittest_tools import unittest
 
 
@@ -61,6 +65,114 @@ class ImportManagerTestCase(unittest.TestCase):
 
         return
 
+    def test_symbols_are_cached(self):
+        """ symbols are cached """
+
+        module = types.ModuleType('envisage_cached_module')
+        module.c = types.ModuleType('c')
+        module.c.x = 1
+        sys.modules[module.__name__] = module
+        try:
+            symbol_path = 'envisage_cached_module:c.x'
+            self.assertEqual(1, self.import_manager.import_symbol(symbol_path))
+
+            # The cached symbol is used...
+            module.c.x = 2
+            self.assertEqual(1, self.import_manager.import_symbol(symbol_path))
+
+            # ... until the module is reloaded...
+            symbol_cache.invalidate([module.__name__])
+            self.assertEqual(2, self.import_manager.import_symbol(symbol_path))
+
+            # ... or the name it was found through is rebound...
+            module.c = types.ModuleType('c')
+            module.c.x = 3
+            self.assertEqual(3, self.import_manager.import_symbol(symbol_path))
+
+            # ... or the module is replaced.
+            replacement = types.ModuleType(module.__name__)
+            replacement.c = types.ModuleType('c')
+            replacement.c.x = 4
+            sys.modules[module.__name__] = replacement
+            self.assertEqual(4, self.import_manager.import_symbol(symbol_path))
+
+        finally:
+            del sys.modules[module.__name__]
+
+        return
+
+    def test_symbols_are_not_stale_after_reload(self):
+        """ symbols are not stale after reload """
+
+        tmpdir = tempfile.mkdtemp()
+        sys.path.insert(0, tmpdir)
+        try:
+            filename = os.path.join(tmpdir, 'envisage_reloaded_module.py')
+            self._write(filename, 'class A(object):\n    v = 1\n')
+
+            import envisage_reloaded_module
+            symbol_path = 'envisage_reloaded_module.A'
+            self.assertEqual(
+                1, self.import_manager.import_symbol(symbol_path).v
+            )
+
+            # A plain 'reload' reuses the module object (make sure that the
+            # old byte code isn't used if the file's mtime hasn't changed).
+            self._write(filename, 'class A(object):\n    v = 2\n')
+            for compiled in glob.glob(filename + '[co]'):
+                os.remove(compiled)
+
+            reload(envisage_reloaded_module)
+            self.assertEqual(
+                2, self.import_manager.import_symbol(symbol_path).v
+            )
+
+        finally:
+            sys.path.remove(tmpdir)
+            sys.modules.pop('envisage_reloaded_module', None)
+            shutil.rmtree(tmpdir)
+
+        return
+
+    def test_lazy_import_symbol(self):
+        """ lazy import symbol """
+
+        module = types.ModuleType('envisage_lazy_module')
+        module.f = lambda x: x * 2
+        module.f.bar = 'bar'
+
+        proxy = self.import_manager.lazy_import_symbol(
+            'envisage_lazy_module:f'
+        )
+
+        # The symbol isn't imported until it is used.
+        sys.modules[module.__name__] = module
+        try:
+            self.assertEqual(4, proxy(2))
+            self.assertEqual('bar', proxy.bar)
+            self.assertEqual(module.f, proxy.resolve())
+
+        finally:
+            del sys.modules[module.__name__]
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _write(self, filename, contents):
+        """ Write the contents of a file. """
+
+        f = file(filename, 'w')
+        try:
+            f.write(contents)
+
+        finally:
+            f.close()
+
+        return
+
 
 # Entry point for stand-alone testing.
 if __name__ == '__main__':
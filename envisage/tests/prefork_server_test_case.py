@@ -0,0 +1,224 @@
+""" Tests for the prefork server. """
+
+
+# Standard library imports.
+import os, shutil, tempfile
+
+# Enthought library imports.
+from envisage.api import Application, Plugin
+from envisage.prefork_server import PreforkServer
+from traits.api import Str
+from traits.testing.unittest_tools import unittest
+
+
+class TestApplication(Application):
+    """ The type of application used in the tests. """
+
+    id = 'test'
+
+
+class RecordingPlugin(Plugin):
+    """ A plugin that records when it is stopped. """
+
+    id = 'recording'
+
+    # The directory to record stops in.
+    directory = Str
+
+    def start(self):
+        """ Start the plugin. """
+
+        self.application.register_service(str, 'a service')
+
+        return
+
+    def stop(self):
+        """ Stop the plugin. """
+
+        # Each process that stops the plugin leaves a file behind.
+        open(os.path.join(self.directory, str(os.getpid())), 'w').close()
+
+        return
+
+
+def handler(application, work_item):
+    """ Handle a work item in a worker process. """
+
+    if work_item == 'bogus':
+        raise ValueError('bogus work item')
+
+    return (os.getpid(), application.get_service(str), work_item * 2)
+
+
+def after_fork(application):
+    """ Re-initialize the application after forking. """
+
+    application.register_service(int, 42)
+
+    return
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'fork is not available')
+class PreforkServerTestCase(unittest.TestCase):
+    """ Tests for the prefork server. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        self.tmpdir = tempfile.mkdtemp()
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        shutil.rmtree(self.tmpdir)
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_workers_handle_jobs(self):
+        """ workers handle jobs """
+
+        application = TestApplication(
+            plugins=[RecordingPlugin(directory=self.tmpdir)]
+        )
+
+        server = PreforkServer(
+            application=application, handler=handler, workers=2
+        )
+        self.assertEqual(True, server.start())
+
+        job_ids = [server.submit(x) for x in range(10)]
+        results = dict(
+            (job_id, (result, error))
+            for job_id, result, error in [
+                server.get_result(timeout=10) for job_id in job_ids
+            ]
+        )
+
+        self.assertEqual(sorted(job_ids), sorted(results.keys()))
+        for job_id, x in zip(job_ids, range(10)):
+            (pid, service, doubled), error = results[job_id]
+            self.assertEqual(None, error)
+            self.assertNotEqual(os.getpid(), pid)
+            self.assertEqual('a service', service)
+            self.assertEqual(x * 2, doubled)
+
+        server.stop()
+
+        # The application is stopped in each worker, and in this process.
+        self.assertEqual(3, len(os.listdir(self.tmpdir)))
+        self.assertIn(str(os.getpid()), os.listdir(self.tmpdir))
+
+        return
+
+    def test_after_fork_hooks_run_in_workers(self):
+        """ after fork hooks run in workers """
+
+        application = TestApplication(
+            plugins=[RecordingPlugin(directory=self.tmpdir)]
+        )
+
+        server = PreforkServer(
+            application = application,
+            handler     = lambda app, x: app.get_service(int),
+            workers     = 1,
+            after_fork  = [after_fork]
+        )
+        server.start()
+
+        server.submit(None)
+        job_id, result, error = server.get_result(timeout=10)
+        self.assertEqual(42, result)
+
+        server.stop()
+
+        # The hook only ran in the worker.
+        self.assertEqual(None, application.get_service(int))
+
+        return
+
+    def test_stop_with_large_undelivered_results(self):
+        """ stop with large undelivered results """
+
+        application = TestApplication(
+            plugins=[RecordingPlugin(directory=self.tmpdir)]
+        )
+
+        # The result is bigger than a pipe's buffer.
+        server = PreforkServer(
+            application = application,
+            handler     = lambda app, x: 'x' * 1000000,
+            workers     = 1
+        )
+        server.start()
+
+        job_id = server.submit(None)
+        server.stop()
+
+        # The result can still be collected.
+        self.assertEqual(
+            (job_id, 'x' * 1000000, None), server.get_result(timeout=10)
+        )
+
+        return
+
+    def test_failing_after_fork_hook(self):
+        """ failing after fork hook """
+
+        def bad_hook(application):
+            raise ValueError('bad hook')
+
+        application = TestApplication(
+            plugins=[RecordingPlugin(directory=self.tmpdir)]
+        )
+
+        server = PreforkServer(
+            application = application,
+            handler     = handler,
+            workers     = 1,
+            after_fork  = [bad_hook]
+        )
+        server.start()
+        server.stop()
+
+        # The application was still stopped in the worker.
+        self.assertEqual(2, len(os.listdir(self.tmpdir)))
+
+        return
+
+    def test_errors_are_reported(self):
+        """ errors are reported """
+
+        application = TestApplication(
+            plugins=[RecordingPlugin(directory=self.tmpdir)]
+        )
+
+        server = PreforkServer(application=application, handler=handler)
+        server.start()
+
+        job_id = server.submit('bogus')
+        result = server.get_result(timeout=10)
+
+        server.stop()
+
+        self.assertEqual(job_id, result[0])
+        self.assertEqual(None, result[1])
+        self.assertIn('bogus work item', result[2])
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
@@ -0,0 +1,213 @@
+""" Tests for reloading plugins. """
+
+
+# Standard library imports.
+import os, shutil, sys, tempfile
+
+# Enthought library imports.
+from envisage.api import Application, ExtensionPoint, Plugin
+from traits.api import List
+from traits.testing.unittest_tools import unittest
+
+
+# The source of the module containing the plugin that gets reloaded.
+PLUGIN_MODULE = """
+from envisage.api import Plugin
+from traits.api import List
+
+from reloadable_package import helper
+
+class ReloadablePlugin(Plugin):
+
+    id = 'reloadable'
+    x  = List(%r, contributes_to='a.x')
+
+    def start(self):
+        if %r == 'fail':
+            raise ValueError('start failed')
+
+        self.service_id = self.application.register_service(str, %r)
+
+    def stop(self):
+        self.application.unregister_service(self.service_id)
+"""
+
+
+class TestApplication(Application):
+    """ The type of application used in the tests. """
+
+    id = 'test'
+
+
+class PluginA(Plugin):
+    """ A plugin that offers an extension point. """
+
+    id = 'A'
+    x  = ExtensionPoint(List, id='a.x')
+
+
+class ReloadPluginTestCase(unittest.TestCase):
+    """ Tests for reloading plugins. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        self.tmpdir  = tempfile.mkdtemp()
+        self.package = os.path.join(self.tmpdir, 'reloadable_package')
+        os.mkdir(self.package)
+        open(os.path.join(self.package, '__init__.py'), 'w').close()
+
+        # A module used by the plugin (that is *not* reloaded unless we ask).
+        f = open(os.path.join(self.package, 'helper.py'), 'w')
+        f.write('class Helper(object):\n    pass\n')
+        f.close()
+
+        sys.path.insert(0, self.tmpdir)
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        sys.path.remove(self.tmpdir)
+        for name in sys.modules.keys():
+            if name.startswith('reloadable_package'):
+                del sys.modules[name]
+
+        shutil.rmtree(self.tmpdir)
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_reload_plugin(self):
+        """ reload plugin """
+
+        self._write_plugin_module([1, 2, 3], 'old')
+        from reloadable_package.reloadable_plugin import ReloadablePlugin
+
+        a = PluginA()
+        application = TestApplication(plugins=[a, ReloadablePlugin()])
+        application.start()
+
+        self.assertEqual([1, 2, 3], a.x)
+        self.assertEqual('old', application.get_service(str))
+
+        # Extension point listeners are weakly referenced, so we have to keep
+        # a reference to the listener!
+        events = []
+        def listener(extension_registry, event):
+            events.append(event)
+
+        application.add_extension_point_listener(listener, 'a.x')
+
+        self._write_plugin_module([1, 2, 4], 'new')
+        new = application.reload_plugin('reloadable')
+
+        # The new plugin replaces the old one.
+        self.assertEqual(new, application.get_plugin('reloadable'))
+        self.assertEqual(['A', 'reloadable'], [p.id for p in application])
+
+        # Only the contributions that changed are reported.
+        self.assertEqual([1, 2, 4], a.x)
+        self.assertEqual(1, len(events))
+        self.assertEqual([4], events[0].added)
+        self.assertEqual([3], events[0].removed)
+        self.assertEqual(2, events[0].index)
+
+        # The old plugin's service was unregistered and the new one's
+        # registered.
+        self.assertEqual(['new'], application.get_services(str))
+
+        application.stop()
+
+        return
+
+    def test_only_the_plugin_module_is_reloaded(self):
+        """ only the plugin module is reloaded """
+
+        self._write_plugin_module([1, 2, 3], 'old')
+        from reloadable_package.reloadable_plugin import ReloadablePlugin
+        from reloadable_package.helper import Helper
+
+        application = TestApplication(plugins=[PluginA(), ReloadablePlugin()])
+        application.start()
+
+        application.reload_plugin('reloadable')
+        self.assert_(sys.modules['reloadable_package.helper'].Helper is Helper)
+
+        # ... unless we ask for other modules to be reloaded too.
+        application.reload_plugin(
+            'reloadable', modules=['reloadable_package.helper']
+        )
+        self.assert_(
+            sys.modules['reloadable_package.helper'].Helper is not Helper
+        )
+
+        application.stop()
+
+        return
+
+    def test_failed_reload_restores_old_plugin(self):
+        """ failed reload restores old plugin """
+
+        self._write_plugin_module([1, 2, 3], 'old')
+        from reloadable_package.reloadable_plugin import ReloadablePlugin
+
+        old = ReloadablePlugin()
+        application = TestApplication(plugins=[PluginA(), old])
+        application.start()
+
+        self._write_plugin_module([1, 2, 4], 'fail')
+        self.failUnlessRaises(
+            ValueError, application.reload_plugin, 'reloadable'
+        )
+
+        # The old plugin is back in place and running.
+        self.assertEqual(old, application.get_plugin('reloadable'))
+        self.assertEqual([1, 2, 3], application.get_plugin('A').x)
+        self.assertEqual(['old'], application.get_services(str))
+
+        application.stop()
+
+        return
+
+    def test_reload_unknown_plugin(self):
+        """ reload unknown plugin """
+
+        application = TestApplication(plugins=[PluginA()])
+
+        self.failUnlessRaises(ValueError, application.reload_plugin, 'bogus')
+
+        return
+
+    ###########################################################################
+    # Private interface.
+    ###########################################################################
+
+    def _write_plugin_module(self, x, service):
+        """ Write the module containing the reloadable plugin. """
+
+        filename = os.path.join(self.package, 'reloadable_plugin.py')
+        for compiled in [filename + 'c', filename + 'o']:
+            if os.path.exists(compiled):
+                os.remove(compiled)
+
+        f = open(filename, 'w')
+        f.write(PLUGIN_MODULE % (x, service, service))
+        f.close()
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
@@ -0,0 +1,162 @@
+""" Tests for service lifetimes. """
+
+
+# Standard library imports.
+import threading, time
+
+# Enthought library imports.
+from envisage.service_lifetime import ServicePool
+from traits.api import Bool, HasTraits
+from traits.testing.unittest_tools import unittest
+
+
+class Foo(HasTraits):
+    """ The type of service used in the tests. """
+
+
+class Closeable(HasTraits):
+    """ A service that has to be closed when it is discarded. """
+
+    # Has the service been closed?
+    closed = Bool(False)
+
+    def close(self):
+        """ Close the service. """
+
+        self.closed = True
+
+        return
+
+
+class ServiceLifetimeTestCase(unittest.TestCase):
+    """ Tests for service lifetimes. """
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_pool_is_bounded(self):
+        """ pool is bounded """
+
+        pool = ServicePool(factory=Foo, max=2)
+
+        a = pool.acquire()
+        b = pool.acquire()
+        self.assertNotEqual(a, b)
+        self.assertEqual(2, pool.size)
+
+        # The pool is exhausted.
+        self.failUnlessRaises(SystemError, pool.acquire, 0.01)
+
+        # Another thread waits for an instance to be returned.
+        services = []
+        thread = threading.Thread(
+            target=lambda: services.append(pool.acquire())
+        )
+        thread.start()
+        pool.release(a)
+        thread.join()
+        self.assertEqual([a], services)
+        self.assertEqual(2, pool.size)
+
+        return
+
+    def test_checkout_returns_service_to_pool(self):
+        """ checkout returns service to pool """
+
+        pool = ServicePool(factory=Foo, max=1)
+
+        with pool.checkout() as a:
+            pass
+
+        with pool.checkout() as b:
+            self.assertEqual(a, b)
+
+        return
+
+    def test_idle_services_are_evicted(self):
+        """ idle services are evicted """
+
+        pool = ServicePool(factory=Foo, min=1, max=3, idle_timeout=0.01)
+        pool.fill()
+        self.assertEqual(1, pool.size)
+
+        services = [pool.acquire() for i in range(3)]
+        map(pool.release, services)
+        self.assertEqual(3, pool.size)
+
+        time.sleep(0.05)
+
+        # Idle services are discarded, but never below the minimum.
+        with pool.checkout():
+            pass
+
+        self.assertEqual(1, pool.size)
+
+        return
+
+    def test_evicted_services_are_closed(self):
+        """ evicted services are closed """
+
+        pool = ServicePool(factory=Closeable, max=2, idle_timeout=0.01)
+
+        a = pool.acquire()
+        b = pool.acquire()
+        pool.release(a)
+        time.sleep(0.05)
+
+        # Returning 'b' evicts 'a' (which has been idle for too long).
+        pool.release(b)
+        self.assertEqual(True, a.closed)
+        self.assertEqual(False, b.closed)
+        self.assertEqual(1, pool.size)
+
+        return
+
+    def test_only_checked_out_services_can_be_released(self):
+        """ only checked out services can be released """
+
+        pool = ServicePool(factory=Foo, max=1)
+
+        # A service that didn't come from the pool.
+        self.failUnlessRaises(ValueError, pool.release, Foo())
+
+        # A service that has already been returned.
+        a = pool.acquire()
+        pool.release(a)
+        self.failUnlessRaises(ValueError, pool.release, a)
+
+        self.assertEqual(1, pool.size)
+        self.assertEqual(a, pool.acquire(0.01))
+
+        return
+
+    def test_failed_creation_does_not_use_up_the_pool(self):
+        """ failed creation does not use up the pool """
+
+        calls = []
+        def factory():
+            """ Fail the first time only. """
+
+            calls.append(None)
+            if len(calls) == 1:
+                raise ValueError('bogus')
+
+            return Foo()
+
+        pool = ServicePool(factory=factory, min=1, max=1)
+        self.failUnlessRaises(ValueError, pool.fill)
+        self.assertEqual(0, pool.size)
+
+        # The pool still has room for the instance.
+        self.assert_(isinstance(pool.acquire(0.01), Foo))
+        self.assertEqual(1, pool.size)
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
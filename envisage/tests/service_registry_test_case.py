@@ -2,7 +2,7 @@
 
 
 # Standard library imports.
-import sys
+import sys, threading, time
 
 # Enthought library imports.
 from envisage.api import Application, ServiceRegistry
@@ -231,6 +231,42 @@ class ServiceRegistryTestCase(unittest.TestCase):
 
         return
 
+    def test_get_services_in_registration_order(self):
+        """ get services in registration order """
+
+        class IFoo(Interface):
+            pass
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+        class IBar(Interface):
+            pass
+
+        class Bar(HasTraits):
+            implements(IBar)
+
+        # Register services against different protocols.
+        foos = [Foo(), Foo(), Foo()]
+        ids  = []
+        for foo in foos:
+            ids.append(self.service_registry.register_service(IFoo, foo))
+            self.service_registry.register_service(IBar, Bar())
+
+        self.assertEqual(foos, self.service_registry.get_services(IFoo))
+        self.assertEqual(3, len(self.service_registry.get_services(IBar)))
+
+        # Unregistering a service removes it from the lookup.
+        self.service_registry.unregister_service(ids[1])
+        self.assertEqual(
+            [foos[0], foos[2]], self.service_registry.get_services(IFoo)
+        )
+
+        map(self.service_registry.unregister_service, [ids[0], ids[2]])
+        self.assertEqual([], self.service_registry.get_services(IFoo))
+
+        return
+
     def test_get_services_with_strings(self):
         """ get services with strings """
 
@@ -294,6 +330,134 @@ class ServiceRegistryTestCase(unittest.TestCase):
 
         return
 
+    def test_get_services_with_structured_query(self):
+        """ get services with structured query """
+
+        class IFoo(Interface):
+            pass
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+        created = []
+        def factory(**properties):
+            """ A service factory. """
+
+            foo = Foo()
+            created.append(foo)
+
+            return foo
+
+        en = Foo()
+        self.service_registry.register_service(
+            IFoo, en, {'lang' : 'en', 'priority' : 5}
+        )
+        fr = Foo()
+        fr_id = self.service_registry.register_service(
+            IFoo, fr, {'lang' : 'fr', 'priority' : 1}
+        )
+        self.service_registry.register_service(
+            IFoo, factory, {'lang' : 'de', 'priority' : 3, 'tags' : ['x']}
+        )
+
+        get_services = self.service_registry.get_services
+        self.assertEqual([en], get_services(IFoo, {'lang' : 'en'}))
+        self.assertEqual(
+            [en], get_services(IFoo, {'lang' : 'en', 'priority__gt' : 3})
+        )
+        self.assertEqual([], get_services(IFoo, {'lang' : 'en', 'x' : 1}))
+        self.assertEqual(
+            [en, fr], get_services(IFoo, {'lang__in' : ['en', 'fr']})
+        )
+
+        # The factory is only called when its service matches the query.
+        self.assertEqual([], created)
+        self.assertEqual(created, get_services(IFoo, {'tags' : ['x']}))
+        self.assertEqual(1, len(created))
+
+        # Changing the properties of a service updates the index.
+        self.service_registry.set_service_properties(fr_id, {'lang' : 'en'})
+        self.assertEqual([en, fr], get_services(IFoo, {'lang' : 'en'}))
+        self.assertEqual([], get_services(IFoo, {'lang' : 'fr'}))
+
+        # And so does unregistering it.
+        self.service_registry.unregister_service(fr_id)
+        self.assertEqual([en], get_services(IFoo, {'lang' : 'en'}))
+
+        # Unknown operators are an error.
+        self.failUnlessRaises(
+            ValueError, get_services, IFoo, {'priority__foo' : 1}
+        )
+
+        return
+
+    def test_string_queries_are_compiled_once(self):
+        """ string queries are compiled once """
+
+        from envisage import service_query
+
+        class IFoo(Interface):
+            price = Int
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+            price = Int
+
+        for price in range(5):
+            self.service_registry.register_service(IFoo, Foo(price=price))
+
+        query = 'price > 2 and price < 99'
+        services = self.service_registry.get_services(IFoo, query)
+        self.assertEqual([3, 4], [service.price for service in services])
+
+        code = service_query.compile_query(query)
+        self.service_registry.get_services(IFoo, query)
+        self.assert_(code is service_query.compile_query(query))
+
+        # Invalid queries simply don't match anything.
+        services = self.service_registry.get_services(IFoo, 'price >')
+        self.assertEqual([], services)
+
+        return
+
+    def test_compiled_queries_are_bounded(self):
+        """ compiled queries are bounded """
+
+        from envisage import service_query
+
+        for price in range(service_query.MAX_COMPILED_QUERIES + 10):
+            service_query.compile_query('price == %d' % price)
+
+        self.assertEqual(
+            service_query.MAX_COMPILED_QUERIES,
+            len(service_query._compiled_queries)
+        )
+
+        # The least recently used queries were discarded.
+        self.assert_('price == 0' not in service_query._compiled_queries)
+
+        return
+
+    def test_query_names_are_visible_in_nested_scopes(self):
+        """ query names are visible in nested scopes """
+
+        class Foo(HasTraits):
+            price = Int
+
+        self.service_registry.register_service(
+            Foo, Foo(price=3), {'limits' : [1, 5]}
+        )
+
+        # Generator expressions (and lambdas) have their own scope and so can
+        # only see the query's names if they are globals.
+        services = self.service_registry.get_services(
+            Foo, 'any(price < limit for limit in limits)'
+        )
+        self.assertEqual(1, len(services))
+
+        return
+
     def test_get_service(self):
         """ get service """
 
@@ -517,6 +681,335 @@ class ServiceRegistryTestCase(unittest.TestCase):
 
         return
 
+    def test_minimize_and_maximize_with_limit(self):
+        """ minimize and maximize with limit """
+
+        class IFoo(Interface):
+            price = Int
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+            price = Int
+
+        for price in [10, 5, 100, 5, 50]:
+            self.service_registry.register_service(IFoo, Foo(price=price))
+
+        services = self.service_registry.get_services(
+            IFoo, minimize='price', limit=3
+        )
+        self.assertEqual([5, 5, 10], [service.price for service in services])
+
+        services = self.service_registry.get_services(
+            IFoo, query='price < 100', maximize='price', limit=2
+        )
+        self.assertEqual([50, 10], [service.price for service in services])
+
+        services = self.service_registry.get_services(IFoo, limit=2)
+        self.assertEqual([10, 5], [service.price for service in services])
+
+        return
+
+    def test_minimize_only_resolves_needed_factories(self):
+        """ minimize only resolves needed factories """
+
+        class IFoo(Interface):
+            pass
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+        created = []
+        def factory(**properties):
+            """ A service factory. """
+
+            foo = Foo()
+            created.append(properties['cost'])
+
+            return foo
+
+        for cost in [3, 1, 2]:
+            self.service_registry.register_service(
+                IFoo, factory, {'cost' : cost}
+            )
+
+        # Ranking uses the registered properties, so only the best factory is
+        # called.
+        service = self.service_registry.get_service(IFoo, minimize='cost')
+        self.assertNotEqual(None, service)
+        self.assertEqual([1], created)
+
+        service = self.service_registry.get_service(IFoo, maximize='cost')
+        self.assertNotEqual(None, service)
+        self.assertEqual([1, 3], created)
+
+        return
+
+    def test_concurrent_factory_resolution(self):
+        """ concurrent factory resolution """
+
+        class IFoo(Interface):
+            pass
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+        created = []
+        def factory(**properties):
+            """ A slow service factory. """
+
+            time.sleep(0.1)
+            foo = Foo()
+            created.append(foo)
+
+            return foo
+
+        self.service_registry.register_service(IFoo, factory)
+
+        services = []
+        def get_service():
+            services.append(self.service_registry.get_service(IFoo))
+
+        threads = [threading.Thread(target=get_service) for i in range(5)]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # The factory was only called once, and every thread got its service.
+        self.assertEqual(1, len(created))
+        self.assertEqual(created * 5, services)
+
+        return
+
+    def test_unregistration_during_factory_resolution(self):
+        """ unregistration during factory resolution """
+
+        class IFoo(Interface):
+            pass
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+        service_ids = []
+        calls       = []
+        created     = []
+        def factory(**properties):
+            """ A slow service factory whose service is unregistered. """
+
+            calls.append(properties)
+            time.sleep(0.1)
+            if len(calls) == 1:
+                self.service_registry.unregister_service(service_ids[0])
+
+            foo = Foo()
+            created.append(foo)
+
+            return foo
+
+        service_ids.append(
+            self.service_registry.register_service(IFoo, factory)
+        )
+
+        services = []
+        def get_services():
+            services.extend(self.service_registry.get_services(IFoo))
+
+        threads = [threading.Thread(target=get_services) for i in range(3)]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # The threads that were waiting for the factory did not call it again.
+        self.assertEqual(1, len(calls))
+        self.assertEqual(created, services)
+
+        return
+
+    def test_unregistration_during_lookup(self):
+        """ unregistration during lookup """
+
+        class Foo(HasTraits):
+            price = Int
+
+        service_registry = self.service_registry
+
+        # A factory that unregisters another service when it is called (e.g.
+        # as if another thread had unregistered it).
+        ids = []
+        def factory(**properties):
+            service_registry.unregister_service(ids[-1])
+            return Foo(price=1)
+
+        ids.append(service_registry.register_service(Foo, factory))
+        ids.append(service_registry.register_service(Foo, Foo(price=2)))
+
+        services = service_registry.get_services(Foo)
+        self.assertEqual([1], [service.price for service in services])
+
+        # The same again, but with the services ranked.
+        ids.append(service_registry.register_service(Foo, factory))
+        ids.append(
+            service_registry.register_service(Foo, Foo(price=2), {'price' : 2})
+        )
+
+        services = service_registry.get_services(Foo, minimize='price')
+        self.assertEqual([1, 1], [service.price for service in services])
+
+        return
+
+    def test_statistics(self):
+        """ statistics """
+
+        class IFoo(Interface):
+            price = Int
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+            price = Int
+
+        def factory(**properties):
+            """ A service factory. """
+
+            return Foo(**properties)
+
+        def bad_factory(**properties):
+            """ A service factory that fails. """
+
+            raise ValueError('bogus')
+
+        # Statistics are specific to the default service registry
+        # implementation.
+        service_registry = self.service_registry.service_registry
+
+        # No statistics are gathered by default.
+        service_registry.register_service(IFoo, factory, {'price' : 1})
+        service_registry.get_services(IFoo)
+        self.assertEqual({}, service_registry.get_statistics())
+
+        service_registry.statistics_sample_rate = 1.0
+        service_registry.register_service(IFoo, factory, {'price' : 2})
+        service_registry.get_services(IFoo, 'price > 1')
+        service_registry.get_service(IFoo)
+
+        statistics = service_registry.get_statistics()
+        name = service_registry._get_protocol_name(IFoo)
+        self.assertEqual([name], statistics.keys())
+        self.assertEqual(2, statistics[name]['lookups'])
+        self.assertEqual(2, statistics[name]['sampled_lookups'])
+        self.assertEqual(3, statistics[name]['candidates'])
+        self.assertEqual(1, statistics[name]['factory_calls'])
+        self.assertEqual(0, statistics[name]['factory_failures'])
+
+        # Factory failures are counted.
+        service_registry.reset_statistics()
+        service_registry.register_service(IFoo, bad_factory)
+        self.failUnlessRaises(
+            ValueError, service_registry.get_services, IFoo
+        )
+        statistics = service_registry.get_statistics()
+        self.assertEqual(1, statistics[name]['factory_failures'])
+
+        # Sampled lookups are counted, but not all of them are timed.
+        service_registry.reset_statistics()
+        service_registry.statistics_sample_rate = 0.000001
+        service_registry.get_services('a.Missing')
+        statistics = service_registry.get_statistics()
+        self.assertEqual(1, statistics['a.Missing']['lookups'])
+
+        return
+
+    def test_wait_for_service(self):
+        """ wait for service """
+
+        try:
+            from envisage.asyncio_utils import import_asyncio
+            asyncio = import_asyncio()
+
+        except ImportError:
+            raise unittest.SkipTest('asyncio is not available')
+
+        class IFoo(Interface):
+            pass
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+        service_registry = self.service_registry.service_registry
+
+        loop = asyncio.new_event_loop()
+        try:
+            # The service is registered from another thread whilst we wait.
+            foo    = Foo()
+            future = service_registry.wait_for_service(IFoo, loop=loop)
+            thread = threading.Thread(
+                target=service_registry.register_service, args=(IFoo, foo)
+            )
+            loop.call_later(0.01, thread.start)
+            self.assertEqual(foo, loop.run_until_complete(future))
+            thread.join()
+
+            # The service already exists.
+            future = service_registry.wait_for_service(IFoo, loop=loop)
+            self.assertEqual(foo, loop.run_until_complete(future))
+
+            # A service that is never registered.
+            future = service_registry.wait_for_service(
+                IFoo, query='x == 1', timeout=0.01, loop=loop
+            )
+            self.failUnlessRaises(
+                asyncio.TimeoutError, loop.run_until_complete, future
+            )
+
+        finally:
+            loop.close()
+
+        return
+
+    def test_aget_service(self):
+        """ aget service """
+
+        try:
+            from envisage.asyncio_utils import import_asyncio
+            asyncio = import_asyncio()
+
+        except ImportError:
+            raise unittest.SkipTest('asyncio is not available')
+
+        class IFoo(Interface):
+            pass
+
+        class Foo(HasTraits):
+            implements(IFoo)
+
+        threads = []
+        def factory(**properties):
+            """ A service factory. """
+
+            threads.append(threading.current_thread())
+
+            return Foo()
+
+        service_registry = self.service_registry.service_registry
+        service_registry.register_service(IFoo, factory)
+
+        loop = asyncio.new_event_loop()
+        try:
+            future = service_registry.aget_service(IFoo, loop=loop)
+            self.assert_(isinstance(loop.run_until_complete(future), Foo))
+
+        finally:
+            loop.close()
+
+        # The factory was not called in the event loop's thread.
+        self.assertNotEqual([threading.current_thread()], threads)
+
+        return
+
 
 # Entry point for stand-alone testing.
 if __name__ == '__main__':
@@ -2,7 +2,7 @@
 
 
 # Enthought library imports.
-from envisage.api import Application, Plugin, Service
+from envisage.api import Application, Plugin, Service, ServiceRegistry
 from traits.api import HasTraits, Instance
 from traits.testing.unittest_tools import unittest
 
@@ -13,6 +13,21 @@ class TestApplication(Application):
     id = 'test'
 
 
+class CountingServiceRegistry(ServiceRegistry):
+    """ A service registry that counts service lookups. """
+
+    lookups = 0
+
+    def get_service(self, protocol, query='', minimize='', maximize=''):
+        """ Return at most one service that matches the specified query. """
+
+        self.lookups += 1
+
+        return super(CountingServiceRegistry, self).get_service(
+            protocol, query, minimize, maximize
+        )
+
+
 class ServiceTestCase(unittest.TestCase):
     """ Tests for the 'Service' trait type. """
 
@@ -84,6 +99,105 @@ class ServiceTestCase(unittest.TestCase):
 
         return
 
+    def test_service_is_cached_until_protocol_changes(self):
+        """ service is cached until protocol changes """
+
+        class Foo(HasTraits):
+            pass
+
+        class Bar(HasTraits):
+            pass
+
+        class PluginB(Plugin):
+            id  = 'B'
+            foo = Service(Foo, cache=True)
+
+        service_registry = CountingServiceRegistry()
+        application = TestApplication(service_registry=service_registry)
+        b = PluginB(application=application)
+
+        self.assertEqual(None, b.foo)
+        self.assertEqual(None, b.foo)
+        self.assertEqual(1, service_registry.lookups)
+
+        # Registering a service for the protocol invalidates the cache...
+        foo = Foo()
+        foo_id = application.register_service(Foo, foo)
+        self.assertEqual(foo, b.foo)
+        self.assertEqual(foo, b.foo)
+        self.assertEqual(2, service_registry.lookups)
+
+        # ... but registering one for another protocol does not.
+        application.register_service(Bar, Bar())
+        self.assertEqual(foo, b.foo)
+        self.assertEqual(2, service_registry.lookups)
+
+        # Unregistering the service invalidates the cache again.
+        application.unregister_service(foo_id)
+        self.assertEqual(None, b.foo)
+        self.assertEqual(3, service_registry.lookups)
+
+        return
+
+    def test_service_is_not_cached_by_default(self):
+        """ service is not cached by default """
+
+        class Foo(HasTraits):
+            pass
+
+        class PluginB(Plugin):
+            id  = 'B'
+            foo = Service(Foo)
+
+        service_registry = CountingServiceRegistry()
+        application = TestApplication(service_registry=service_registry)
+        b = PluginB(application=application)
+
+        self.assertEqual(None, b.foo)
+        self.assertEqual(None, b.foo)
+        self.assertEqual(2, service_registry.lookups)
+
+        return
+
+    def test_service_invalidated_during_lookup_is_not_cached(self):
+        """ service invalidated during lookup is not cached """
+
+        class Foo(HasTraits):
+            pass
+
+        class RacingServiceRegistry(ServiceRegistry):
+            """ Registers a service whilst a lookup is in progress. """
+
+            def get_service(self, protocol, query='', minimize='',
+                            maximize=''):
+                service = super(RacingServiceRegistry, self).get_service(
+                    protocol, query, minimize, maximize
+                )
+
+                # This is what another thread could do before the lookup
+                # returns.
+                if service is None:
+                    self.register_service(Foo, foo)
+
+                return service
+
+        class PluginB(Plugin):
+            id  = 'B'
+            foo = Service(Foo, cache=True)
+
+        foo = Foo()
+        application = TestApplication(
+            service_registry=RacingServiceRegistry()
+        )
+        b = PluginB(application=application)
+
+        # The first lookup found no service, but the service registered
+        # meanwhile must not be hidden by a stale cached None.
+        self.assertEqual(None, b.foo)
+        self.assertEqual(foo, b.foo)
+
+        return
+
 
 # Entry point for stand-alone testing.
 if __name__ == '__main__':
@@ -0,0 +1,173 @@
+""" Tests for startup snapshots. """
+
+
+# Standard library imports.
+import os, shutil, tempfile
+
+# Enthought library imports.
+from envisage.api import Application, ExtensionPoint, Plugin
+from envisage.startup_snapshot import StartupSnapshot
+from traits.api import Any, Int, List
+from traits.testing.unittest_tools import unittest
+
+
+class TestApplication(Application):
+    """ The type of application used in the tests. """
+
+    id = 'test'
+
+
+class PluginA(Plugin):
+    """ A plugin that offers an extension point. """
+
+    id = 'A'
+    x  = ExtensionPoint(List, id='a.x')
+
+
+class PluginB(Plugin):
+    """ A plugin that contributes to an extension point. """
+
+    id = 'B'
+    x  = List(Int, contributes_to='a.x')
+
+    # How many times the contributions have been evaluated.
+    evaluated = Int(0)
+
+    def _x_default(self):
+        """ Trait initializer. """
+
+        self.evaluated += 1
+
+        return [1, 2, 3]
+
+
+class PluginC(Plugin):
+    """ A plugin that makes contributions that can't be pickled. """
+
+    id = 'C'
+    x  = List(Any, contributes_to='a.x')
+
+    def _x_default(self):
+        """ Trait initializer. """
+
+        return [lambda: 42]
+
+
+class StartupSnapshotTestCase(unittest.TestCase):
+    """ Tests for startup snapshots. """
+
+    ###########################################################################
+    # 'TestCase' interface.
+    ###########################################################################
+
+    def setUp(self):
+        """ Prepares the test fixture before each test method is called. """
+
+        self.tmpdir   = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'snapshot')
+
+        return
+
+    def tearDown(self):
+        """ Called immediately after each test method has been called. """
+
+        shutil.rmtree(self.tmpdir)
+
+        return
+
+    ###########################################################################
+    # Tests.
+    ###########################################################################
+
+    def test_warm_start_uses_snapshot(self):
+        """ warm start uses snapshot """
+
+        application = TestApplication(plugins=[PluginA(), PluginB()])
+        self.assertEqual([1, 2, 3], application.get_extensions('a.x'))
+        application.save_startup_snapshot(self.filename)
+
+        b = PluginB()
+        application = TestApplication(plugins=[PluginA(), b])
+        self.assertEqual(
+            True, application.load_startup_snapshot(self.filename)
+        )
+
+        # The contributions come from the snapshot, not the plugin.
+        self.assertEqual([1, 2, 3], application.get_extensions('a.x'))
+        self.assertEqual(0, b.evaluated)
+
+        return
+
+    def test_unpicklable_contributions_are_evaluated_live(self):
+        """ unpicklable contributions are evaluated live """
+
+        application = TestApplication(
+            plugins=[PluginA(), PluginB(), PluginC()]
+        )
+        application.save_startup_snapshot(self.filename)
+
+        b = PluginB()
+        application = TestApplication(plugins=[PluginA(), b, PluginC()])
+        self.assertEqual(
+            True, application.load_startup_snapshot(self.filename)
+        )
+
+        extensions = application.get_extensions('a.x')
+        self.assertEqual([1, 2, 3], extensions[:3])
+        self.assertEqual(42, extensions[3]())
+        self.assertEqual(0, b.evaluated)
+
+        return
+
+    def test_changed_plugins_are_evaluated_live(self):
+        """ changed plugins are evaluated live """
+
+        application = TestApplication(plugins=[PluginA(), PluginB()])
+        application.save_startup_snapshot(self.filename)
+
+        # Pretend that the module that defines 'PluginB' has changed.
+        snapshot = StartupSnapshot.load(self.filename)
+        class_path, mtime, version = snapshot.fingerprints['B']
+        snapshot.fingerprints['B'] = (class_path, mtime - 1, version)
+        snapshot.save(self.filename)
+
+        b = PluginB()
+        application = TestApplication(plugins=[PluginA(), b])
+        self.assertEqual(
+            True, application.load_startup_snapshot(self.filename)
+        )
+
+        self.assertEqual([1, 2, 3], application.get_extensions('a.x'))
+        self.assertEqual(1, b.evaluated)
+
+        return
+
+    def test_snapshot_not_used_if_plugins_differ(self):
+        """ snapshot not used if plugins differ """
+
+        application = TestApplication(plugins=[PluginA(), PluginB()])
+        application.save_startup_snapshot(self.filename)
+
+        application = TestApplication(plugins=[PluginA()])
+        self.assertEqual(
+            False, application.load_startup_snapshot(self.filename)
+        )
+
+        return
+
+    def test_missing_snapshot_is_not_used(self):
+        """ missing snapshot is not used """
+
+        application = TestApplication(plugins=[PluginA(), PluginB()])
+        self.assertEqual(
+            False, application.load_startup_snapshot(self.filename)
+        )
+
+        return
+
+
+# Entry point for stand-alone testing.
+if __name__ == '__main__':
+    unittest.main()
+
+#### EOF ######################################################################
@@ -18,3 +18,23 @@ class VetoableTaskWindowEvent(TaskWindowEvent, Vetoable):
     """
 
     pass
+
+
+class LightweightTaskWindowEvent(object):
+    """ A task window lifecycle event that is a plain object with slots.
+
+    This has the same attributes as a 'TaskWindowEvent' but is much cheaper
+    to create. It is used for the events that can't be vetoed.
+    """
+
+    __slots__ = ('window',)
+
+    def __init__(self, window=None):
+        """ Constructor. """
+
+        self.window = window
+
+    def __repr__(self):
+        """ Return a string representation of the event. """
+
+        return 'LightweightTaskWindowEvent(window=%r)' % self.window
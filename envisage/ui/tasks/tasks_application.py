@@ -8,13 +8,14 @@ from envisage.api import Application, ExtensionPoint
 from pyface.api import GUI, SplashScreen
 from pyface.image_resource import ImageResource
 from pyface.tasks.api import TaskLayout, TaskWindowLayout
-from traits.api import Bool, Callable, Directory, Event, HasStrictTraits, \
-     Instance, Int, List, Property, Str, Unicode, Vetoable
+from traits.api import Bool, Callable, Directory, Either, Event, \
+     HasStrictTraits, Instance, Int, List, Property, Str, Unicode, Vetoable
 from traits.etsconfig.api import ETSConfig
 
 # Local imports
 from task_window import TaskWindow
-from task_window_event import TaskWindowEvent, VetoableTaskWindowEvent
+from task_window_event import LightweightTaskWindowEvent, TaskWindowEvent, \
+     VetoableTaskWindowEvent
 
 # Logging.
 logger = logging.getLogger(__name__)
@@ -89,19 +90,19 @@ class TasksApplication(Application):
     application_exiting = Event
 
     # Fired when a task window has been created.
-    window_created = Event(TaskWindowEvent)
+    window_created = Event(Either(TaskWindowEvent, LightweightTaskWindowEvent))
 
     # Fired when a task window is opening.
     window_opening = Event(VetoableTaskWindowEvent)
 
     # Fired when a task window has been opened.
-    window_opened = Event(TaskWindowEvent)
+    window_opened = Event(Either(TaskWindowEvent, LightweightTaskWindowEvent))
 
     # Fired when a task window is closing.
     window_closing = Event(VetoableTaskWindowEvent)
 
     # Fired when a task window has been closed.
-    window_closed = Event(TaskWindowEvent)
+    window_closed = Event(Either(TaskWindowEvent, LightweightTaskWindowEvent))
 
     #### Protected interface ##################################################
 
@@ -195,7 +196,7 @@ class TasksApplication(Application):
         window.on_trait_change(self._on_window_closed, 'closed')
 
         # Event notification.
-        self.window_created = TaskWindowEvent(window=window)
+        self.window_created = LightweightTaskWindowEvent(window=window)
 
         if layout:
             # Create and add tasks.
@@ -398,7 +399,7 @@ class TasksApplication(Application):
         self.windows.append(window)
 
         # Event notification.
-        self.window_opened = TaskWindowEvent(window=window)
+        self.window_opened = LightweightTaskWindowEvent(window=window)
 
     def _on_window_closing(self, window, trait_name, event):
         # Event notification.
@@ -421,7 +422,7 @@ class TasksApplication(Application):
         self.windows.remove(window)
 
         # Event notification.
-        self.window_closed = TaskWindowEvent(window=window)
+        self.window_closed = LightweightTaskWindowEvent(window=window)
 
         # Was this the last window?
         if len(self.windows) == 0:
@@ -181,11 +181,12 @@ class WorkbenchWindow(pyface.WorkbenchWindow):
 
         return self.service_registry.get_service_properties(service_id)
 
-    def get_services(self, protocol, query='', minimize='', maximize=''):
+    def get_services(self, protocol, query='', minimize='', maximize='',
+                     limit=None):
         """ Return all services that match the specified query. """
 
         services = self.service_registry.get_services(
-            protocol, query, minimize, maximize
+            protocol, query, minimize, maximize, limit
         )
 
         return services